@@ -1,10 +1,15 @@
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from app.database import get_user_by_email
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import aget_user_by_email, get_async_db
+from app.cache import user_cache
+from app.hashing import (
+    hashing_executor, HashPriority, HashingQueueFull, _verify_password, _hash_password,
+)
+from app.metrics import password_hashing_duration
 from app.models import User
 
 # Configuration
@@ -12,14 +17,40 @@ SECRET_KEY = "your-secret-key-keep-it-secret" # In production, use env var
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
+
+# The request's unit of work, shared by the route and get_current_user. It
+# commits when the route returns, before the response is sent; every user
+# must share this one Depends, as a different scope would open a second session.
+request_db = Depends(get_async_db, scope="function")
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return _verify_password(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return _hash_password(password)
+
+async def _run_hashing(operation: str, priority: HashPriority, fn, *args):
+    start = time.perf_counter()
+    try:
+        return await hashing_executor.run(priority, fn, *args)
+    except HashingQueueFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    finally:
+        password_hashing_duration.observe((operation,), time.perf_counter() - start)
+
+async def averify_password(plain_password, hashed_password):
+    """Verify a password in the hashing pool without blocking the event loop"""
+    return await _run_hashing("verify", HashPriority.login, _verify_password, plain_password, hashed_password)
+
+async def ahash_password(password):
+    """Hash a password in the hashing pool without blocking the event loop"""
+    return await _run_hashing("hash", HashPriority.signup, _hash_password, password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -28,15 +59,18 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=15)
     to_encode.update({"exp": expire})
+    # jose is imported on first use, not at startup
+    from jose import jwt
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = request_db):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    from jose import JWTError, jwt
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
@@ -45,8 +79,24 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     except JWTError:
         raise credentials_exception
     
-    user_dict = get_user_by_email(email)
-    if user_dict is None:
+    user = await user_cache.get_or_load(email, lambda email: _load_user(email, db))
+    if user is None:
         raise credentials_exception
         
+    return user
+
+def token_email(token: Optional[str]) -> Optional[str]:
+    """Email in a valid token, or None, for routes that do not require auth"""
+    if not token:
+        return None
+    from jose import JWTError, jwt
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except JWTError:
+        return None
+
+async def _load_user(email: str, db: AsyncSession = None) -> Optional[User]:
+    user_dict = await aget_user_by_email(email, db)
+    if user_dict is None:
+        return None
     return User(**{k:v for k,v in user_dict.items() if k != "password_hash"})
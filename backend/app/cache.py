@@ -0,0 +1,144 @@
+"""In-process caches"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Hashable
+
+from app.config import settings
+
+_MISSING = object()
+_RETRY = object()  # result of a load abandoned by its caller
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries also expire after a fixed time
+
+    Concurrent misses for the same key are coalesced: the first caller runs
+    the loader and every other caller awaits its result. If that caller is
+    cancelled, as when its client disconnects, the others start over and
+    one of them runs its own loader.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._pending: dict = {}
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a cached value, counting a hit or a miss"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                value, expires_at = item
+                if expires_at > self._clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entry if full"""
+        with self._lock:
+            self._set(key, value)
+
+    def _set(self, key: Hashable, value: Any):
+        self._data[key] = (value, self._clock() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        """Drop a key, including any load for it that is still running"""
+        with self._lock:
+            self._data.pop(key, None)
+            self._pending.pop(key, None)
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._data.clear()
+            self._pending.clear()
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[Hashable], Awaitable[Any]]) -> Any:
+        """Get a value, loading it on a miss
+
+        None results are returned but not cached.
+        """
+        while True:
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+
+            with self._lock:
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = self._pending[key] = Future()
+                    owner = True
+                else:
+                    self.coalesced += 1
+                    owner = False
+
+            if owner:
+                return await self._load(key, loader, pending)
+            # Plain futures so waiters on other event loops can share the
+            # load; shielded so a waiter's cancellation does not cancel it
+            value = await asyncio.shield(asyncio.wrap_future(pending))
+            if value is not _RETRY:
+                return value
+
+    async def _load(self, key: Hashable, loader: Callable[[Hashable], Awaitable[Any]], pending: Future) -> Any:
+        try:
+            value = await loader(key)
+        except BaseException as e:
+            with self._lock:
+                if self._pending.get(key) is pending:
+                    del self._pending[key]
+            # Only errors of the load itself are shared; the owner being
+            # cancelled says nothing about the key
+            if isinstance(e, Exception):
+                pending.set_exception(e)
+            else:
+                pending.set_result(_RETRY)
+            raise
+
+        with self._lock:
+            # An invalidation while loading means the value may be stale
+            if self._pending.get(key) is pending:
+                del self._pending[key]
+                if value is not None:
+                    self._set(key, value)
+        pending.set_result(value)
+        return value
+
+    def stats(self) -> dict:
+        """Snapshot of size and hit/miss counters"""
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "coalesced": self.coalesced,
+            }
+
+
+# Public user records keyed by email, used by get_current_user
+user_cache = TTLCache(
+    maxsize=settings.user_cache_size,
+    ttl=settings.user_cache_ttl_seconds,
+)
@@ -1,27 +1,102 @@
-from typing import List, Optional, Dict
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from typing import Callable, List, Optional, Dict, Tuple
+from sqlalchemy import create_engine, select, insert, delete, text, tuple_, exists, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import sessionmaker, Session, aliased
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, QueuePool, AsyncAdaptedQueuePool
 from app.config import settings
-from app.db_models import Base, UserDB, LeaderboardEntryDB, ActiveGameDB, GameModeEnum
-from app.models import LeaderboardEntry, ActiveGame, GameMode, Point
-from datetime import datetime, timezone
-import uuid
+from app.db_pool import PoolMetrics, instrumented
+from app.metrics import instrument_engine
+from app.cache import user_cache
+from app.leaderboard_cache import leaderboard_cache
+from app.rankings import rank_index
+from app.replica import read_router
+from app.events import invalidation_bus, USERS_CHANGED, SCORES_ADDED, RESYNC, MAX_MESSAGE_BYTES
+from app.versioning import resource_versions, LEADERBOARD
+from app.db_models import (
+    Base, SCHEMA_REVISION, UserDB, LeaderboardEntryDB, UserBestScoreDB, LeaderboardWindowScoreDB, ActiveGameDB,
+    GameModeEnum, LeaderboardWindowEnum,
+)
+from app.models import (
+    LeaderboardEntry, RankedLeaderboardEntry, PlayerRank, ActiveGame, GameMode, LeaderboardWindow, Point,
+)
+from app.windows import window_start
+from app.game_codec import encode_points, encode_point, decode_points, decode_point
+from datetime import date, datetime, timezone
+import asyncio
 import json
+import uuid
+
+pool_args = {
+    "pool_size": settings.db_pool_size,
+    "max_overflow": settings.db_max_overflow,
+    "pool_timeout": settings.db_pool_timeout,
+    "pool_recycle": settings.db_pool_recycle,
+    "pool_pre_ping": settings.db_pool_pre_ping,
+}
+
+
+def _create_engine(url: str, metrics: PoolMetrics):
+    # SQLite-specific connect_args only for SQLite databases
+    connect_args = {}
+    if url.startswith("sqlite"):
+        connect_args = {"check_same_thread": False}
+    sync_engine = create_engine(
+        url,
+        connect_args=connect_args,
+        poolclass=instrumented(QueuePool, metrics),
+        **pool_args
+    )
+    metrics.listen(sync_engine.pool)
+    instrument_engine(sync_engine)
+    return sync_engine
+
+
+def _create_async_engine(url: str, metrics: PoolMetrics):
+    # SQLite connections are cheap to open, and aiosqlite connections must
+    # not be shared between event loops, so they are not pooled.
+    if url.startswith("sqlite"):
+        async_engine_args = {"poolclass": NullPool}
+    else:
+        async_engine_args = {"poolclass": instrumented(AsyncAdaptedQueuePool, metrics), **pool_args}
+    new_engine = create_async_engine(url, **async_engine_args)
+    metrics.listen(new_engine.sync_engine.pool)
+    instrument_engine(new_engine.sync_engine)
+    return new_engine
+
 
 # Create database engine
-# SQLite-specific connect_args only for SQLite databases
-connect_args = {}
-if settings.database_url.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
-
-engine = create_engine(
-    settings.database_url,
-    connect_args=connect_args
-)
+sync_pool_metrics = PoolMetrics()
+engine = _create_engine(settings.database_url, sync_pool_metrics)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine used by the API routes so queries do not block the event loop.
+async_pool_metrics = PoolMetrics()
+async_engine = _create_async_engine(settings.async_database_url, async_pool_metrics)
+
+# Create async session factory
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# Optional read replica for the read-only helpers, routed by read_router
+read_engine = async_read_engine = ReadSessionLocal = AsyncReadSessionLocal = None
+if settings.database_read_url:
+    read_pool_metrics = PoolMetrics()
+    read_engine = _create_engine(settings.database_read_url, read_pool_metrics)
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+    async_read_pool_metrics = PoolMetrics()
+    async_read_engine = _create_async_engine(settings.async_database_read_url, async_read_pool_metrics)
+    AsyncReadSessionLocal = async_sessionmaker(bind=async_read_engine, autoflush=False, expire_on_commit=False)
+
+# Failures that make a replica read worth retrying on the primary
+_REPLICA_ERRORS = (OperationalError, InterfaceError, PoolTimeoutError, OSError)
+
 
 def get_db() -> Session:
     """Get database session"""
@@ -32,31 +107,435 @@ def get_db() -> Session:
         db.close()
 
 
+class SchemaRevisionError(RuntimeError):
+    """The database is not migrated to the revision the code expects"""
+
+
 def init_db():
     """Initialize database tables"""
     Base.metadata.create_all(bind=engine)
 
 
+async def acheck_schema_revision() -> str:
+    """Check in one query that Alembic migrated the database to SCHEMA_REVISION
+
+    A cheap alternative to init_db() for databases managed with Alembic.
+    Returns the revision, or raises SchemaRevisionError.
+    """
+    async with async_engine.connect() as connection:
+        try:
+            revision = (await connection.execute(text("SELECT version_num FROM alembic_version"))).scalar()
+        except DBAPIError as e:
+            raise SchemaRevisionError(f"Cannot read the Alembic revision, run 'alembic upgrade head': {e}") from e
+    if revision != SCHEMA_REVISION:
+        raise SchemaRevisionError(
+            f"Database is at revision {revision}, expected {SCHEMA_REVISION}: run 'alembic upgrade head'"
+        )
+    return revision
+
+
+async def awarm_pool(connections: int, engine=None) -> int:
+    """Open up to connections pooled connections now, so early requests skip connecting
+
+    Returns how many were opened: none on an unpooled engine (SQLite), and
+    at most the pool size, since overflow connections are closed when
+    returned.
+    """
+    engine = engine or async_engine
+    pool = engine.sync_engine.pool
+    if not isinstance(pool, QueuePool):
+        return 0
+    count = max(0, min(connections, pool.size()))
+    opened = await asyncio.gather(*(engine.connect() for _ in range(count)), return_exceptions=True)
+    for connection in opened:
+        if not isinstance(connection, BaseException):
+            await connection.close()
+    for connection in opened:
+        if isinstance(connection, BaseException):
+            raise connection
+    return count
+
+
+async def aping_database():
+    """Run a trivial query to check the database is reachable"""
+    async with async_engine.connect() as connection:
+        await connection.execute(text("SELECT 1"))
+
+
+def _read(query, db: Optional[Session], reader: Optional[str] = None, replica: bool = True):
+    """Run query(session) on the replica when the router allows, else on the primary
+
+    A read that fails on the replica is retried on the primary. reader is
+    the email of the client, for read-your-writes; a given db is used as is.
+    """
+    if db is not None:
+        return query(db)
+    if replica and read_router.use_replica(reader):
+        try:
+            with ReadSessionLocal() as db:
+                return query(db)
+        except _REPLICA_ERRORS as e:
+            read_router.failed(e)
+    with SessionLocal() as db:
+        return query(db)
+
+
+async def _aread(query, db: Optional[AsyncSession], reader: Optional[str] = None, replica: bool = True):
+    """Async version of _read, except that a given db is only used for the primary
+
+    The routes pass their request's session (see get_async_db), which
+    should not keep reads off the replica.
+    """
+    if replica and read_router.use_replica(reader):
+        try:
+            async with AsyncReadSessionLocal() as read_db:
+                return await query(read_db)
+        except _REPLICA_ERRORS as e:
+            read_router.failed(e)
+    if db is not None:
+        return await query(db)
+    async with AsyncSessionLocal() as db:
+        return await query(db)
+
+
+# Follow-up work of a request's writes, kept in its session's info
+_AFTER_COMMIT = "after_commit"
+
+
+async def get_async_db():
+    """Request-scoped unit of work: one session for the route and its dependencies
+
+    Helpers given this session write without committing and leave their
+    follow-up work (cache updates, invalidation events) until the request
+    commits, once, after the route returns. The session only checks out a
+    connection when first used, so requests served from memory never do,
+    and an exception rolls everything back. Use it with scope="function"
+    (app.auth.request_db), so a failed commit fails the response.
+    """
+    db = AsyncSessionLocal()
+    db.info[_AFTER_COMMIT] = []
+    try:
+        yield db
+        if db.in_transaction():
+            await db.commit()
+    finally:
+        # Only a session in a transaction holds a connection, and skipping
+        # the others keeps requests served from memory cheap
+        if db.in_transaction():
+            await db.close()
+    for callback in db.info.pop(_AFTER_COMMIT):
+        callback()
+
+
+async def arelease_connection(db: AsyncSession):
+    """End a request's read-only transaction, returning its connection before slow work
+
+    The session stays usable and checks out again if queried.
+    """
+    if db.info.get(_AFTER_COMMIT) or db.new or db.dirty or db.deleted:
+        raise RuntimeError("The request has uncommitted writes")
+    await db.rollback()
+
+
+async def _acommit(db: AsyncSession, after_commit: Callable[[], None]):
+    # Commit and follow up now, or with the request's unit of work
+    pending = db.info.get(_AFTER_COMMIT)
+    if pending is None:
+        await db.commit()
+        after_commit()
+    else:
+        await db.flush()
+        pending.append(after_commit)
+
+
+def pool_stats() -> dict:
+    """Occupancy and checkout timing of the connection pools"""
+    stats = {}
+    pools = [("sync", engine.pool), ("async", async_engine.sync_engine.pool)]
+    if read_engine is not None:
+        pools += [("sync_read", read_engine.pool), ("async_read", async_read_engine.sync_engine.pool)]
+    for name, pool in pools:
+        metrics = getattr(pool, "metrics", None)
+        stats[name] = metrics.stats(pool) if metrics else {"status": pool.status()}
+    return stats
+
+
+def _user_to_dict(user: UserDB) -> dict:
+    return {
+        "id": user.id,
+        "email": user.email,
+        "username": user.username,
+        "password_hash": user.password_hash
+    }
+
+
+# Leaderboard reads fetch these as tuples; the index covers them on PostgreSQL
+_leaderboard_columns = (
+    LeaderboardEntryDB.id,
+    LeaderboardEntryDB.username,
+    LeaderboardEntryDB.score,
+    LeaderboardEntryDB.mode,
+    LeaderboardEntryDB.timestamp,
+)
+
+
+def _entry_from_row(row) -> LeaderboardEntry:
+    # Values straight from the database already have the right types, so
+    # the entry is built without validation
+    entry_id, username, score, mode, timestamp = row
+    return LeaderboardEntry.model_construct(
+        id=entry_id,
+        username=username,
+        score=score,
+        mode=GameMode(mode.value),
+        timestamp=timestamp
+    )
+
+
+def _entry_to_db(entry: LeaderboardEntry) -> LeaderboardEntryDB:
+    return LeaderboardEntryDB(
+        id=entry.id,
+        username=entry.username,
+        score=entry.score,
+        mode=GameModeEnum(entry.mode.value),
+        timestamp=entry.timestamp
+    )
+
+
+def _game_from_db(game: ActiveGameDB) -> ActiveGame:
+    return ActiveGame(
+        id=game.id,
+        username=game.username,
+        score=game.score,
+        mode=GameMode(game.mode.value),
+        snake=decode_points(game.snake),
+        food=decode_point(game.food)
+    )
+
+
+# Only the columns the API returns, read as tuples without ORM objects
+_active_game_columns = (
+    ActiveGameDB.id,
+    ActiveGameDB.username,
+    ActiveGameDB.score,
+    ActiveGameDB.mode,
+    ActiveGameDB.snake,
+    ActiveGameDB.food,
+)
+
+
+def _game_row_to_dict(row) -> dict:
+    game_id, username, score, mode, snake, food = row
+    return {
+        "id": game_id,
+        "username": username,
+        "score": score,
+        "mode": mode.value,
+        "snake": decode_points(snake),
+        "food": decode_point(food),
+    }
+
+
+def _leaderboard_query(mode: Optional[GameMode], limit: int, after: Optional[Tuple[int, str]] = None):
+    query = select(*_leaderboard_columns)
+
+    if mode:
+        query = query.where(LeaderboardEntryDB.mode == GameModeEnum(mode.value))
+
+    # Keyset pagination: continue strictly below the last (score, id) seen
+    if after is not None:
+        query = query.where(tuple_(LeaderboardEntryDB.score, LeaderboardEntryDB.id) < tuple_(*after))
+
+    # Sort by score descending, id breaks ties so pages are stable
+    return query.order_by(LeaderboardEntryDB.score.desc(), LeaderboardEntryDB.id.desc()).limit(limit)
+
+
+_best_score_columns = (
+    UserBestScoreDB.entry_id,
+    UserBestScoreDB.username,
+    UserBestScoreDB.score,
+    UserBestScoreDB.mode,
+    UserBestScoreDB.timestamp,
+)
+
+
+def _entries_above_query(mode: Optional[GameMode], limit: int, before: Tuple[int, str]):
+    """Entries ranked just above (score, id), nearest first"""
+    query = select(*_leaderboard_columns)
+    if mode:
+        query = query.where(LeaderboardEntryDB.mode == GameModeEnum(mode.value))
+    # The leaderboard indexes walked backwards
+    query = query.where(tuple_(LeaderboardEntryDB.score, LeaderboardEntryDB.id) > tuple_(*before))
+    return query.order_by(LeaderboardEntryDB.score.asc(), LeaderboardEntryDB.id.asc()).limit(limit)
+
+
+def _best_per_user_query(best, conditions, same_user, mode: Optional[GameMode], limit: int,
+                         after: Optional[Tuple[int, str]] = None):
+    """Best entry per user from a best-score table, in leaderboard order
+
+    same_user names the key columns, other than mode, that identify one
+    user's rows within the selected part of the table.
+    """
+    query = select(best.entry_id, best.username, best.score, best.mode, best.timestamp).where(*conditions)
+
+    if mode:
+        query = query.where(best.mode == GameModeEnum(mode.value))
+    else:
+        # Across modes, only the user's best row; at most one lookup by
+        # primary key per row read
+        better = aliased(best)
+        query = query.where(~exists().where(
+            *(getattr(better, column) == getattr(best, column) for column in same_user),
+            tuple_(better.score, better.entry_id) > tuple_(best.score, best.entry_id)
+        ))
+
+    if after is not None:
+        query = query.where(tuple_(best.score, best.entry_id) < tuple_(*after))
+
+    return query.order_by(best.score.desc(), best.entry_id.desc()).limit(limit)
+
+
+def _best_scores_query(mode: Optional[GameMode], limit: int, after: Optional[Tuple[int, str]] = None):
+    return _best_per_user_query(UserBestScoreDB, [], ["username"], mode, limit, after)
+
+
+def _window_scores_query(window: LeaderboardWindow, start: date, mode: Optional[GameMode], limit: int,
+                         after: Optional[Tuple[int, str]] = None):
+    scores = LeaderboardWindowScoreDB
+    return _best_per_user_query(
+        scores,
+        [scores.period == LeaderboardWindowEnum(window.value), scores.period_start == start],
+        ["period", "period_start", "username"],
+        mode, limit, after
+    )
+
+
+def _best_score_upsert(dialect_name: str, best=UserBestScoreDB):
+    """INSERT into a best-score table that only replaces a lower score"""
+    dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    statement = dialect_insert(best)
+    excluded = statement.excluded
+    return statement.on_conflict_do_update(
+        index_elements=list(best.__table__.primary_key.columns),
+        set_={"score": excluded.score, "entry_id": excluded.entry_id, "timestamp": excluded.timestamp},
+        where=tuple_(excluded.score, excluded.entry_id) > tuple_(best.score, best.entry_id)
+    )
+
+
+def _best_rows(keyed_entries) -> List[dict]:
+    # One row per key: a multi-row upsert may not touch a row twice
+    best = {}
+    for key, entry in keyed_entries:
+        if key not in best or (entry.score, entry.id) > (best[key][1].score, best[key][1].id):
+            best[key] = (dict(key), entry)
+    return [
+        {
+            **key_columns,
+            "score": entry.score,
+            "entry_id": entry.id,
+            "timestamp": entry.timestamp
+        }
+        for key_columns, entry in best.values()
+    ]
+
+
+def _best_score_rows(entries: List[LeaderboardEntry]) -> List[dict]:
+    return _best_rows(
+        ((("username", entry.username), ("mode", GameModeEnum(entry.mode.value))), entry)
+        for entry in entries
+    )
+
+
+def _window_score_rows(entries: List[LeaderboardEntry]) -> List[dict]:
+    return _best_rows(
+        (
+            (
+                ("period", LeaderboardWindowEnum(window.value)),
+                ("period_start", window_start(window, entry.timestamp)),
+                ("username", entry.username),
+                ("mode", GameModeEnum(entry.mode.value)),
+            ),
+            entry
+        )
+        for entry in entries
+        for window in LeaderboardWindow
+    )
+
+
+# Other workers' writes, from the invalidation bus
+_EVENT_PAYLOAD_BYTES = MAX_MESSAGE_BYTES - 100  # leaves room for the event's origin and topic
+
+
+def _publish_entries(entries: List[LeaderboardEntry]):
+    # As many rows per event as fit under the NOTIFY payload limit
+    chunk, size = [], 0
+    for e in entries:
+        row = [e.id, e.username, e.score, e.mode.value, e.timestamp.isoformat()]
+        row_size = len(json.dumps(row)) + 2
+        if chunk and size + row_size > _EVENT_PAYLOAD_BYTES:
+            invalidation_bus.publish(SCORES_ADDED, chunk)
+            chunk, size = [], 0
+        chunk.append(row)
+        size += row_size
+    if chunk:
+        invalidation_bus.publish(SCORES_ADDED, chunk)
+
+
+def _on_scores_added(rows: list):
+    for entry_id, username, score, mode, timestamp in rows:
+        entry = LeaderboardEntry.model_construct(
+            id=entry_id, username=username, score=score, mode=GameMode(mode),
+            timestamp=datetime.fromisoformat(timestamp)
+        )
+        leaderboard_cache.add(entry)
+        rank_index.add(entry)
+    resource_versions.bump(LEADERBOARD)
+
+
+def _on_users_changed(emails: list):
+    for email in emails:
+        user_cache.invalidate(email)
+
+
+_resync_task: Optional[asyncio.Task] = None
+
+
+def _on_resync(_):
+    # Missed scores could be anywhere on the leaderboard, so the cache and
+    # the rank counts are reloaded now rather than at their next resync
+    global _resync_task
+    user_cache.clear()
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        print("⚠️  Invalidation events were missed; the leaderboard is reloaded at its next resync")
+        return
+    if _resync_task is None or _resync_task.done():
+        _resync_task = loop.create_task(_aresync_missed_scores())
+
+
+async def _aresync_missed_scores():
+    try:
+        await resync_leaderboard_cache()
+        await resync_rank_index()
+    except Exception as e:
+        print(f"⚠️  Resync after missed invalidation events failed: {e}")
+
+
+invalidation_bus.subscribe(SCORES_ADDED, _on_scores_added)
+invalidation_bus.subscribe(USERS_CHANGED, _on_users_changed)
+invalidation_bus.subscribe(RESYNC, _on_resync)
+
+
 def get_user_by_email(email: str, db: Session = None) -> Optional[dict]:
     """Get user by email"""
-    should_close = False
-    if db is None:
-        db = SessionLocal()
-        should_close = True
-    
-    try:
+    def query(db: Session):
         user = db.query(UserDB).filter(UserDB.email == email).first()
         if user:
-            return {
-                "id": user.id,
-                "email": user.email,
-                "username": user.username,
-                "password_hash": user.password_hash
-            }
+            return _user_to_dict(user)
         return None
-    finally:
-        if should_close:
-            db.close()
+
+    return _read(query, db, reader=email)
 
 
 def get_user_by_id(user_id: str, db: Session = None) -> Optional[dict]:
@@ -69,12 +548,7 @@ def get_user_by_id(user_id: str, db: Session = None) -> Optional[dict]:
     try:
         user = db.query(UserDB).filter(UserDB.id == user_id).first()
         if user:
-            return {
-                "id": user.id,
-                "email": user.email,
-                "username": user.username,
-                "password_hash": user.password_hash
-            }
+            return _user_to_dict(user)
         return None
     finally:
         if should_close:
@@ -99,13 +573,10 @@ def create_user(user_data: dict, db: Session = None) -> dict:
         db.add(user)
         db.commit()
         db.refresh(user)
+        user_cache.invalidate(user.email)
+        invalidation_bus.publish(USERS_CHANGED, [user.email])
         
-        return {
-            "id": user.id,
-            "email": user.email,
-            "username": user.username,
-            "password_hash": user.password_hash
-        }
+        return _user_to_dict(user)
     finally:
         if should_close:
             db.close()
@@ -119,76 +590,343 @@ def add_leaderboard_entry(entry: LeaderboardEntry, db: Session = None):
         should_close = True
     
     try:
-        db_entry = LeaderboardEntryDB(
-            id=entry.id,
-            username=entry.username,
-            score=entry.score,
-            mode=GameModeEnum(entry.mode.value),
-            timestamp=entry.timestamp
-        )
-        db.add(db_entry)
+        db.add(_entry_to_db(entry))
+        dialect_name = db.get_bind().dialect.name
+        db.execute(_best_score_upsert(dialect_name), _best_score_rows([entry]))
+        db.execute(_best_score_upsert(dialect_name, LeaderboardWindowScoreDB), _window_score_rows([entry]))
         db.commit()
+        leaderboard_cache.add(entry)
+        rank_index.add(entry)
+        resource_versions.bump(LEADERBOARD)
+        _publish_entries([entry])
     finally:
         if should_close:
             db.close()
 
 
-def get_leaderboard(mode: Optional[GameMode] = None, limit: int = 10, db: Session = None) -> List[LeaderboardEntry]:
-    """Get leaderboard entries"""
+def get_leaderboard(mode: Optional[GameMode] = None, limit: int = 10, db: Session = None,
+                    after: Optional[Tuple[int, str]] = None) -> List[LeaderboardEntry]:
+    """Get leaderboard entries, optionally after a (score, id) cursor"""
+    def query(db: Session):
+        rows = db.execute(_leaderboard_query(mode, limit, after)).all()
+        return [_entry_from_row(row) for row in rows]
+
+    return _read(query, db)
+
+
+def get_active_games(db: Session = None) -> List[ActiveGame]:
+    """Get all active games"""
+    def query(db: Session):
+        games = db.query(ActiveGameDB).all()
+        return [_game_from_db(game) for game in games]
+
+    return _read(query, db)
+
+
+# Async versions of the helpers above, used by the API routes
+
+async def aget_user_by_email(email: str, db: AsyncSession = None, replica: bool = True) -> Optional[dict]:
+    """Get user by email; replica=False reads the primary, e.g. before inserting"""
+    async def query(db: AsyncSession):
+        user = await db.scalar(select(UserDB).where(UserDB.email == email).limit(1))
+        if user:
+            return _user_to_dict(user)
+        return None
+
+    return await _aread(query, db, reader=email, replica=replica)
+
+
+async def acreate_user(user_data: dict, db: AsyncSession = None) -> dict:
+    """Create a new user"""
     should_close = False
     if db is None:
-        db = SessionLocal()
+        db = AsyncSessionLocal()
         should_close = True
-    
+
     try:
-        query = db.query(LeaderboardEntryDB)
-        
-        if mode:
-            query = query.filter(LeaderboardEntryDB.mode == GameModeEnum(mode.value))
-        
-        # Sort by score descending
-        entries = query.order_by(LeaderboardEntryDB.score.desc()).limit(limit).all()
-        
-        return [
-            LeaderboardEntry(
-                id=entry.id,
-                username=entry.username,
-                score=entry.score,
-                mode=GameMode(entry.mode.value),
-                timestamp=entry.timestamp
-            )
+        user = UserDB(
+            id=str(uuid.uuid4()),
+            email=user_data["email"],
+            username=user_data["username"],
+            password_hash=user_data["password_hash"]
+        )
+        db.add(user)
+        await db.flush()
+        created = _user_to_dict(user)
+
+        def after_commit():
+            user_cache.invalidate(created["email"])
+            invalidation_bus.publish(USERS_CHANGED, [created["email"]])
+
+        await _acommit(db, after_commit)
+        return created
+    finally:
+        if should_close:
+            await db.close()
+
+
+async def aadd_leaderboard_entry(entry: LeaderboardEntry, db: AsyncSession = None):
+    """Add leaderboard entry"""
+    await aadd_leaderboard_entries([entry], db)
+
+
+async def aadd_leaderboard_entries(entries: List[LeaderboardEntry], db: AsyncSession = None):
+    """Add leaderboard entries with one bulk INSERT and one commit
+
+    The commit is the request's when db is a request session (get_async_db).
+    """
+    if not entries:
+        return
+
+    should_close = False
+    if db is None:
+        db = AsyncSessionLocal()
+        should_close = True
+
+    try:
+        await db.execute(insert(LeaderboardEntryDB), [
+            {
+                "id": entry.id,
+                "username": entry.username,
+                "score": entry.score,
+                "mode": GameModeEnum(entry.mode.value),
+                "timestamp": entry.timestamp
+            }
             for entry in entries
+        ])
+        # Same transaction, so the best scores never disagree with the entries
+        dialect_name = db.bind.dialect.name
+        await db.execute(_best_score_upsert(dialect_name), _best_score_rows(entries))
+        await db.execute(_best_score_upsert(dialect_name, LeaderboardWindowScoreDB), _window_score_rows(entries))
+
+        def after_commit():
+            for entry in entries:
+                leaderboard_cache.add(entry)
+                rank_index.add(entry)
+            resource_versions.bump(LEADERBOARD)
+            _publish_entries(entries)
+
+        await _acommit(db, after_commit)
+    finally:
+        if should_close:
+            await db.close()
+
+
+async def _aget_entries(statement, db: Optional[AsyncSession], reader: Optional[str],
+                        replica: bool) -> List[LeaderboardEntry]:
+    async def query(db: AsyncSession):
+        rows = (await db.execute(statement)).all()
+        return [_entry_from_row(row) for row in rows]
+
+    return await _aread(query, db, reader, replica)
+
+
+async def aget_leaderboard(mode: Optional[GameMode] = None, limit: int = 10, db: AsyncSession = None,
+                           after: Optional[Tuple[int, str]] = None,
+                           reader: Optional[str] = None, replica: bool = True) -> List[LeaderboardEntry]:
+    """Get leaderboard entries, optionally after a (score, id) cursor
+
+    reader is the email of the client asking, if known, for read-your-writes.
+    replica=False reads from the primary, for responses that must match
+    the current version (see ReadRouter.settled).
+    """
+    if after is None:
+        cached = leaderboard_cache.get(mode, limit)
+        if cached is not None:
+            return cached
+
+    return await _aget_entries(_leaderboard_query(mode, limit, after), db, reader, replica)
+
+
+async def aget_best_scores(mode: Optional[GameMode] = None, limit: int = 10, db: AsyncSession = None,
+                           after: Optional[Tuple[int, str]] = None,
+                           reader: Optional[str] = None, replica: bool = True) -> List[LeaderboardEntry]:
+    """Get each user's best entry, optionally after a (score, id) cursor"""
+    return await _aget_entries(_best_scores_query(mode, limit, after), db, reader, replica)
+
+
+async def aget_window_scores(window: LeaderboardWindow, start: date, mode: Optional[GameMode] = None,
+                             limit: int = 10, db: AsyncSession = None,
+                             after: Optional[Tuple[int, str]] = None,
+                             reader: Optional[str] = None, replica: bool = True) -> List[LeaderboardEntry]:
+    """Get each user's best entry in the window starting on start"""
+    return await _aget_entries(_window_scores_query(window, start, mode, limit, after), db, reader, replica)
+
+
+async def aget_player_rank(username: str, mode: Optional[GameMode] = None, neighbors: int = 5,
+                           db: AsyncSession = None, reader: Optional[str] = None) -> PlayerRank:
+    """Rank of a user's best entry and the entries around it"""
+    return await _aread(lambda db: _aplayer_rank(db, username, mode, neighbors), db, reader)
+
+
+async def _aplayer_rank(db: AsyncSession, username: str, mode: Optional[GameMode], neighbors: int) -> PlayerRank:
+    best = select(*_best_score_columns).where(UserBestScoreDB.username == username)
+    if mode:
+        best = best.where(UserBestScoreDB.mode == GameModeEnum(mode.value))
+    row = (await db.execute(
+        best.order_by(UserBestScoreDB.score.desc(), UserBestScoreDB.entry_id.desc()).limit(1)
+    )).first()
+    if row is None:
+        return PlayerRank(rank=None, total=(await _arank(db, mode, 0))[1], entries=[])
+
+    entry = _entry_from_row(row)
+    position = (entry.score, entry.id)
+    above = (await db.execute(_entries_above_query(mode, neighbors, position))).all()
+    below = (await db.execute(_leaderboard_query(mode, neighbors, after=position))).all()
+    nearby = [_entry_from_row(r) for r in reversed(above)] + [entry] + [_entry_from_row(r) for r in below]
+
+    ranks = {}
+    for score in {e.score for e in nearby}:
+        ranks[score], total = await _arank(db, mode, score)
+    return PlayerRank(
+        rank=ranks[entry.score],
+        total=total,
+        entries=[
+            RankedLeaderboardEntry.model_construct(**dict(e), rank=ranks[e.score])
+            for e in nearby
         ]
+    )
+
+
+async def _arank(db: AsyncSession, mode: Optional[GameMode], score: int) -> Tuple[int, int]:
+    # (rank, total) from memory, or counted in SQL before the index is loaded
+    ranked = rank_index.rank(mode, score)
+    if ranked is not None:
+        return ranked
+    query = select(
+        func.count().filter(LeaderboardEntryDB.score > score), func.count()
+    ).select_from(LeaderboardEntryDB)
+    if mode:
+        query = query.where(LeaderboardEntryDB.mode == GameModeEnum(mode.value))
+    higher, total = (await db.execute(query)).one()
+    return higher + 1, total
+
+
+async def resync_rank_index(db: AsyncSession = None):
+    """Recount the entries per mode and score for the rank index"""
+    should_close = False
+    if db is None:
+        db = AsyncSessionLocal()
+        should_close = True
+
+    rank_index.begin_resync()
+    try:
+        rows = (await db.execute(
+            select(LeaderboardEntryDB.mode, LeaderboardEntryDB.score, func.count())
+            .group_by(LeaderboardEntryDB.mode, LeaderboardEntryDB.score)
+        )).all()
+        rank_index.load((GameMode(mode.value), score, count) for mode, score, count in rows)
+    except BaseException:
+        rank_index.cancel_resync()
+        raise
     finally:
         if should_close:
-            db.close()
+            await db.close()
 
 
-def get_active_games(db: Session = None) -> List[ActiveGame]:
+async def resync_leaderboard_cache(db: AsyncSession = None):
+    """Reload the in-memory top-K leaderboard from the database"""
+    should_close = False
+    if db is None:
+        db = AsyncSessionLocal()
+        should_close = True
+
+    leaderboard_cache.begin_resync()
+    try:
+        boards = {}
+        for mode in [None, *GameMode]:
+            rows = (await db.execute(_leaderboard_query(mode, leaderboard_cache.k))).all()
+            boards[mode] = [_entry_from_row(row) for row in rows]
+        leaderboard_cache.load(boards)
+        # May include entries written by other workers
+        resource_versions.bump(LEADERBOARD)
+    except BaseException:
+        leaderboard_cache.cancel_resync()
+        raise
+    finally:
+        if should_close:
+            await db.close()
+
+
+async def aget_active_games(db: AsyncSession = None) -> List[ActiveGame]:
     """Get all active games"""
+    async def query(db: AsyncSession):
+        games = (await db.scalars(select(ActiveGameDB))).all()
+        return [_game_from_db(game) for game in games]
+
+    return await _aread(query, db)
+
+
+async def aget_active_game_rows(db: AsyncSession = None) -> List[dict]:
+    """Get all active games as plain dicts shaped like ActiveGame
+
+    Skips ORM objects and per-segment pydantic models; the result can be
+    serialized directly.
+    """
+    should_close = False
+    if db is None:
+        db = AsyncSessionLocal()
+        should_close = True
+
+    try:
+        rows = (await db.execute(select(*_active_game_columns))).all()
+        return [_game_row_to_dict(row) for row in rows]
+    finally:
+        if should_close:
+            await db.close()
+
+
+async def asave_active_games(games: List[dict], ended: List[str], db: AsyncSession = None):
+    """Write the latest state of some active games and delete ended ones
+
+    games are dicts of ActiveGameDB columns with snake and food already
+    packed; all rows are replaced in a single transaction.
+    """
+    should_close = False
+    if db is None:
+        db = AsyncSessionLocal()
+        should_close = True
+
+    try:
+        stale_ids = [game["id"] for game in games] + list(ended)
+        if stale_ids:
+            await db.execute(delete(ActiveGameDB).where(ActiveGameDB.id.in_(stale_ids)))
+        if games:
+            await db.execute(insert(ActiveGameDB), [
+                {**game, "mode": GameModeEnum(game["mode"])} for game in games
+            ])
+        await db.commit()
+    finally:
+        if should_close:
+            await db.close()
+
+
+def backfill_best_scores(db: Session = None) -> int:
+    """Rebuild user_best_scores from the leaderboard; safe to run again
+
+    Returns the number of rows inserted or raised.
+    """
     should_close = False
     if db is None:
         db = SessionLocal()
         should_close = True
-    
+
     try:
-        games = db.query(ActiveGameDB).all()
-        
-        result = []
-        for game in games:
-            snake_data = json.loads(game.snake)
-            food_data = json.loads(game.food)
-            
-            result.append(ActiveGame(
-                id=game.id,
-                username=game.username,
-                score=game.score,
-                mode=GameMode(game.mode.value),
-                snake=[Point(**point) for point in snake_data],
-                food=Point(**food_data)
-            ))
-        
-        return result
+        entry, better = LeaderboardEntryDB, aliased(LeaderboardEntryDB)
+        best_entries = select(
+            entry.username, entry.mode, entry.score, entry.id, entry.timestamp
+        ).where(~exists().where(
+            better.username == entry.username,
+            better.mode == entry.mode,
+            tuple_(better.score, better.id) > tuple_(entry.score, entry.id)
+        ))
+        statement = _best_score_upsert(db.get_bind().dialect.name).from_select(
+            ["username", "mode", "score", "entry_id", "timestamp"], best_entries
+        )
+        result = db.execute(statement)
+        db.commit()
+        resource_versions.bump(LEADERBOARD)
+        return result.rowcount
     finally:
         if should_close:
             db.close()
@@ -264,16 +1002,13 @@ def _init_fake_data(db: Session = None):
         ]
         
         for game_data in sample_games:
-            snake_json = json.dumps([{"x": p.x, "y": p.y} for p in game_data["snake"]])
-            food_json = json.dumps({"x": game_data["food"].x, "y": game_data["food"].y})
-            
             game = ActiveGameDB(
                 id=str(uuid.uuid4()),
                 username=game_data["username"],
                 score=game_data["score"],
                 mode=GameModeEnum(game_data["mode"].value),
-                snake=snake_json,
-                food=food_json
+                snake=encode_points(game_data["snake"]),
+                food=encode_point(game_data["food"])
             )
             db.add(game)
         
@@ -1,10 +1,30 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, Date, DateTime, LargeBinary, Index, Enum as SQLEnum
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.orm import declarative_base
 from datetime import datetime, timezone
 import enum
 
 Base = declarative_base()
 
+# Alembic head revision these models describe, checked at startup with
+# STARTUP_SCHEMA_MODE=check_revision; bump it with every new migration
+SCHEMA_REVISION = "0005"
+
+
+class UTCDateTime(TypeDecorator):
+    """TIMESTAMP WITHOUT TIME ZONE holding UTC, which also accepts aware datetimes
+
+    psycopg2 and SQLite take aware values, but asyncpg refuses them for a
+    naive column, so they are converted to naive UTC before binding.
+    """
+    impl = DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
 
 class GameModeEnum(str, enum.Enum):
     """Game mode enumeration"""
@@ -12,6 +32,13 @@ class GameModeEnum(str, enum.Enum):
     pass_through = "pass-through"
 
 
+class LeaderboardWindowEnum(str, enum.Enum):
+    """Calendar window of a windowed leaderboard"""
+    day = "day"
+    week = "week"
+    month = "month"
+
+
 class UserDB(Base):
     """User database model"""
     __tablename__ = "users"
@@ -20,7 +47,7 @@ class UserDB(Base):
     email = Column(String, unique=True, nullable=False, index=True)
     username = Column(String, nullable=False)
     password_hash = Column(String, nullable=False)
-    created_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(UTCDateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
 
 
 class LeaderboardEntryDB(Base):
@@ -30,8 +57,69 @@ class LeaderboardEntryDB(Base):
     id = Column(String, primary_key=True, index=True)
     username = Column(String, nullable=False, index=True)
     score = Column(Integer, nullable=False)
-    mode = Column(SQLEnum(GameModeEnum), nullable=False, index=True)
-    timestamp = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    mode = Column(SQLEnum(GameModeEnum), nullable=False)
+    timestamp = Column(UTCDateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    # Leaderboard reads walk these in order instead of sorting
+    __table_args__ = (
+        Index(
+            "ix_leaderboard_mode_score_id", mode, score.desc(), id.desc(),
+            postgresql_include=["username", "timestamp"]
+        ),
+        Index(
+            "ix_leaderboard_score_id", score.desc(), id.desc(),
+            postgresql_include=["mode", "username", "timestamp"]
+        ),
+    )
+
+
+class UserBestScoreDB(Base):
+    """Best leaderboard entry of each user in each game mode"""
+    __tablename__ = "user_best_scores"
+
+    username = Column(String, primary_key=True)
+    mode = Column(SQLEnum(GameModeEnum), primary_key=True)
+    score = Column(Integer, nullable=False)
+    entry_id = Column(String, nullable=False)  # The leaderboard entry with this score
+    timestamp = Column(UTCDateTime, nullable=False)
+
+    # Same order as the leaderboard indexes, with entry_id breaking ties
+    __table_args__ = (
+        Index(
+            "ix_user_best_scores_mode_score_entry", mode, score.desc(), entry_id.desc(),
+            postgresql_include=["username", "timestamp"]
+        ),
+        Index(
+            "ix_user_best_scores_score_entry", score.desc(), entry_id.desc(),
+            postgresql_include=["mode", "username", "timestamp"]
+        ),
+    )
+
+
+class LeaderboardWindowScoreDB(Base):
+    """Best leaderboard entry of each user per game mode in each calendar window"""
+    __tablename__ = "leaderboard_windows"
+
+    period = Column(SQLEnum(LeaderboardWindowEnum), primary_key=True)
+    period_start = Column(Date, primary_key=True)  # UTC day, Monday of the week or first of the month
+    username = Column(String, primary_key=True)
+    mode = Column(SQLEnum(GameModeEnum), primary_key=True)
+    score = Column(Integer, nullable=False)
+    entry_id = Column(String, nullable=False)
+    timestamp = Column(UTCDateTime, nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_leaderboard_windows_mode_score_entry",
+            period, period_start, mode, score.desc(), entry_id.desc(),
+            postgresql_include=["username", "timestamp"]
+        ),
+        Index(
+            "ix_leaderboard_windows_score_entry",
+            period, period_start, score.desc(), entry_id.desc(),
+            postgresql_include=["mode", "username", "timestamp"]
+        ),
+    )
 
 
 class ActiveGameDB(Base):
@@ -42,6 +130,6 @@ class ActiveGameDB(Base):
     username = Column(String, nullable=False, index=True)
     score = Column(Integer, nullable=False)
     mode = Column(SQLEnum(GameModeEnum), nullable=False)
-    snake = Column(Text, nullable=False)  # JSON string of snake positions
-    food = Column(Text, nullable=False)   # JSON string of food position
-    updated_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    snake = Column(LargeBinary, nullable=False)  # Packed int16 (x, y) pairs, see app.game_codec
+    food = Column(LargeBinary, nullable=False)   # Packed int16 (x, y) pair
+    updated_at = Column(UTCDateTime, nullable=False, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
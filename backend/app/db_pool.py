@@ -0,0 +1,89 @@
+"""Connection pool instrumentation
+
+Every request checks out a pooled connection, so time spent waiting for one
+is added straight to request latency. The pool classes here time each
+checkout, including waits for a connection to be returned, and pool events
+count checkouts, checkins, new connections and invalidations. Together with
+the pool's own size/in-use/overflow counts this is what the readiness
+endpoint reports, to size the pool against real traffic.
+"""
+import threading
+import time
+
+from sqlalchemy import event, exc
+
+
+class PoolMetrics:
+    """Checkout wait times and connection lifecycle counts of one pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+
+    def observe_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def listen(self, pool):
+        """Count pool events of a pool (carried over when it is recreated)"""
+        event.listen(pool, "checkout", lambda *args: self._count("checkouts"))
+        event.listen(pool, "checkin", lambda *args: self._count("checkins"))
+        event.listen(pool, "connect", lambda *args: self._count("connects"))
+        event.listen(pool, "invalidate", lambda *args: self._count("invalidations"))
+
+    def stats(self, pool) -> dict:
+        """Snapshot of the pool's occupancy and these counters"""
+        with self._lock:
+            return {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+                "idle": pool.checkedin(),
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_seconds_total,
+                "max_wait_seconds": self.max_wait_seconds,
+            }
+
+
+class _TimedCheckout:
+    # Mixed into the queue pools; metrics is set on the class by instrumented()
+    metrics: PoolMetrics
+
+    def connect(self):
+        # Includes waiting for a free connection, opening a new one and the
+        # pre-ping, i.e. everything a request waits for before its query
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.observe_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.observe_wait(time.perf_counter() - start)
+        return connection
+
+
+def instrumented(pool_class, metrics: PoolMetrics):
+    """Subclass of a queue pool class that times checkouts into metrics
+
+    A class rather than an attribute on the pool instance, so pools the
+    engine recreates (e.g. after dispose()) keep reporting.
+    """
+    return type(f"Instrumented{pool_class.__name__}", (_TimedCheckout, pool_class), {"metrics": metrics})
+
@@ -0,0 +1,278 @@
+"""Invalidation bus between worker processes
+
+Each worker keeps its own caches (users, top-K leaderboard, rank counts),
+and updates them itself when it writes. Other workers learn about the
+write from the bus: the writer publishes a small JSON event after commit,
+every other process subscribed to the topic applies it to its caches, and
+the publisher ignores its own event.
+
+Backends:
+
+    InProcessBackend  delivers to the other buses attached to the same
+                      backend object; with one worker there are none. Tests
+                      attach a second bus to stand in for another worker.
+    PostgresBackend   LISTEN/NOTIFY on the application database, over one
+                      asyncpg connection opened in the application lifespan.
+
+Delivery is best effort: an event is lost if its publisher dies between
+commit and NOTIFY, or while a listener is reconnecting. After reconnecting,
+a worker's RESYNC subscribers are told to reload what they may have missed,
+and if one of its own events failed to send, the other workers get a RESYNC
+too. NOTIFY payloads are limited to 8000 bytes; publishers keep their events
+below MAX_MESSAGE_BYTES, and one that is still larger is replaced by a RESYNC
+for the other workers.
+"""
+import asyncio
+import json
+import secrets
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config import settings
+
+# Topics
+USERS_CHANGED = "users-changed"  # payload: list of emails
+SCORES_ADDED = "scores-added"  # payload: list of [id, username, score, mode, timestamp]
+RESYNC = "resync"  # delivered locally when events may have been missed
+
+MAX_MESSAGE_BYTES = 7999
+
+
+class InvalidationBus:
+    """Topic-based publish/subscribe between processes, skipping the sender"""
+
+    def __init__(self, backend):
+        self.origin = secrets.token_hex(8)
+        self.backend = backend
+        self._handlers: Dict[str, List[Callable[[Any], None]]] = defaultdict(list)
+        self._lock = threading.Lock()
+        backend.attach(self)
+
+        # Metrics
+        self.published = 0
+        self.received = 0
+        self.handler_errors = 0
+
+    def subscribe(self, topic: str, handler: Callable[[Any], None]):
+        """Call handler(payload) for every event on topic from another process"""
+        with self._lock:
+            self._handlers[topic].append(handler)
+
+    def publish(self, topic: str, payload: Any):
+        """Send a JSON-serializable payload to the other processes; never blocks"""
+        with self._lock:
+            self.published += 1
+        self.backend.send(self, json.dumps({"origin": self.origin, "topic": topic, "payload": payload}))
+
+    def deliver(self, message: str):
+        """Run the handlers for a message received by the backend"""
+        event = json.loads(message)
+        if event["origin"] == self.origin:
+            return
+        with self._lock:
+            self.received += 1
+        self._dispatch(event["topic"], event["payload"])
+
+    def resync(self):
+        """Tell RESYNC subscribers that events may have been missed"""
+        self._dispatch(RESYNC, None)
+
+    def _dispatch(self, topic: str, payload: Any):
+        with self._lock:
+            handlers = list(self._handlers.get(topic, ()))
+        for handler in handlers:
+            try:
+                handler(payload)
+            except Exception as e:
+                with self._lock:
+                    self.handler_errors += 1
+                print(f"⚠️  Invalidation handler for {topic} failed: {e}")
+
+    async def start(self):
+        await self.backend.start()
+
+    async def stop(self):
+        await self.backend.stop()
+
+    def stats(self) -> dict:
+        """Snapshot of event counters, including the backend's"""
+        with self._lock:
+            return {
+                "published": self.published,
+                "received": self.received,
+                "handler_errors": self.handler_errors,
+                **self.backend.stats(),
+            }
+
+
+class InProcessBackend:
+    """Delivers synchronously to the other buses attached to this object"""
+
+    def __init__(self):
+        self._buses: List[InvalidationBus] = []
+
+    def attach(self, bus: InvalidationBus):
+        self._buses.append(bus)
+
+    def detach(self, bus: InvalidationBus):
+        self._buses.remove(bus)
+
+    def send(self, sender: InvalidationBus, message: str):
+        for bus in list(self._buses):
+            if bus is not sender:
+                bus.deliver(message)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": "local", "connected": True}
+
+
+class PostgresBackend:
+    """LISTEN/NOTIFY on one channel, over a dedicated asyncpg connection
+
+    send() may be called from any thread; messages are queued and sent by a
+    task on the event loop that called start(). Until then, and after
+    stop(), messages are dropped.
+    """
+
+    def __init__(self, dsn: str, channel: str, reconnect_seconds: float = 1.0):
+        self.dsn = dsn
+        self.channel = channel
+        self.reconnect_seconds = reconnect_seconds
+        self.bus: Optional[InvalidationBus] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Event] = None
+        self.connected = False
+        self._lost = False  # an event failed to send; the others get a RESYNC on reconnecting
+
+        # Metrics
+        self.sent = 0
+        self.dropped = 0
+        self.oversized = 0
+        self.reconnects = 0
+
+    def attach(self, bus: InvalidationBus):
+        self.bus = bus
+
+    def send(self, sender: InvalidationBus, message: str):
+        size = len(message.encode())
+        if size > MAX_MESSAGE_BYTES:
+            self.oversized += 1
+            print(f"⚠️  Invalidation event of {size} bytes is too large for NOTIFY, sending a resync instead")
+            message = self._resync_message()
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            self.dropped += 1
+            return
+        loop.call_soon_threadsafe(self._queue.put_nowait, message)
+
+    def _resync_message(self) -> str:
+        return json.dumps({"origin": self.bus.origin, "topic": RESYNC, "payload": None})
+
+    def _on_notify(self, connection, pid, channel, payload):
+        self.bus.deliver(payload)
+
+    async def start(self):
+        """Connect and listen; returns once listening, or raises if the first connection fails"""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._ready = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        ready = asyncio.create_task(self._ready.wait())
+        done, _ = await asyncio.wait({ready, self._task}, return_when=asyncio.FIRST_COMPLETED)
+        if self._task in done:
+            ready.cancel()
+            self._task.result()
+
+    async def stop(self, timeout: float = 1.0):
+        """Send what is queued, then disconnect"""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._loop = None
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self):
+        import asyncpg
+
+        first = True
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                await connection.add_listener(self.channel, self._on_notify)
+                self.connected = True
+                if not first:
+                    self.reconnects += 1
+                    self.bus.resync()
+                if self._lost:
+                    await connection.execute("SELECT pg_notify($1, $2)", self.channel, self._resync_message())
+                    self._lost = False
+                first = False
+                self._ready.set()
+                while True:
+                    try:
+                        message = await asyncio.wait_for(self._queue.get(), self.reconnect_seconds * 5)
+                    except asyncio.TimeoutError:
+                        if connection.is_closed():
+                            raise ConnectionError("listener connection closed") from None
+                        continue
+                    try:
+                        await connection.execute("SELECT pg_notify($1, $2)", self.channel, message)
+                        self.sent += 1
+                    except Exception:
+                        self.dropped += 1
+                        self._lost = True
+                        raise
+                    finally:
+                        self._queue.task_done()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if first:
+                    raise
+                print(f"⚠️  Invalidation listener lost its connection: {e}")
+            finally:
+                self.connected = False
+                if connection is not None:
+                    try:
+                        await connection.close(timeout=self.reconnect_seconds)
+                    except Exception:
+                        connection.terminate()
+            await asyncio.sleep(self.reconnect_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "postgres",
+            "connected": self.connected,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "oversized": self.oversized,
+            "reconnects": self.reconnects,
+        }
+
+
+def _backend():
+    name = settings.invalidation_backend
+    if name == "auto":
+        name = "postgres" if settings.database_url.startswith("postgresql://") else "local"
+    if name == "postgres":
+        return PostgresBackend(settings.database_url, settings.invalidation_channel)
+    return InProcessBackend()
+
+
+# Global bus, started in the application lifespan
+invalidation_bus = InvalidationBus(_backend())
@@ -0,0 +1,56 @@
+"""Compact binary encoding of board positions
+
+Snake segments and food positions are stored as packed little-endian int16
+(x, y) pairs: 4 bytes per point instead of roughly 17 bytes of JSON. Plain
+coordinate deltas would be smaller still, but pass-through mode wraps the
+snake around the board edges, so absolute coordinates are kept.
+"""
+import sys
+from array import array
+from typing import Iterable, List, Union
+
+from app.models import Point
+
+PointLike = Union[Point, dict]
+
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def encode_points(points: Iterable[PointLike]) -> bytes:
+    """Pack points into int16 (x, y) pairs"""
+    flat = array("h")
+    for point in points:
+        if isinstance(point, dict):
+            flat.append(point["x"])
+            flat.append(point["y"])
+        else:
+            flat.append(point.x)
+            flat.append(point.y)
+    if _BIG_ENDIAN:
+        flat.byteswap()
+    return flat.tobytes()
+
+
+def encode_point(point: PointLike) -> bytes:
+    """Pack a single point"""
+    return encode_points([point])
+
+
+def _unpack(data: bytes) -> array:
+    flat = array("h")
+    flat.frombytes(data)
+    if _BIG_ENDIAN:
+        flat.byteswap()
+    return flat
+
+
+def decode_points(data: bytes) -> List[dict]:
+    """Unpack points as plain {"x", "y"} dicts, ready to serialize"""
+    values = iter(_unpack(data))
+    return [{"x": x, "y": y} for x, y in zip(values, values)]
+
+
+def decode_point(data: bytes) -> dict:
+    """Unpack a single point as a plain dict"""
+    x, y = _unpack(data)
+    return {"x": x, "y": y}
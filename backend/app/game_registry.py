@@ -0,0 +1,253 @@
+"""In-memory registry of active games
+
+Clients push their game state many times a second. Each push only replaces
+the game's entry in memory (last write wins); the database is written by a
+periodic checkpoint that saves every game changed since the previous one in
+a single transaction, so ten updates a second cost one row write every few
+seconds. Reads of the active games, including the spectator stream, are
+served from memory.
+
+The registry belongs to one process: with several workers, a game's
+updates and the reads that should see them have to reach the same worker.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from app.config import settings
+from app.database import asave_active_games
+from app.game_codec import encode_points, encode_point, decode_points, decode_point
+from app.versioning import resource_versions, ACTIVE_GAMES
+
+
+class GameState:
+    """Latest known state of one game, kept small as there can be many"""
+
+    __slots__ = ("id", "username", "score", "mode", "snake", "food", "last_seen")
+
+    def __init__(self, game_id: str, username: str, score: int, mode: str,
+                 snake: bytes, food: bytes, last_seen: float):
+        self.id = game_id
+        self.username = username
+        self.score = score
+        self.mode = mode
+        self.snake = snake  # Packed with app.game_codec
+        self.food = food
+        self.last_seen = last_seen  # clock time of the last update, or of loading
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "username": self.username,
+            "score": self.score,
+            "mode": self.mode,
+            "snake": decode_points(self.snake),
+            "food": decode_point(self.food),
+        }
+
+
+class _Shard:
+    __slots__ = ("games", "dirty", "ended", "lock")
+
+    def __init__(self):
+        self.games: Dict[str, GameState] = {}
+        self.dirty: Set[str] = set()  # changed since the last checkpoint
+        self.ended: Set[str] = set()  # to delete at the next checkpoint
+        self.lock = threading.Lock()
+
+
+class GameRegistry:
+    """Active games sharded by id, checkpointed to the database"""
+
+    def __init__(
+        self,
+        shards: int = 16,
+        timeout: float = 60.0,
+        saver: Callable[[List[dict], List[str]], Awaitable[None]] = asave_active_games,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.timeout = timeout
+        self._shards = [_Shard() for _ in range(shards)]
+        self._saver = saver
+        self._clock = clock
+
+        # Metrics
+        self.updates = 0
+        self.coalesced = 0
+        self.expired = 0
+        self.checkpoints = 0
+        self.checkpoint_failures = 0
+        self.rows_saved = 0
+        self.rows_deleted = 0
+        self.max_checkpoint_seconds = 0.0
+
+    def _shard(self, game_id: str) -> _Shard:
+        return self._shards[hash(game_id) % len(self._shards)]
+
+    def update(self, game_id: str, username: str, score: int, mode: str, snake, food) -> bool:
+        """Record the latest state of a game
+
+        Returns False, changing nothing, if the game belongs to another user.
+        """
+        shard = self._shard(game_id)
+        with shard.lock:
+            game = shard.games.get(game_id)
+            if game is not None and game.username != username:
+                return False
+            state = GameState(game_id, username, score, mode,
+                              encode_points(snake), encode_point(food), self._clock())
+            shard.games[game_id] = state
+            if game_id in shard.dirty:
+                self.coalesced += 1
+            shard.dirty.add(game_id)
+            shard.ended.discard(game_id)
+            self.updates += 1
+        resource_versions.bump(ACTIVE_GAMES)
+        return True
+
+    def end(self, game_id: str, username: str) -> bool:
+        """Remove a finished game; False if it belongs to another user"""
+        shard = self._shard(game_id)
+        with shard.lock:
+            game = shard.games.get(game_id)
+            if game is not None and game.username != username:
+                return False
+            self._remove(shard, game_id)
+        resource_versions.bump(ACTIVE_GAMES)
+        return True
+
+    def _remove(self, shard: _Shard, game_id: str):
+        shard.games.pop(game_id, None)
+        shard.dirty.discard(game_id)
+        shard.ended.add(game_id)
+
+    def get(self, game_id: str) -> Optional[dict]:
+        shard = self._shard(game_id)
+        with shard.lock:
+            game = shard.games.get(game_id)
+            return game.to_dict() if game else None
+
+    def rows(self) -> List[dict]:
+        """Every active game as a dict shaped like ActiveGame"""
+        games = []
+        for shard in self._shards:
+            with shard.lock:
+                games.extend(shard.games.values())
+        return [game.to_dict() for game in games]
+
+    def load(self, games: Iterable[dict]):
+        """Add games read from the database at startup
+
+        They count as seen when loaded: one the client keeps playing stays,
+        one abandoned while the server was down expires a timeout later.
+        """
+        now = self._clock()
+        for row in games:
+            shard = self._shard(row["id"])
+            with shard.lock:
+                if row["id"] not in shard.games:
+                    shard.games[row["id"]] = GameState(
+                        row["id"], row["username"], row["score"], row["mode"],
+                        encode_points(row["snake"]), encode_point(row["food"]), now
+                    )
+        resource_versions.bump(ACTIVE_GAMES)
+
+    def _expire(self):
+        # Games whose client stopped pushing without ending them
+        if self.timeout <= 0:
+            return
+        deadline = self._clock() - self.timeout
+        for shard in self._shards:
+            with shard.lock:
+                stale = [game_id for game_id, game in shard.games.items() if game.last_seen < deadline]
+                for game_id in stale:
+                    self._remove(shard, game_id)
+                self.expired += len(stale)
+            if stale:
+                resource_versions.bump(ACTIVE_GAMES)
+
+    async def checkpoint(self):
+        """Write games changed, ended or expired since the last checkpoint"""
+        self._expire()
+        now = datetime.now(timezone.utc)
+        saved, ended = [], []
+        for shard in self._shards:
+            with shard.lock:
+                for game_id in shard.dirty:
+                    game = shard.games[game_id]
+                    saved.append({
+                        "id": game.id,
+                        "username": game.username,
+                        "score": game.score,
+                        "mode": game.mode,
+                        "snake": game.snake,
+                        "food": game.food,
+                        "updated_at": now,
+                    })
+                ended.extend(shard.ended)
+                shard.dirty, shard.ended = set(), set()
+        if not saved and not ended:
+            return
+
+        start = time.perf_counter()
+        try:
+            await self._saver(saved, ended)
+        except BaseException:
+            # Failed or cancelled at shutdown: keep the changes for the next
+            # checkpoint, unless superseded in the meantime
+            self.checkpoint_failures += 1
+            for row in saved:
+                shard = self._shard(row["id"])
+                with shard.lock:
+                    if row["id"] in shard.games:
+                        shard.dirty.add(row["id"])
+            for game_id in ended:
+                shard = self._shard(game_id)
+                with shard.lock:
+                    if game_id not in shard.games:
+                        shard.ended.add(game_id)
+            raise
+
+        elapsed = time.perf_counter() - start
+        self.checkpoints += 1
+        self.rows_saved += len(saved)
+        self.rows_deleted += len(ended)
+        self.max_checkpoint_seconds = max(self.max_checkpoint_seconds, elapsed)
+
+    def clear(self):
+        """Forget every game without touching the database"""
+        for shard in self._shards:
+            with shard.lock:
+                shard.games.clear()
+                shard.dirty.clear()
+                shard.ended.clear()
+        resource_versions.bump(ACTIVE_GAMES)
+
+    def stats(self) -> dict:
+        """Snapshot of registry size and update/checkpoint counters"""
+        pending = 0
+        games = 0
+        for shard in self._shards:
+            with shard.lock:
+                games += len(shard.games)
+                pending += len(shard.dirty) + len(shard.ended)
+        return {
+            "games": games,
+            "pending_writes": pending,
+            "updates": self.updates,
+            "coalesced": self.coalesced,
+            "expired": self.expired,
+            "checkpoints": self.checkpoints,
+            "checkpoint_failures": self.checkpoint_failures,
+            "rows_saved": self.rows_saved,
+            "rows_deleted": self.rows_deleted,
+            "max_checkpoint_seconds": self.max_checkpoint_seconds,
+        }
+
+
+# Global registry, loaded and checkpointed by the application lifespan
+game_registry = GameRegistry(
+    shards=settings.active_game_shards,
+    timeout=settings.active_game_timeout_seconds,
+)
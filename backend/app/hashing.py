@@ -0,0 +1,189 @@
+"""Dedicated executor for password hashing
+
+argon2 is deliberately CPU-expensive, so hashing and verification run in a
+process pool instead of on the event loop. Jobs that cannot start right away
+wait in a bounded priority queue, which lets logins overtake queued signups
+when the pool is saturated.
+"""
+import asyncio
+import enum
+import functools
+import heapq
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from app.config import settings
+
+
+class HashPriority(enum.IntEnum):
+    """Queue priority of a hashing job (lower runs first)"""
+    login = 0
+    signup = 1
+
+
+class HashingQueueFull(Exception):
+    """Raised when the hashing queue has no room for another job"""
+
+
+@functools.lru_cache(maxsize=None)
+def _pwd_context():
+    # passlib and argon2 are imported on first use, not at startup
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["argon2"], deprecated="auto")
+
+
+def _verify_password(plain_password, hashed_password):
+    return _pwd_context().verify(plain_password, hashed_password)
+
+
+def _hash_password(password):
+    return _pwd_context().hash(password)
+
+
+class HashingExecutor:
+    """Process pool with a bounded priority queue in front of it"""
+
+    def __init__(self, max_workers: int = 0, max_queue: int = 256):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pool_lock = threading.Lock()
+        self._pool_broken = False
+        self._queue = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+
+        # Metrics
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.max_queue_depth = 0
+        self.wait_seconds_total = 0.0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None or self._pool_broken:
+                self._pool_broken = False
+                # fork is unsafe once the server has started threads
+                methods = multiprocessing.get_all_start_methods()
+                method = "forkserver" if "forkserver" in methods else "spawn"
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(method),
+                )
+            return self._pool
+
+    def submit(self, priority: HashPriority, fn, *args) -> Future:
+        """Queue a job and return a future for its result"""
+        future = Future()
+        with self._lock:
+            if self._in_flight >= self.max_workers and len(self._queue) >= self.max_queue:
+                self.rejected += 1
+                raise HashingQueueFull(
+                    f"Hashing queue is full ({self.max_queue} jobs waiting)"
+                )
+
+            self.submitted += 1
+            heapq.heappush(
+                self._queue,
+                (priority, next(self._sequence), time.perf_counter(), future, fn, args),
+            )
+            ready = self._take_ready()
+            self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+
+        # The pool is never called with the lock held: its callbacks need it
+        self._dispatch(ready)
+        return future
+
+    async def run(self, priority: HashPriority, fn, *args):
+        """Run a job in the pool and await its result"""
+        return await asyncio.wrap_future(self.submit(priority, fn, *args))
+
+    def _take_ready(self) -> list:
+        """Pop as many jobs as there are free workers; lock must be held"""
+        ready = []
+        while self._queue and self._in_flight < self.max_workers:
+            _, _, queued_at, future, fn, args = heapq.heappop(self._queue)
+            if not future.set_running_or_notify_cancel():
+                # The caller went away while the job was queued
+                continue
+            self._in_flight += 1
+            self.wait_seconds_total += time.perf_counter() - queued_at
+            ready.append((future, fn, args))
+        return ready
+
+    def _dispatch(self, ready: list):
+        for future, fn, args in ready:
+            try:
+                job = self._get_pool().submit(fn, *args)
+            except BrokenProcessPool as e:
+                self._reset_pool()
+                self._finish(future, None, e)
+            else:
+                job.add_done_callback(lambda job, future=future: self._finish(future, job))
+
+    def _finish(self, future: Future, job: Optional[Future], error: Optional[BaseException] = None):
+        with self._lock:
+            self._in_flight -= 1
+            self.completed += 1
+            ready = self._take_ready()
+        self._dispatch(ready)
+
+        if job is not None:
+            if job.cancelled():
+                error = BrokenProcessPool("Hashing pool was shut down")
+            else:
+                error = job.exception()
+        if isinstance(error, BrokenProcessPool):
+            self._reset_pool()
+
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(job.result())
+
+    def _reset_pool(self):
+        # A broken pool tears itself down. This may run on its manager
+        # thread, where releasing the pool would deadlock, so the next
+        # _get_pool() call replaces it instead.
+        self._pool_broken = True
+
+    def stats(self) -> dict:
+        """Snapshot of queue depth and throughput counters"""
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "in_flight": self._in_flight,
+                "queue_depth": len(self._queue),
+                "max_queue_depth": self.max_queue_depth,
+                "queue_capacity": self.max_queue,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_seconds_total": self.wait_seconds_total,
+            }
+
+    def shutdown(self):
+        """Stop the worker processes, waiting for running jobs"""
+        with self._lock:
+            queued, self._queue = self._queue, []
+        for _, _, _, future, _, _ in queued:
+            future.cancel()
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+
+# Global hashing executor, the pool itself is started on first use
+hashing_executor = HashingExecutor(
+    max_workers=settings.hash_workers,
+    max_queue=settings.hash_queue_size,
+)
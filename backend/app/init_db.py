@@ -1,23 +1,73 @@
-"""Initialize the database with tables and optional seed data"""
-from app.database import init_db, _init_fake_data
+"""Initialize the database with tables and optional seed data
+
+Usage:
+    python -m app.init_db [--seed] [--backfill-best-scores]
+    python -m app.init_db --generate --users 1000000 --scores 10000000 --games 5000
+        [--distribution exponential|lognormal|uniform] [--mean-score 500]
+        [--activity-skew 2] [--days 90] [--batch-size 10000] [--random-seed 1]
+"""
+import argparse
+
+from app.database import init_db, _init_fake_data, backfill_best_scores
 from app.config import settings
-import sys
+from app.seed import generate_data, DISTRIBUTIONS
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", action="store_true", help="add a few sample users, scores and games")
+    parser.add_argument("--backfill-best-scores", action="store_true",
+                        help="fill user_best_scores from scores added before it existed")
+
+    generate = parser.add_argument_group("synthetic data at scale")
+    generate.add_argument("--generate", action="store_true", help="bulk insert generated data")
+    generate.add_argument("--users", type=int, default=100000)
+    generate.add_argument("--scores", type=int, default=1000000)
+    generate.add_argument("--games", type=int, default=1000, help="active games, one per user")
+    generate.add_argument("--distribution", choices=DISTRIBUTIONS, default="exponential", help="of scores")
+    generate.add_argument("--mean-score", type=float, default=500)
+    generate.add_argument("--activity-skew", type=float, default=2.0,
+                          help="1 gives every player as many scores, higher gives a few players most")
+    generate.add_argument("--walls-share", type=float, default=0.5, help="fraction of scores in walls mode")
+    generate.add_argument("--days", type=int, default=90, help="scores are spread over this many days")
+    generate.add_argument("--batch-size", type=int, default=10000)
+    generate.add_argument("--random-seed", type=int, help="for reproducible data")
+    generate.add_argument("--password", default="password123", help="of every generated user")
+    return parser.parse_args(argv)
 
 
-def main():
+def main(argv=None):
     """Initialize database and optionally seed with fake data"""
+    args = parse_args(argv)
     print(f"Initializing database at: {settings.database_url}")
-    
+
     # Create tables
     init_db()
     print("✓ Database tables created")
-    
+
     # Seed with fake data if requested
-    if "--seed" in sys.argv:
+    if args.seed:
         print("Seeding database with fake data...")
         _init_fake_data()
         print("✓ Fake data added")
-    
+
+    if args.generate:
+        print(f"Generating {args.users:,} users, {args.scores:,} scores and {args.games:,} active games...")
+        rows = generate_data(
+            args.users, args.scores, args.games, distribution=args.distribution, mean_score=args.mean_score,
+            activity_skew=args.activity_skew, walls_share=args.walls_share, days=args.days,
+            batch_size=args.batch_size, seed=args.random_seed, password=args.password, report=print,
+        )
+        for table, (count, seconds) in rows.items():
+            print(f"  {table:<20}{count:>12,} rows  {count / max(seconds, 1e-9):>12,.0f} rows/s written")
+        print("✓ Synthetic data added")
+
+    # Fill user_best_scores from scores added before it existed
+    if args.backfill_best_scores:
+        print("Backfilling best scores per user...")
+        rows = backfill_best_scores()
+        print(f"✓ {rows} best scores updated")
+
     print("\nDatabase initialization complete!")
 
 
@@ -0,0 +1,114 @@
+"""In-memory top-K leaderboard
+
+Keeps the best K entries per game mode, and across all modes, so the most
+common leaderboard reads are answered without SQL. Boards are loaded from the
+database at startup, updated as scores are submitted, and periodically
+resynced so entries written by other workers show up.
+"""
+import bisect
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from app.config import settings
+from app.models import LeaderboardEntry, GameMode
+
+
+def _sort_key(entry: LeaderboardEntry):
+    # Same order as the SQL query: score, then id
+    return (entry.score, entry.id)
+
+
+class TopKLeaderboard:
+    """Best K entries per game mode, plus a board for all modes (key None)"""
+
+    def __init__(self, k: int):
+        self.k = k
+        self.loaded = False
+        self._boards: Dict[Optional[GameMode], List[LeaderboardEntry]] = {}
+        self._lock = threading.Lock()
+        self._replay: Optional[List[LeaderboardEntry]] = None
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+
+    def begin_resync(self):
+        """Start recording entries added while a reload is being read"""
+        with self._lock:
+            self._replay = []
+
+    def cancel_resync(self):
+        """Stop recording after a reload failed"""
+        with self._lock:
+            self._replay = None
+
+    def load(self, boards: Dict[Optional[GameMode], Iterable[LeaderboardEntry]]):
+        """Replace every board with the best entries read from the database
+
+        Each board must hold the top K entries of its mode (or all of them
+        when there are fewer). Entries added since begin_resync() are
+        applied again so they are not lost to the reload.
+        """
+        fresh = {
+            mode: sorted(entries, key=_sort_key)[-self.k:]
+            for mode, entries in boards.items()
+        }
+        with self._lock:
+            replay, self._replay = self._replay or [], None
+            self._boards = fresh
+            for entry in replay:
+                self._add(entry)
+            self.loaded = True
+
+    def add(self, entry: LeaderboardEntry):
+        """Insert a new entry if it makes the top K of its boards"""
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append(entry)
+            if self.loaded:
+                self._add(entry)
+
+    def _add(self, entry: LeaderboardEntry):
+        key = _sort_key(entry)
+        for mode in (entry.mode, None):
+            board = self._boards.setdefault(mode, [])
+            if len(board) >= self.k and key <= _sort_key(board[0]):
+                continue
+            index = bisect.bisect_left(board, key, key=_sort_key)
+            if index < len(board) and board[index].id == entry.id:
+                # Already present, e.g. replayed after a reload that saw it
+                continue
+            board.insert(index, entry)
+            if len(board) > self.k:
+                del board[0]
+
+    def get(self, mode: Optional[GameMode], limit: int) -> Optional[List[LeaderboardEntry]]:
+        """Get the top entries, or None if they cannot be answered from memory"""
+        with self._lock:
+            if not self.loaded or limit > self.k:
+                self.misses += 1
+                return None
+            self.hits += 1
+            board = self._boards.get(mode, [])
+            return board[:-limit - 1:-1] if board else []
+
+    def clear(self):
+        """Forget every board until the next load"""
+        with self._lock:
+            self._boards = {}
+            self.loaded = False
+
+    def stats(self) -> dict:
+        """Snapshot of board sizes and hit/miss counters"""
+        with self._lock:
+            return {
+                "loaded": self.loaded,
+                "k": self.k,
+                "sizes": {str(mode.value if mode else "all"): len(b) for mode, b in self._boards.items()},
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# Global top-K leaderboard, loaded in the application lifespan
+leaderboard_cache = TopKLeaderboard(settings.leaderboard_cache_size)
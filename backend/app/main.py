@@ -1,20 +1,52 @@
+# First, so the import time of everything else is measured
+from app.startup import startup_timer
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
-from app.routers import auth, leaderboard, games
-from app.database import init_db, _init_fake_data
+import asyncio
+from app.routers import auth, leaderboard, games, health, metrics
+from app.database import (
+    init_db, acheck_schema_revision, awarm_pool, async_read_engine, _init_fake_data, resync_leaderboard_cache,
+    resync_rank_index, aget_active_game_rows, pool_stats,
+)
+from app.game_registry import game_registry
+from app.hashing import hashing_executor
+from app.write_behind import score_writer
+from app.cache import user_cache
+from app.rate_limit import auth_rate_limiter
+from app.leaderboard_cache import leaderboard_cache
+from app.rankings import rank_index
+from app.replica import read_router
+from app.spectator import spectator_hub
+from app.versioning import resource_versions
+from app.events import invalidation_bus
+from app.metrics import MetricsMiddleware, register_collector
 from app.config import settings
 
 
+async def _run_periodically(interval: float, job, name: str):
+    """Run a coroutine function every interval seconds until cancelled"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await job()
+        except Exception as e:
+            print(f"⚠️  {name} failed: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events"""
-    # Startup: Initialize database
+    # Startup: Initialize database, or only check it is migrated
     try:
-        print(f"Initializing database at: {settings.database_url}")
-        init_db()
-        print("✓ Database initialized - tables created successfully")
+        with startup_timer.phase("schema"):
+            if settings.startup_schema_mode == "check_revision":
+                revision = await acheck_schema_revision()
+                print(f"✓ Database schema is at revision {revision}")
+            else:
+                print(f"Initializing database at: {settings.database_url}")
+                init_db()
+                print("✓ Database initialized - tables created successfully")
     except Exception as e:
         print(f"❌ Database initialization failed: {e}")
         print(f"Error type: {type(e).__name__}")
@@ -22,18 +54,69 @@ async def lifespan(app: FastAPI):
         traceback.print_exc()
         raise  # Re-raise to prevent app from starting with broken DB
     
+    # Open pool connections now rather than during the first requests
+    if settings.startup_warm_connections > 0:
+        with startup_timer.phase("warm_pool"):
+            opened = await awarm_pool(settings.startup_warm_connections)
+            if async_read_engine is not None:
+                try:
+                    opened += await awarm_pool(settings.startup_warm_connections, async_read_engine)
+                except Exception as e:
+                    print(f"⚠️  Failed to open read replica connections: {e}")
+        print(f"✓ {opened} database connections opened")
+    
     # Seed with fake data in debug mode
     if settings.debug:
         print("Debug mode: Seeding database with fake data...")
         try:
-            _init_fake_data()
+            with startup_timer.phase("fake_data"):
+                _init_fake_data()
             print("✓ Fake data added")
         except Exception as e:
             print(f"⚠️  Failed to add fake data: {e}")
     
+    # Listen for other workers' writes before loading the caches they change
+    with startup_timer.phase("invalidation_bus"):
+        await invalidation_bus.start()
+    # Load the in-memory leaderboard and keep it in sync with other workers
+    with startup_timer.phase("leaderboard_cache"):
+        await resync_leaderboard_cache()
+    print("✓ Leaderboard cache loaded")
+    with startup_timer.phase("rank_index"):
+        await resync_rank_index()
+    print("✓ Rank index loaded")
+    score_writer.start()
+    # Active games are served from memory and written back periodically
+    with startup_timer.phase("active_games"):
+        game_registry.load(await aget_active_game_rows())
+    background_tasks = [asyncio.create_task(_run_periodically(
+        settings.active_game_checkpoint_seconds, game_registry.checkpoint, "Active game checkpoint"
+    ))]
+    if settings.leaderboard_resync_seconds > 0:
+        background_tasks.append(asyncio.create_task(_run_periodically(
+            settings.leaderboard_resync_seconds, resync_leaderboard_cache, "Leaderboard resync"
+        )))
+    if settings.rank_resync_seconds > 0:
+        background_tasks.append(asyncio.create_task(_run_periodically(
+            settings.rank_resync_seconds, resync_rank_index, "Rank index resync"
+        )))
+    
+    startup_timer.ready()
+    print("✓ Startup complete\n" + startup_timer.report())
     yield
     # Shutdown: cleanup if needed
     print("Shutting down...")
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    # Buffered scores and game state must reach the database before the process exits
+    await score_writer.drain()
+    try:
+        await game_registry.checkpoint()
+    except Exception as e:
+        print(f"❌ Final active game checkpoint failed: {e}")
+    await invalidation_bus.stop()
+    hashing_executor.shutdown()
 
 
 app = FastAPI(
@@ -53,27 +136,59 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Outermost, so the time spent in the other middleware is included
+app.add_middleware(MetricsMiddleware)
+
+# Counters kept by the subsystems, exported alongside the request metrics
+register_collector("hashing", hashing_executor.stats)
+register_collector("user_cache", user_cache.stats)
+register_collector("auth_rate_limit_ip", auth_rate_limiter.by_ip.stats)
+register_collector("auth_rate_limit_email", auth_rate_limiter.by_email.stats)
+register_collector("leaderboard_cache", leaderboard_cache.stats)
+register_collector("ranks", rank_index.stats)
+register_collector("score_writer", score_writer.stats)
+register_collector("game_registry", game_registry.stats)
+register_collector("spectators", spectator_hub.stats)
+register_collector("resource_versions", resource_versions.stats)
+register_collector("invalidation", invalidation_bus.stats)
+register_collector("db_pool_sync", lambda: pool_stats()["sync"])
+register_collector("db_pool_async", lambda: pool_stats()["async"])
+if read_router.enabled:
+    register_collector("db_pool_sync_read", lambda: pool_stats()["sync_read"])
+    register_collector("db_pool_async_read", lambda: pool_stats()["async_read"])
+register_collector("replica", read_router.stats)
+register_collector("startup", startup_timer.stats)
+
 # Include routers
 app.include_router(auth.router, prefix="/api")
 app.include_router(leaderboard.router, prefix="/api")
 app.include_router(games.router, prefix="/api")
+app.include_router(health.router, prefix="/api")
+app.include_router(metrics.router, prefix="/api")
 
 import os
-from fastapi.responses import FileResponse
+from fastapi import Request
+from app.static_assets import StaticIndex
 
 # Serve frontend in production
 if os.path.exists("static"):
-    app.mount("/assets", StaticFiles(directory="static/assets"), name="assets")
+    static_index = StaticIndex(
+        "static",
+        memory_max_file_bytes=settings.static_memory_max_file_bytes,
+        compress_min_bytes=settings.static_compress_min_bytes,
+    )
+    static_index.build()
+    register_collector("static", static_index.stats)
 
-    @app.get("/{full_path:path}")
-    async def catch_all(full_path: str):
-        file_path = f"static/{full_path}"
-        if os.path.isfile(file_path):
-            return FileResponse(file_path)
-        return FileResponse("static/index.html")
+    @app.api_route("/{full_path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+    async def catch_all(request: Request, full_path: str):
+        return static_index.response(request, full_path)
 else:
     @app.get("/")
     async def root():
         return {"message": "Welcome to Snake Arena Online API"}
+
+startup_timer.record("imports", startup_timer.elapsed())
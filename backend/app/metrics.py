@@ -0,0 +1,236 @@
+"""Prometheus metrics
+
+Request latency per route, SQL statement latency and row counts, and
+password hashing time are recorded into fixed-bucket histograms, and the
+stats() of the caches, buffers and pools are exported as gauges. Everything
+is rendered in the Prometheus text format at /api/metrics.
+
+Recording is kept cheap because it runs on every request and query: label
+values are looked up in a dict of preallocated children, an observation is
+a bisect plus two additions under a per-child lock that is practically
+never contended, and nothing is formatted until the endpoint is scraped.
+"""
+import bisect
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from sqlalchemy import event
+
+# Seconds; request and query latencies of interest are sub-millisecond to seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+def _number(value: float) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _HistogramChild:
+    __slots__ = ("counts", "sum", "lock")
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * (buckets + 1)  # last one is +Inf
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+
+class Histogram:
+    """Histogram with fixed buckets, one child per combination of label values"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._children: Dict[tuple, _HistogramChild] = {}
+        self._lock = threading.Lock()
+
+    def _child(self, labels: tuple) -> _HistogramChild:
+        child = self._children.get(labels)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(labels, _HistogramChild(len(self.buckets)))
+        return child
+
+    def observe(self, labels: tuple, value: float):
+        """Record one value for a tuple of label values"""
+        child = self._child(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with child.lock:
+            child.counts[index] += 1
+            child.sum += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, child in list(self._children.items()):
+            with child.lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                bucket_labels = _labels(self.labelnames + ("le",), labels + (_number(bound),))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            series = _labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{series} {_number(total)}")
+            lines.append(f"{self.name}_count{series} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter, one value per combination of label values"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route",
+    ("method", "route", "status"),
+)
+db_statement_duration = Histogram(
+    "db_statement_duration_seconds", "SQL statement latency by operation and table",
+    ("operation", "table"),
+)
+db_rows = Counter(
+    "db_rows_total", "Rows affected by SQL statements that report a row count",
+    ("operation", "table"),
+)
+password_hashing_duration = Histogram(
+    "password_hashing_duration_seconds", "Password hashing and verification time, including queueing",
+    ("operation",),
+)
+
+_metrics = [http_request_duration, db_statement_duration, db_rows, password_hashing_duration]
+_collectors: Dict[str, Callable[[], dict]] = {}
+
+
+def register_collector(name: str, stats: Callable[[], dict]):
+    """Export the numbers of a stats() dict as snake_arena_<name>_* gauges"""
+    _collectors[name] = stats
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request by its route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # The template, not the path, so ids do not create new series
+            route = scope.get("route")
+            http_request_duration.observe(
+                (scope["method"], route.path if route is not None else "unmatched", status),
+                time.perf_counter() - start,
+            )
+
+
+_STATEMENT_PATTERN = re.compile(
+    r"^\s*(?:(UPDATE)\s+|(\w+)\b.*?\b(?:FROM|INTO|TABLE)\s+)\"?(\w+)",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+@lru_cache(maxsize=1024)
+def _statement_labels(statement: str) -> Tuple[str, str]:
+    # Statements come from SQLAlchemy's compiled cache, so this is parsed
+    # once per distinct statement
+    match = _STATEMENT_PATTERN.match(statement)
+    if match is None:
+        operation = statement.split(None, 1)[0] if statement.strip() else ""
+        return operation.upper(), ""
+    operation = match.group(1) or match.group(2)
+    return operation.upper(), match.group(3).lower()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    labels = _statement_labels(statement)
+    db_statement_duration.observe(labels, time.perf_counter() - context._metrics_start)
+    if cursor.rowcount is not None and cursor.rowcount >= 0:
+        db_rows.inc(labels, cursor.rowcount)
+
+
+def instrument_engine(engine):
+    """Time every statement run through a (sync) engine"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _stats_lines(name: str, stats: dict) -> List[str]:
+    # Numbers become gauges; a dict of numbers becomes one gauge labelled by key
+    lines = []
+    for key, value in stats.items():
+        metric = f"snake_arena_{name}_{key}"
+        if isinstance(value, dict):
+            for label, number in value.items():
+                if isinstance(number, (int, float)):
+                    lines.append(f'{metric}{{key="{_escape(label)}"}} {_number(number)}')
+        elif isinstance(value, (int, float)):
+            lines.append(f"{metric} {_number(value)}")
+    return lines
+
+
+def render() -> str:
+    """Every metric in the Prometheus text exposition format"""
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    for name, stats in list(_collectors.items()):
+        try:
+            lines.extend(_stats_lines(name, stats()))
+        except Exception as e:
+            lines.append(f"# {name} stats unavailable: {_escape(e)}")
+    return "\n".join(lines) + "\n"
@@ -7,6 +7,11 @@ class GameMode(str, Enum):
     walls = "walls"
     pass_through = "pass-through"
 
+class LeaderboardWindow(str, Enum):
+    day = "day"
+    week = "week"
+    month = "month"
+
 class User(BaseModel):
     id: str
     username: str
@@ -32,13 +37,29 @@ class LeaderboardEntry(BaseModel):
     mode: GameMode
     timestamp: datetime
 
+class RankedLeaderboardEntry(LeaderboardEntry):
+    rank: int
+
+class PlayerRank(BaseModel):
+    rank: Optional[int] = Field(None, description="Rank of the player's best entry, null without entries")
+    total: int = Field(..., description="Number of ranked entries")
+    entries: List[RankedLeaderboardEntry] = Field(
+        ..., description="The player's best entry and its neighbors, best first"
+    )
+
 class SubmitScoreRequest(BaseModel):
-    score: int
+    score: int = Field(ge=0, le=2**31 - 1)  # fits the INTEGER column on every database
     mode: GameMode
 
+# Positions are stored as int16 (see app.game_codec)
+COORDINATE_MIN = -2**15
+COORDINATE_MAX = 2**15 - 1
+# The board is 20 x 20; room to spare, but no unbounded snakes in every poll
+MAX_SNAKE_SEGMENTS = 1024
+
 class Point(BaseModel):
-    x: int
-    y: int
+    x: int = Field(ge=COORDINATE_MIN, le=COORDINATE_MAX)
+    y: int = Field(ge=COORDINATE_MIN, le=COORDINATE_MAX)
 
 class ActiveGame(BaseModel):
     id: str
@@ -47,3 +68,9 @@ class ActiveGame(BaseModel):
     mode: GameMode
     snake: List[Point]
     food: Point
+
+class GameStateUpdate(BaseModel):
+    score: int = Field(ge=0, le=2**31 - 1)
+    mode: GameMode
+    snake: List[Point] = Field(max_length=MAX_SNAKE_SEGMENTS)
+    food: Point
@@ -0,0 +1,140 @@
+"""Leaderboard ranks from in-memory score counts
+
+A player's rank is one more than the number of leaderboard entries with a
+higher score (tied entries share a rank). Counting those in SQL scans every
+entry above the player. Instead, the number of entries at each score is
+kept in a Fenwick tree per game mode, plus one across modes, so a rank is a
+prefix sum: O(log n) in the score range, independent of the number of
+entries. Scores above a configurable maximum are rare and kept in a sorted
+list instead of growing the tree.
+
+Counts are loaded from the database at startup, incremented as entries are
+added, and periodically recounted so entries added by other workers are
+included, like the top-K leaderboard cache.
+"""
+import bisect
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+from app.models import LeaderboardEntry, GameMode
+
+
+class ScoreCounts:
+    """Number of entries per score, with counts of higher scores in O(log n)
+
+    Negative scores are counted, and ranked, as 0.
+    """
+
+    def __init__(self, max_score: int):
+        self.max_score = max_score
+        self.total = 0
+        self._tree = [0] * (max_score + 2)  # 1-based Fenwick tree over scores 0..max_score
+        self._high: List[int] = []  # sorted scores above max_score
+
+    def add(self, score: int, count: int = 1):
+        self.total += count
+        if score > self.max_score:
+            self._high[bisect.bisect_right(self._high, score):0] = [score] * count
+            return
+        i = max(score, 0) + 1
+        while i < len(self._tree):
+            self._tree[i] += count
+            i += i & -i
+
+    def count_above(self, score: int) -> int:
+        """Number of entries with a strictly higher score"""
+        if score >= self.max_score:
+            return len(self._high) - bisect.bisect_right(self._high, score)
+        # Everything minus the entries scoring at most score
+        i = max(score, 0) + 1
+        at_most = 0
+        while i > 0:
+            at_most += self._tree[i]
+            i -= i & -i
+        return self.total - at_most
+
+
+class RankIndex:
+    """Score counts per game mode, plus across all modes (key None)"""
+
+    def __init__(self, max_score: int):
+        self.max_score = max_score
+        self.loaded = False
+        self._counts: Dict[Optional[GameMode], ScoreCounts] = {}
+        self._lock = threading.Lock()
+        self._replay: Optional[List[Tuple[GameMode, int]]] = None
+
+        # Metrics
+        self.lookups = 0
+        self.misses = 0
+
+    def begin_resync(self):
+        """Start recording scores added while a recount is being read"""
+        with self._lock:
+            self._replay = []
+
+    def cancel_resync(self):
+        """Stop recording after a recount failed"""
+        with self._lock:
+            self._replay = None
+
+    def load(self, counts: Iterable[Tuple[GameMode, int, int]]):
+        """Replace the counts with (mode, score, number of entries) rows
+
+        Scores added since begin_resync() are counted again; an entry
+        committed just before the recount read its snapshot may then be
+        counted twice until the next recount.
+        """
+        fresh = {mode: ScoreCounts(self.max_score) for mode in (None, *GameMode)}
+        for mode, score, count in counts:
+            fresh[mode].add(score, count)
+            fresh[None].add(score, count)
+        with self._lock:
+            replay, self._replay = self._replay or [], None
+            self._counts = fresh
+            for mode, score in replay:
+                self._add(mode, score)
+            self.loaded = True
+
+    def add(self, entry: LeaderboardEntry):
+        """Count a new leaderboard entry"""
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append((entry.mode, entry.score))
+            if self.loaded:
+                self._add(entry.mode, entry.score)
+
+    def _add(self, mode: GameMode, score: int):
+        self._counts[mode].add(score)
+        self._counts[None].add(score)
+
+    def rank(self, mode: Optional[GameMode], score: int) -> Optional[Tuple[int, int]]:
+        """(rank, number of entries) of a score, or None if not loaded"""
+        with self._lock:
+            if not self.loaded:
+                self.misses += 1
+                return None
+            self.lookups += 1
+            counts = self._counts[mode]
+            return counts.count_above(score) + 1, counts.total
+
+    def clear(self):
+        """Forget every count until the next load"""
+        with self._lock:
+            self._counts = {}
+            self.loaded = False
+
+    def stats(self) -> dict:
+        """Snapshot of entry counts and lookup counters"""
+        with self._lock:
+            return {
+                "loaded": self.loaded,
+                "entries": {str(mode.value if mode else "all"): c.total for mode, c in self._counts.items()},
+                "lookups": self.lookups,
+                "misses": self.misses,
+            }
+
+
+# Global rank index, loaded in the application lifespan
+rank_index = RankIndex(settings.rank_max_exact_score)
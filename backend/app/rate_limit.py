@@ -0,0 +1,154 @@
+"""Token-bucket rate limits for login and signup
+
+Every login and signup costs an argon2 hash, so a burst of them, such as a
+credential-stuffing run, can keep every core busy and stall the API. Each
+client IP and each email address gets a token bucket: it holds up to
+`burst` tokens, refills at `rate` tokens per second, and a request that
+finds it empty is rejected with 429 and Retry-After before any database
+lookup or hash.
+
+Buckets are refilled lazily when checked, so a check is O(1). They are kept
+in least recently used order and bounded in number: a bucket idle long
+enough to have refilled completely is the same as no bucket and is dropped
+first; if the limit is still exceeded, the least recently used is dropped.
+Limits are per process, so with several workers a client gets that many
+times the configured rate.
+
+Behind a reverse proxy every request comes from the proxy's address, so
+set trusted_proxy_hops to the number of proxies that append to
+X-Forwarded-For; the client is then the address the outermost of them saw.
+Entries further left are whatever the client sent and are never used.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+from fastapi import HTTPException, Request, status
+
+from app.config import settings
+
+
+class TokenBucketLimiter:
+    """Token bucket per key, with a bounded number of buckets"""
+
+    def __init__(self, rate: float, burst: int, max_keys: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._clock = clock
+        self._full_after = burst / rate  # seconds for an empty bucket to refill
+        self._buckets: "OrderedDict[Hashable, list]" = OrderedDict()  # key -> [tokens, updated_at]
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.allowed = 0
+        self.rejected = 0
+        self.evictions = 0
+
+    def acquire(self, key: Hashable) -> float:
+        """Take a token for key: 0 if allowed, else seconds until one is available"""
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now]
+                self._evict(now)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                self.allowed += 1
+                return 0.0
+            self.rejected += 1
+            return (1 - bucket[0]) / self.rate
+
+    def _evict(self, now: float):
+        # The oldest buckets first; each is looked at once per eviction,
+        # so checks stay O(1) amortized
+        while self._buckets:
+            key, (_, updated_at) = next(iter(self._buckets.items()))
+            if now - updated_at < self._full_after and len(self._buckets) <= self.max_keys:
+                return
+            del self._buckets[key]
+            self.evictions += 1
+
+    def clear(self):
+        """Forget every bucket"""
+        with self._lock:
+            self._buckets.clear()
+
+    def stats(self) -> dict:
+        """Snapshot of bucket count and allow/reject counters"""
+        with self._lock:
+            return {
+                "buckets": len(self._buckets),
+                "max_keys": self.max_keys,
+                "allowed": self.allowed,
+                "rejected": self.rejected,
+                "evictions": self.evictions,
+            }
+
+
+class AuthRateLimiter:
+    """Per-IP and per-email limits shared by login and signup"""
+
+    def __init__(self, enabled: bool, ip_rate: float, ip_burst: int, email_rate: float, email_burst: int,
+                 max_keys: int, trusted_proxy_hops: int = 0, clock: Callable[[], float] = time.monotonic):
+        self.enabled = enabled
+        self.trusted_proxy_hops = trusted_proxy_hops
+        self.by_ip = TokenBucketLimiter(ip_rate, ip_burst, max_keys, clock)
+        self.by_email = TokenBucketLimiter(email_rate, email_burst, max_keys, clock)
+
+    def check(self, ip: Optional[str], email: str):
+        """Raise 429 with Retry-After if either bucket is empty"""
+        if not self.enabled:
+            return
+        # Both buckets are charged, so guessing at a limited email still
+        # uses up the caller's IP allowance
+        wait = max(self.by_ip.acquire(ip), self.by_email.acquire(email.strip().lower()))
+        if wait > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts, please retry later",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+    def client_ip(self, request: Request) -> Optional[str]:
+        """The client's address, as seen by the outermost trusted proxy if there are any"""
+        peer = request.client.host if request.client else None
+        if not self.trusted_proxy_hops:
+            return peer
+        forwarded = [
+            address.strip()
+            for header in request.headers.getlist("x-forwarded-for")
+            for address in header.split(",")
+            if address.strip()
+        ]
+        # Fewer entries than proxies: the request did not come through all of them
+        if len(forwarded) < self.trusted_proxy_hops:
+            return peer
+        return forwarded[-self.trusted_proxy_hops]
+
+    def check_request(self, request: Request, email: str):
+        self.check(self.client_ip(request), email)
+
+    def clear(self):
+        self.by_ip.clear()
+        self.by_email.clear()
+
+
+# Global limiter for the auth routes
+auth_rate_limiter = AuthRateLimiter(
+    enabled=settings.auth_rate_limit_enabled,
+    ip_rate=settings.auth_ip_rate_per_minute / 60,
+    ip_burst=settings.auth_ip_burst,
+    email_rate=settings.auth_email_rate_per_minute / 60,
+    email_burst=settings.auth_email_burst,
+    max_keys=settings.auth_rate_limit_max_keys,
+    trusted_proxy_hops=settings.auth_trusted_proxy_hops,
+)
@@ -0,0 +1,117 @@
+"""Routing of read-only queries to a read replica
+
+With DATABASE_READ_URL set, the read-only helpers in app.database run on a
+second engine, so leaderboard pages, rank lookups and user lookups do not
+compete with score writes on the primary. Two cases go to the primary
+instead:
+
+    read your writes  a replica lags behind the primary, so a client that
+                      wrote recently (signed up, submitted a score) reads
+                      from the primary for a few seconds afterwards. Clients
+                      are identified by their email.
+    fresh tag         a response whose ETag names a version bumped in the
+                      last few seconds is read from the primary, or a lagging
+                      replica's older data would be cached under the new tag.
+    unhealthy         a read that fails on the replica with a connection or
+                      operational error is retried on the primary, and the
+                      replica is left alone for a cooldown before being
+                      tried again.
+
+Startup loads and resyncs of the in-memory caches always read the primary,
+so they never miss committed writes.
+"""
+import threading
+import time
+from typing import Callable, Optional
+
+from app.cache import TTLCache
+from app.config import settings
+
+
+class ReadRouter:
+    """Decides per read whether the replica may serve it"""
+
+    def __init__(self, enabled: bool, read_your_writes_seconds: float, retry_seconds: float,
+                 max_writers: int, clock: Callable[[], float] = time.monotonic):
+        self.enabled = enabled
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.retry_seconds = retry_seconds
+        self._clock = clock
+        self._writers = TTLCache(max_writers, read_your_writes_seconds, clock)
+        self._unhealthy_until = 0.0
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.read_your_writes = 0
+        self.fresh_tags = 0
+        self.unhealthy_skips = 0
+        self.fallbacks = 0
+
+    def wrote(self, reader: Optional[str]):
+        """Send this client's reads to the primary until the replica has caught up"""
+        if self.enabled and reader:
+            self._writers.set(reader, True)
+
+    def settled(self, changed_at: float) -> bool:
+        """Whether a change made at changed_at (clock time) has had time to reach the replica
+
+        Reads whose response is tagged with the changed version must go to
+        the primary until then.
+        """
+        if not self.enabled or self._clock() - changed_at >= self.read_your_writes_seconds:
+            return True
+        with self._lock:
+            self.fresh_tags += 1
+            self.primary_reads += 1
+        return False
+
+    def use_replica(self, reader: Optional[str] = None) -> bool:
+        """Whether a read for reader (None if anonymous) should go to the replica"""
+        with self._lock:
+            if not self.enabled:
+                self.primary_reads += 1
+                return False
+            if reader and self._writers.get(reader):
+                self.read_your_writes += 1
+                self.primary_reads += 1
+                return False
+            if self._clock() < self._unhealthy_until:
+                self.unhealthy_skips += 1
+                self.primary_reads += 1
+                return False
+            self.replica_reads += 1
+            return True
+
+    def failed(self, error: BaseException):
+        """Record a failed replica read, which is then retried on the primary"""
+        with self._lock:
+            healthy = self._clock() >= self._unhealthy_until
+            self._unhealthy_until = self._clock() + self.retry_seconds
+            self.fallbacks += 1
+        if healthy:
+            print(f"⚠️  Read replica failed, using the primary for {self.retry_seconds:g} s: {error}")
+
+    def stats(self) -> dict:
+        """Snapshot of routing counters"""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "healthy": self._clock() >= self._unhealthy_until,
+                "replica_reads": self.replica_reads,
+                "primary_reads": self.primary_reads,
+                "read_your_writes": self.read_your_writes,
+                "fresh_tags": self.fresh_tags,
+                "unhealthy_skips": self.unhealthy_skips,
+                "fallbacks": self.fallbacks,
+            }
+
+
+# Global router for the read helpers in app.database
+read_router = ReadRouter(
+    enabled=settings.database_read_url is not None,
+    read_your_writes_seconds=settings.replica_read_your_writes_seconds,
+    retry_seconds=settings.replica_retry_seconds,
+    max_writers=settings.replica_max_tracked_writers,
+)
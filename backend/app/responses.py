@@ -0,0 +1,23 @@
+"""JSON responses encoded once
+
+A route that returns data lets FastAPI validate it against the
+response_model again and encode it with the standard json module. For lists
+the route already built from trusted data, that repeats work that can cost
+more than the query. Returning a FastJSONResponse skips both steps: the
+content is encoded in one pass by pydantic-core, which produces the same JSON
+as the response_model path. Keep response_model on the route so the OpenAPI
+schema still describes the response.
+"""
+from typing import Any
+
+from pydantic_core import to_json
+from starlette.responses import Response
+
+
+class FastJSONResponse(Response):
+    """JSON response for models, dicts and lists, without re-validation"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
@@ -1,15 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import LoginRequest, SignupRequest, AuthResponse, User
-from app.database import get_user_by_email, create_user
-from app.auth import verify_password, get_password_hash, create_access_token, get_current_user
+from app.database import aget_user_by_email, acreate_user, arelease_connection
+from app.auth import averify_password, ahash_password, create_access_token, get_current_user, request_db
+from app.rate_limit import auth_rate_limiter
+from app.replica import read_router
 from datetime import timedelta
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 @router.post("/login", response_model=AuthResponse)
-async def login(request: LoginRequest):
-    user = get_user_by_email(request.email)
-    if not user or not verify_password(request.password, user["password_hash"]):
+async def login(request: LoginRequest, http_request: Request, db: AsyncSession = request_db):
+    auth_rate_limiter.check_request(http_request, request.email)
+    user = await aget_user_by_email(request.email, db)
+    # No connection is held while the password is verified
+    await arelease_connection(db)
+    if not user or not await averify_password(request.password, user["password_hash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
@@ -19,21 +26,34 @@ async def login(request: LoginRequest):
     access_token = create_access_token(data={"sub": user["email"]})
     return {"user": user, "token": access_token}
 
+def email_taken() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Email already exists"
+    )
+
 @router.post("/signup", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
-async def signup(request: SignupRequest):
-    if get_user_by_email(request.email):
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Email already exists"
-        )
+async def signup(request: SignupRequest, http_request: Request, db: AsyncSession = request_db):
+    auth_rate_limiter.check_request(http_request, request.email)
+    # From the primary: a lagging replica would let a duplicate reach the insert
+    if await aget_user_by_email(request.email, db, replica=False):
+        raise email_taken()
+    # No connection is held while the password is hashed; a signup racing
+    # this one is caught by the unique email constraint on insert
+    await arelease_connection(db)
+    password_hash = await ahash_password(request.password)
     
     user_data = {
         "username": request.username,
         "email": request.email,
-        "password_hash": get_password_hash(request.password)
+        "password_hash": password_hash
     }
     
-    created_user = create_user(user_data)
+    try:
+        created_user = await acreate_user(user_data, db)
+    except IntegrityError:
+        raise email_taken() from None
+    read_router.wrote(created_user["email"])
     access_token = create_access_token(data={"sub": created_user["email"]})
     
     return {"user": created_user, "token": access_token}
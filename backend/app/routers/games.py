@@ -1,10 +1,74 @@
-from fastapi import APIRouter
-from typing import List
-from app.models import ActiveGame
-from app.database import get_active_games
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, WebSocket, status
+from typing import List, Optional
+from app.models import ActiveGame, GameMode, GameStateUpdate, User
+from app.auth import get_current_user
+from app.game_registry import game_registry
+from app.spectator import spectator_hub
+from app.versioning import resource_versions, ACTIVE_GAMES
+from app.responses import FastJSONResponse
 
 router = APIRouter(prefix="/games", tags=["Games"])
 
+
+def _not_your_game():
+    return HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Game belongs to another user"
+    )
+
+
 @router.get("/active", response_model=List[ActiveGame])
-async def get_active_games_list():
-    return get_active_games()
+async def get_active_games_list(request: Request):
+    etag = resource_versions.etag(ACTIVE_GAMES)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if resource_versions.matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # Rows are already shaped like ActiveGame, so skip re-validating them
+    return FastJSONResponse(game_registry.rows(), headers=headers)
+
+
+@router.put("/{game_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def update_game_state(
+    game_id: str,
+    request: GameStateUpdate,
+    current_user: User = Depends(get_current_user)
+):
+    """Push the current state of one of your games; the latest push wins"""
+    if not game_registry.update(
+        game_id, current_user.username, request.score, request.mode.value,
+        request.snake, request.food
+    ):
+        raise _not_your_game()
+
+
+@router.delete("/{game_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def end_game(
+    game_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    if not game_registry.end(game_id, current_user.username):
+        raise _not_your_game()
+
+
+@router.websocket("/live")
+async def watch_active_games(websocket: WebSocket, mode: Optional[GameMode] = None, game_id: Optional[str] = None):
+    """Stream a snapshot of active games followed by per-tick deltas"""
+    await websocket.accept()
+    subscriber = await spectator_hub.subscribe(mode, game_id)
+
+    async def forward():
+        while True:
+            await websocket.send_text(await subscriber.queue.get())
+
+    sender = asyncio.create_task(forward())
+    try:
+        # Spectators only listen; this returns once they disconnect
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    finally:
+        # Before any await, which a cancelled connection would not get past
+        spectator_hub.unsubscribe(subscriber)
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
@@ -0,0 +1,28 @@
+import asyncio
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+from app.config import settings
+from app.database import aping_database, pool_stats
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("")
+async def liveness():
+    """The process is up and serving requests"""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def readiness():
+    """The database is reachable; includes connection pool occupancy and wait times"""
+    try:
+        await asyncio.wait_for(aping_database(), settings.db_ready_timeout_seconds)
+    except Exception as e:
+        # The message can name hosts and users, so it only goes to the log
+        print(f"⚠️  Readiness check failed: {type(e).__name__}: {e}")
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "unavailable", "detail": type(e).__name__, "pools": pool_stats()}
+        )
+    return {"status": "ready", "pools": pool_stats()}
@@ -1,24 +1,95 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from typing import List, Literal, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timezone
-from app.models import LeaderboardEntry, SubmitScoreRequest, User, GameMode
-from app.database import get_leaderboard, add_leaderboard_entry
-from app.auth import get_current_user
+from app.models import LeaderboardEntry, PlayerRank, SubmitScoreRequest, User, GameMode, LeaderboardWindow
+from app.database import aget_leaderboard, aget_best_scores, aget_window_scores, aget_player_rank
+from app.windows import current_window_start
+from app.write_behind import score_writer
+from app.replica import read_router
+from app.versioning import resource_versions, LEADERBOARD
+from app.responses import FastJSONResponse
+from app.auth import get_current_user, optional_oauth2_scheme, token_email, request_db
+import base64
+import binascii
 import uuid
 
 router = APIRouter(prefix="/leaderboard", tags=["Leaderboard"])
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(entry: LeaderboardEntry) -> str:
+    """Encode the (score, id) position of an entry as an opaque cursor"""
+    raw = f"{entry.score}:{entry.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, str]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        score, entry_id = raw.split(":", 1)
+        return int(score), entry_id
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
 @router.get("", response_model=List[LeaderboardEntry])
 async def get_leaderboard_entries(
+    request: Request,
     mode: Optional[GameMode] = None,
-    limit: int = Query(10, ge=1, le=100)
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header of the previous page"),
+    distinct: Optional[Literal["users"]] = Query(None, description="users: only each player's best entry"),
+    window: Optional[LeaderboardWindow] = Query(
+        None, description="Only the current UTC day, week or month, with each player's best entry"
+    ),
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    db: AsyncSession = request_db
 ):
-    return get_leaderboard(mode, limit)
+    after = decode_cursor(cursor) if cursor else None
+    # The window start is part of the tag, so tags change when a new window begins
+    start = current_window_start(window) if window else None
+    etag = resource_versions.etag(LEADERBOARD, mode, limit, cursor, distinct, window, start)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if resource_versions.matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # Signed-in players see their own new scores even if the replica lags,
+    # and a recently bumped tag is not stored with a lagging replica's body
+    reader = token_email(token)
+    replica = read_router.settled(resource_versions.changed_at(LEADERBOARD))
+    if window:
+        entries = await aget_window_scores(window, start, mode, limit, db, after=after, reader=reader, replica=replica)
+    elif distinct == "users":
+        entries = await aget_best_scores(mode, limit, db, after=after, reader=reader, replica=replica)
+    else:
+        entries = await aget_leaderboard(mode, limit, db, after=after, reader=reader, replica=replica)
+    if len(entries) == limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(entries[-1])
+    # Entries are built from database rows or the cache, so skip re-validating them
+    return FastJSONResponse(entries, headers=headers)
+
+@router.get("/me", response_model=PlayerRank)
+async def get_my_rank(
+    mode: Optional[GameMode] = None,
+    neighbors: int = Query(5, ge=0, le=25, description="Entries to include above and below yours"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = request_db
+):
+    """Rank of your best entry and the entries around it"""
+    return await aget_player_rank(current_user.username, mode, neighbors, db, reader=current_user.email)
+
 
 @router.post("", status_code=status.HTTP_201_CREATED)
 async def submit_score(
     request: SubmitScoreRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = request_db
 ):
     entry = LeaderboardEntry(
         id=str(uuid.uuid4()),
@@ -27,5 +98,6 @@ async def submit_score(
         mode=request.mode,
         timestamp=datetime.now(timezone.utc)
     )
-    add_leaderboard_entry(entry)
+    await score_writer.submit(entry, db)
+    read_router.wrote(current_user.email)
     return {"description": "Score submitted successfully"}
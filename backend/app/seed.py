@@ -0,0 +1,243 @@
+"""Synthetic data at production scale, for reproducing large databases locally
+
+generate_data() adds users, leaderboard entries and active games in the
+amounts asked for, with configurable score and activity distributions:
+
+    exponential  many low scores and a long tail of high ones (the default)
+    lognormal    a bulge of middling scores and a heavier tail
+    uniform      scores spread evenly between 0 and twice the mean
+
+Players are not equally active: the player of each score is drawn with
+activity_skew, where 1 spreads scores evenly and larger values give a few
+players most of them. Timestamps are spread over the last `days` days.
+
+Everything is written in large batches: COPY on PostgreSQL, multi-row
+INSERTs elsewhere. All users share one password hash, computed once, so
+hashing does not dominate. user_best_scores and the leaderboard windows in
+progress are filled in the same pass, so the database looks as if every
+score had been submitted through the API. New rows are added after any
+existing ones, so generating twice doubles the data.
+
+Rows are written straight to the database, so servers that are already
+running only see them after their next leaderboard and rank resync, or a
+restart.
+"""
+import csv
+import io
+import math
+import random
+import time
+from array import array
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from enum import Enum
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy import func, insert, select
+
+from app import database
+from app.db_models import (
+    UserDB, LeaderboardEntryDB, UserBestScoreDB, LeaderboardWindowScoreDB, ActiveGameDB,
+    GameModeEnum, LeaderboardWindowEnum,
+)
+from app.game_codec import encode_points, encode_point
+from app.models import LeaderboardWindow
+from app.windows import current_window_start
+
+DISTRIBUTIONS = ("exponential", "lognormal", "uniform")
+
+
+def _score_sampler(distribution: str, mean_score: float, rng: random.Random) -> Callable[[], int]:
+    if distribution == "exponential":
+        return lambda: int(rng.expovariate(1 / mean_score))
+    if distribution == "lognormal":
+        # sigma 1, with mu chosen so the mean is mean_score
+        mu = math.log(mean_score) - 0.5
+        return lambda: int(rng.lognormvariate(mu, 1.0))
+    if distribution == "uniform":
+        return lambda: int(rng.uniform(0, 2 * mean_score))
+    raise ValueError(f"Unknown score distribution {distribution!r}, expected one of {DISTRIBUTIONS}")
+
+
+def _id(run: int, kind: int, i: int) -> str:
+    # Valid, distinct per run and much cheaper than uuid4() at millions of rows
+    return f"{run:08x}-{kind:04x}-4000-8000-{i:012x}"
+
+
+def _copy_value(value) -> str:
+    if isinstance(value, Enum):
+        return value.name  # SQLAlchemy stores enum names
+    if isinstance(value, bytes):
+        return "\\x" + value.hex()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+class _BulkWriter:
+    """Buffers rows per table and writes each full batch in one statement"""
+
+    def __init__(self, engine, batch_size: int):
+        self.batch_size = batch_size
+        self.copy = engine.dialect.name == "postgresql"
+        if self.copy:
+            self.raw = engine.raw_connection()
+        else:
+            self.conn = engine.connect()
+            if engine.dialect.name == "sqlite":
+                self.conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        self.buffers: Dict[object, list] = {}
+        self.rows: Counter = Counter()
+        self.seconds: Counter = Counter()
+
+    def add(self, table, row: dict):
+        buffer = self.buffers.setdefault(table, [])
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self._flush(table)
+
+    def _flush(self, table):
+        rows = self.buffers.pop(table, None)
+        if not rows:
+            return
+        start = time.perf_counter()
+        if self.copy:
+            columns = list(rows[0])
+            data = io.StringIO()
+            writer = csv.writer(data)
+            for row in rows:
+                writer.writerow([_copy_value(row[column]) for column in columns])
+            data.seek(0)
+            cursor = self.raw.cursor()
+            cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", data)
+            cursor.close()
+            self.raw.commit()
+        else:
+            self.conn.execute(insert(table), rows)
+            self.conn.commit()
+        self.seconds[table.name] += time.perf_counter() - start
+        self.rows[table.name] += len(rows)
+
+    def flush(self):
+        for table in list(self.buffers):
+            self._flush(table)
+
+    def close(self):
+        """Drop rows not yet flushed and release the connection"""
+        self.buffers.clear()
+        if self.copy:
+            self.raw.rollback()
+            self.raw.close()
+        else:
+            self.conn.rollback()
+            if self.conn.dialect.name == "sqlite":
+                self.conn.exec_driver_sql("PRAGMA synchronous=FULL")
+            self.conn.close()
+
+
+def generate_data(users: int, scores: int, games: int = 0, distribution: str = "exponential",
+                  mean_score: float = 500, activity_skew: float = 2.0, walls_share: float = 0.5,
+                  days: int = 90, batch_size: int = 10000, seed: Optional[int] = None,
+                  password: str = "password123",
+                  report: Optional[Callable[[str], None]] = None) -> Dict[str, Tuple[int, float]]:
+    """Add users, scores and active games; returns (rows, seconds) per table
+
+    Every generated user can log in as player<n>@example.com with password.
+    """
+    from app.auth import get_password_hash
+
+    if users < 1 and (scores or games):
+        raise ValueError("Scores and games need at least one user")
+    if games > users:
+        raise ValueError("Every active game needs its own user")
+    rng = random.Random(seed)
+    sample_score = _score_sampler(distribution, mean_score, rng)
+    started = time.perf_counter()
+    engine = database.engine
+
+    with engine.connect() as conn:
+        first = conn.execute(select(func.count()).select_from(UserDB)).scalar()
+    # Ids differ between runs even with the same seed
+    run = random.getrandbits(32)
+    password_hash = get_password_hash(password)
+
+    # Scores per player, so each player's scores can be generated together
+    # and their best scores tracked without remembering every player
+    per_user = array("l", [0]) * users
+    for _ in range(scores):
+        per_user[int(users * rng.random() ** activity_skew)] += 1
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    span = days * 86400
+    windows = [
+        (LeaderboardWindowEnum(window.value), start, datetime.combine(start, datetime.min.time()))
+        for window in LeaderboardWindow
+        for start in [current_window_start(window, now)]
+    ]
+    modes = (GameModeEnum.walls, GameModeEnum.pass_through)
+    game_users = set(rng.sample(range(users), games))
+
+    writer = _BulkWriter(engine, batch_size)
+    entry_number = 0
+    try:
+        for i in range(users):
+            n = first + i
+            username = f"player{n}"
+            writer.add(UserDB.__table__, {
+                "id": _id(run, 1, i),
+                "email": f"player{n}@example.com",
+                "username": username,
+                "password_hash": password_hash,
+                "created_at": now - timedelta(seconds=rng.random() * span),
+            })
+
+            best = {}  # (period, start, mode) -> row, with period None for the all-time best
+            for _ in range(per_user[i]):
+                mode = modes[0] if rng.random() < walls_share else modes[1]
+                entry = {
+                    "id": _id(run, 2, entry_number),
+                    "username": username,
+                    "score": sample_score(),
+                    "mode": mode,
+                    "timestamp": now - timedelta(seconds=rng.random() * span),
+                }
+                entry_number += 1
+                writer.add(LeaderboardEntryDB.__table__, entry)
+                for period, start, since in [(None, None, None), *windows]:
+                    if since is not None and entry["timestamp"] < since:
+                        continue
+                    key = (period, start, mode)
+                    if key not in best or (entry["score"], entry["id"]) > (best[key]["score"], best[key]["id"]):
+                        best[key] = entry
+
+            for (period, start, mode), entry in best.items():
+                row = {
+                    "username": username, "mode": mode, "score": entry["score"],
+                    "entry_id": entry["id"], "timestamp": entry["timestamp"],
+                }
+                if period is None:
+                    writer.add(UserBestScoreDB.__table__, row)
+                else:
+                    writer.add(LeaderboardWindowScoreDB.__table__, {"period": period, "period_start": start, **row})
+
+            if i in game_users:
+                length = rng.randrange(3, 60)
+                head_x, head_y = rng.randrange(40), rng.randrange(40)
+                writer.add(ActiveGameDB.__table__, {
+                    "id": _id(run, 3, i),
+                    "username": username,
+                    "score": (length - 3) * 10,
+                    "mode": rng.choice(modes),
+                    "snake": encode_points([{"x": (head_x - x) % 40, "y": head_y} for x in range(length)]),
+                    "food": encode_point({"x": rng.randrange(40), "y": rng.randrange(40)}),
+                    "updated_at": now,
+                })
+
+            if report and (i + 1) % 100000 == 0:
+                elapsed = time.perf_counter() - started
+                report(f"  {i + 1:,} users, {entry_number:,} scores ({sum(writer.rows.values()) / elapsed:,.0f} rows/s)")
+        writer.flush()
+    finally:
+        writer.close()
+
+    return {name: (writer.rows[name], writer.seconds[name]) for name in writer.rows}
@@ -0,0 +1,207 @@
+"""Live spectator stream of active games
+
+Spectators connected over WebSocket get a snapshot of the games they watch,
+then one message per tick with only what changed: segments added at the
+head, segments removed from the tail, food moves, score changes, and games
+that started or ended. A single poller reads the active game registry while
+anyone is watching and diffs it against the previous tick, so the work done
+per tick does not grow with the number of spectators.
+
+Messages (JSON text):
+    {"type": "snapshot", "games": [ActiveGame, ...]}
+    {"type": "delta", "events": [event, ...]}
+
+Events:
+    {"type": "started", "game": ActiveGame}
+    {"type": "update", "id": ..., "head": [Point, ...], "tail": n,
+     "food": Point, "score": n}   (only the fields that changed)
+    {"type": "ended", "id": ...}
+
+A snapshot can also arrive mid-stream when a spectator falls too far behind;
+it replaces everything the client knew.
+"""
+import asyncio
+import json
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.config import settings
+from app.game_registry import game_registry
+from app.models import GameMode
+
+
+def diff_snake(old: List[dict], new: List[dict]) -> Tuple[List[dict], int]:
+    """Describe new as segments added at the head plus segments dropped from the tail of old
+
+    Returns (head, tail) such that new == head + old[:len(old) - tail]. When
+    the snake did not simply move (e.g. a new game reused the id), the whole
+    snake is sent as head and the whole old snake is dropped.
+    """
+    if old:
+        for added, segment in enumerate(new):
+            if segment != old[0]:
+                continue
+            body = new[added:]
+            if len(body) <= len(old) and body == old[:len(body)]:
+                return new[:added], len(old) - len(body)
+    return new, len(old)
+
+
+def _game_events(old: Dict[str, dict], new: Dict[str, dict]) -> List[Tuple[dict, dict]]:
+    """Events turning old into new, each paired with the game it is about"""
+    events = []
+    for game_id, game in new.items():
+        before = old.get(game_id)
+        if before is None or before["mode"] != game["mode"]:
+            events.append((game, {"type": "started", "game": game}))
+            continue
+
+        event = {}
+        if game["snake"] != before["snake"]:
+            head, tail = diff_snake(before["snake"], game["snake"])
+            event["head"] = head
+            event["tail"] = tail
+        if game["food"] != before["food"]:
+            event["food"] = game["food"]
+        if game["score"] != before["score"]:
+            event["score"] = game["score"]
+        if event:
+            events.append((game, {"type": "update", "id": game_id, **event}))
+
+    for game_id, game in old.items():
+        if game_id not in new or new[game_id]["mode"] != game["mode"]:
+            # Ended events go first so a restarted game is not removed again
+            events.insert(0, (game, {"type": "ended", "id": game_id}))
+    return events
+
+
+class Subscriber:
+    """One spectator's filter and outgoing message queue"""
+
+    def __init__(self, mode: Optional[GameMode], game_id: Optional[str], queue_size: int):
+        self.mode = mode.value if mode else None
+        self.game_id = game_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def wants(self, game: dict) -> bool:
+        return (
+            (self.mode is None or game["mode"] == self.mode)
+            and (self.game_id is None or game["id"] == self.game_id)
+        )
+
+
+async def _registry_games() -> List[dict]:
+    return game_registry.rows()
+
+
+class SpectatorHub:
+    """Fans out active game changes to WebSocket spectators"""
+
+    def __init__(
+        self,
+        poll_interval: float = 0.2,
+        queue_size: int = 64,
+        loader: Callable[[], Awaitable[List[dict]]] = _registry_games,
+    ):
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self._loader = loader
+        self._games: Dict[str, dict] = {}
+        self._subscribers: Set[Subscriber] = set()
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.ticks = 0
+        self.events = 0
+        self.messages = 0
+        self.resnapshots = 0
+        self.poll_failures = 0
+
+    def _polling(self) -> bool:
+        # A task left over from another (closed) event loop does not count
+        return (
+            self._task is not None
+            and not self._task.done()
+            and self._task.get_loop() is asyncio.get_running_loop()
+        )
+
+    async def subscribe(self, mode: Optional[GameMode] = None, game_id: Optional[str] = None) -> Subscriber:
+        """Register a spectator; its queue starts with a snapshot"""
+        if not self._polling():
+            # Nobody was watching, so the last state may be stale
+            self.publish(await self._loader())
+        if not self._polling():
+            self._task = asyncio.create_task(self._poll())
+
+        subscriber = Subscriber(mode, game_id, self.queue_size)
+        subscriber.queue.put_nowait(self._snapshot(subscriber))
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        """Remove a spectator, stopping the poller after the last one"""
+        self._subscribers.discard(subscriber)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def publish(self, games: List[dict]):
+        """Replace the current games and send the differences to spectators"""
+        current = {game["id"]: game for game in games}
+        events = _game_events(self._games, current)
+        self._games = current
+        self.ticks += 1
+        if not events:
+            return
+
+        self.events += len(events)
+        # Serialize each event once, whatever the number of spectators
+        encoded = [(game, json.dumps(event)) for game, event in events]
+        for subscriber in self._subscribers:
+            wanted = [text for game, text in encoded if subscriber.wants(game)]
+            if wanted:
+                self._send(subscriber, '{"type": "delta", "events": [' + ", ".join(wanted) + "]}")
+
+    def _send(self, subscriber: Subscriber, message: str):
+        try:
+            subscriber.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Too far behind for deltas to be useful, start it over
+            while not subscriber.queue.empty():
+                subscriber.queue.get_nowait()
+            subscriber.queue.put_nowait(self._snapshot(subscriber))
+            self.resnapshots += 1
+        self.messages += 1
+
+    def _snapshot(self, subscriber: Subscriber) -> str:
+        games = [game for game in self._games.values() if subscriber.wants(game)]
+        return json.dumps({"type": "snapshot", "games": games})
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                games = await self._loader()
+            except Exception as e:
+                self.poll_failures += 1
+                print(f"⚠️  Spectator poll failed: {e}")
+                continue
+            self.publish(games)
+
+    def stats(self) -> dict:
+        """Snapshot of spectator and delta counters"""
+        return {
+            "subscribers": len(self._subscribers),
+            "games": len(self._games),
+            "ticks": self.ticks,
+            "events": self.events,
+            "messages": self.messages,
+            "resnapshots": self.resnapshots,
+            "poll_failures": self.poll_failures,
+        }
+
+
+# Global hub, polling only while spectators are connected
+spectator_hub = SpectatorHub(
+    poll_interval=settings.spectator_poll_ms / 1000,
+    queue_size=settings.spectator_queue_size,
+)
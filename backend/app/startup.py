@@ -0,0 +1,61 @@
+"""Breakdown of the time a worker takes to start serving
+
+Cold starts and rolling restarts wait for every worker to import the app
+and run its lifespan startup. app.main records its imports, and the
+lifespan times each startup phase with startup_timer.phase(). The
+breakdown is printed once the worker is ready and exported in /api/metrics
+as snake_arena_startup_phase_seconds.
+
+Time spent before app.main is imported (the interpreter, uvicorn) is not
+included; benchmarks.bench_startup measures launch to first response.
+"""
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+
+class StartupTimer:
+    """Seconds per named startup phase, in the order they ran"""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self._clock = clock
+        self.started = clock()
+        self.phases: Dict[str, float] = {}
+        self.ready_seconds: Optional[float] = None
+
+    def elapsed(self) -> float:
+        return self._clock() - self.started
+
+    def record(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the body of the with statement as phase name"""
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.record(name, self._clock() - start)
+
+    def ready(self):
+        """Mark the worker as ready to serve"""
+        self.ready_seconds = self.elapsed()
+
+    def report(self) -> str:
+        """One line per phase, then the total"""
+        lines = [f"  {name:<20}{seconds * 1000:>9.1f} ms" for name, seconds in self.phases.items()]
+        if self.ready_seconds is not None:
+            lines.append(f"  {'ready after':<20}{self.ready_seconds * 1000:>9.1f} ms")
+        return "\n".join(lines)
+
+    def stats(self) -> dict:
+        """Snapshot of phase durations"""
+        stats = {"phase_seconds": dict(self.phases)}
+        if self.ready_seconds is not None:
+            stats["ready_seconds"] = self.ready_seconds
+        return stats
+
+
+# Global timer, started when app.main begins importing
+startup_timer = StartupTimer()
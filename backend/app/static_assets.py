@@ -0,0 +1,218 @@
+"""Indexed static file serving for the built frontend
+
+The static directory is scanned once at startup. Every file gets a content
+hash (its ETag), and compressible files get gzip and brotli variants
+computed up front, or taken from .gz/.br files next to them. Requests are
+then answered from the index without touching the file system for lookups:
+the best encoding the client accepts is chosen, conditional requests are
+answered with 304, and files small enough are sent straight from memory.
+
+Vite puts content-hashed bundles under assets/, so those are cacheable
+forever; everything else, index.html in particular, must be revalidated.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional
+
+import brotli
+from fastapi import Request
+from starlette.responses import FileResponse, Response
+
+IMMUTABLE_PREFIX = "assets/"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+_COMPRESSIBLE_TYPES = {
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "application/wasm",
+    "application/xml",
+    "image/svg+xml",
+    "text/javascript",
+}
+
+# Preferred first when the client accepts several
+_ENCODINGS = ("br", "gzip")
+_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def _is_compressible(media_type: str) -> bool:
+    return media_type.startswith("text/") or media_type in _COMPRESSIBLE_TYPES
+
+
+def _compress(encoding: str, data: bytes) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _accepted_encodings(accept_encoding: Optional[str]) -> Dict[str, float]:
+    """Parse Accept-Encoding into {coding: q}"""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+class StaticAsset:
+    """One indexed file and its encoded variants"""
+
+    __slots__ = ("path", "size", "mtime", "media_type", "etag", "cache_control", "body", "variants")
+
+    def __init__(self, path: str, size: int, mtime: float, media_type: str, etag: str,
+                 cache_control: str, body: Optional[bytes]):
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.media_type = media_type
+        self.etag = etag
+        self.cache_control = cache_control
+        self.body = body  # None when too large to keep in memory
+        self.variants: Dict[str, bytes] = {}  # encoding -> compressed body
+
+
+class StaticIndex:
+    """In-memory index of a static directory, with a SPA fallback to index.html"""
+
+    def __init__(self, root: str, memory_max_file_bytes: int = 256 * 1024, compress_min_bytes: int = 1024):
+        self.root = root
+        self.memory_max_file_bytes = memory_max_file_bytes
+        self.compress_min_bytes = compress_min_bytes
+        self._assets: Dict[str, StaticAsset] = {}
+
+        # Metrics
+        self.responses: Dict[str, int] = {"identity": 0, "br": 0, "gzip": 0}
+        self.from_disk = 0
+        self.not_modified = 0
+        self.not_found = 0
+
+    def build(self):
+        """Scan the static directory and precompute every variant"""
+        assets = {}
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                full_path = os.path.join(directory, name)
+                key = os.path.relpath(full_path, self.root).replace(os.sep, "/")
+                if key.endswith((".gz", ".br")) and os.path.exists(full_path[:-3]):
+                    continue  # Precompressed sibling, picked up with its original
+                assets[key] = self._index_file(key, full_path)
+        self._assets = assets
+
+    def _index_file(self, key: str, full_path: str) -> StaticAsset:
+        with open(full_path, "rb") as f:
+            data = f.read()
+        stat = os.stat(full_path)
+        media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+        cache_control = IMMUTABLE_CACHE_CONTROL if key.startswith(IMMUTABLE_PREFIX) else REVALIDATE_CACHE_CONTROL
+        asset = StaticAsset(
+            path=full_path,
+            size=len(data),
+            mtime=stat.st_mtime,
+            media_type=media_type,
+            etag=hashlib.sha256(data).hexdigest()[:20],
+            cache_control=cache_control,
+            body=data if len(data) <= self.memory_max_file_bytes else None,
+        )
+
+        if _is_compressible(media_type) and len(data) >= self.compress_min_bytes:
+            for encoding in _ENCODINGS:
+                precompressed = full_path + _SUFFIXES[encoding]
+                if os.path.exists(precompressed):
+                    with open(precompressed, "rb") as f:
+                        encoded = f.read()
+                else:
+                    encoded = _compress(encoding, data)
+                # Only worth a Vary round trip if it saves something
+                if len(encoded) < len(data) * 0.9:
+                    asset.variants[encoding] = encoded
+        return asset
+
+    def lookup(self, path: str) -> Optional[StaticAsset]:
+        """Find the file for a URL path, falling back to index.html for app routes"""
+        asset = self._assets.get(path)
+        if asset is None and not path.startswith(IMMUTABLE_PREFIX):
+            asset = self._assets.get("index.html")
+        return asset
+
+    def _choose_encoding(self, asset: StaticAsset, accept_encoding: Optional[str]) -> str:
+        if not asset.variants:
+            return "identity"
+        accepted = _accepted_encodings(accept_encoding)
+        for encoding in _ENCODINGS:
+            q = accepted.get(encoding, accepted.get("*", 0.0))
+            if encoding in asset.variants and q > 0:
+                return encoding
+        return "identity"
+
+    def _not_modified(self, request: Request, asset: StaticAsset, etag: str) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return etag in tags or "*" in tags
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(asset.mtime) <= since
+        return False
+
+    def response(self, request: Request, path: str) -> Response:
+        """Serve a URL path from the index"""
+        asset = self.lookup(path)
+        if asset is None:
+            self.not_found += 1
+            return Response(status_code=404)
+
+        encoding = self._choose_encoding(asset, request.headers.get("accept-encoding"))
+        # Each encoding is a different representation with its own tag
+        etag = f'"{asset.etag}"' if encoding == "identity" else f'"{asset.etag}-{encoding}"'
+        headers = {
+            "ETag": etag,
+            "Last-Modified": formatdate(asset.mtime, usegmt=True),
+            "Cache-Control": asset.cache_control,
+        }
+        if asset.variants:
+            headers["Vary"] = "Accept-Encoding"
+
+        if self._not_modified(request, asset, etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        self.responses[encoding] += 1
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+            return Response(asset.variants[encoding], media_type=asset.media_type, headers=headers)
+        if asset.body is not None:
+            return Response(asset.body, media_type=asset.media_type, headers=headers)
+        self.from_disk += 1
+        return FileResponse(asset.path, media_type=asset.media_type, headers=headers)
+
+    def stats(self) -> dict:
+        """Snapshot of index size and responses by encoding"""
+        memory_bytes = 0
+        for asset in self._assets.values():
+            memory_bytes += len(asset.body or b"") + sum(map(len, asset.variants.values()))
+        return {
+            "files": len(self._assets),
+            "memory_bytes": memory_bytes,
+            "responses": dict(self.responses),
+            "from_disk": self.from_disk,
+            "not_modified": self.not_modified,
+            "not_found": self.not_found,
+        }
@@ -0,0 +1,85 @@
+"""Resource versions for conditional GETs
+
+Every cacheable resource has a counter that is bumped whenever its data
+changes. A response's ETag is built from the counter and the query
+parameters, so a poll with a matching If-None-Match can be answered with
+304 Not Modified before reading or serializing anything.
+
+Counters are per process and start over on restart; the process epoch in
+each tag keeps tags from different processes or restarts from matching.
+Leaderboard writes from other workers become visible, and bump the
+version, when the leaderboard is resynced.
+"""
+import secrets
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+LEADERBOARD = "leaderboard"
+ACTIVE_GAMES = "active-games"
+
+
+class ResourceVersions:
+    """Monotonic version counter per resource"""
+
+    def __init__(self):
+        self.epoch = secrets.token_hex(4)
+        self._versions: Dict[str, int] = {}
+        self._changed_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.not_modified = 0
+
+    def bump(self, resource: str):
+        """Record that a resource changed"""
+        with self._lock:
+            self._versions[resource] = self._versions.get(resource, 0) + 1
+            self._changed_at[resource] = time.monotonic()
+
+    def get(self, resource: str) -> int:
+        with self._lock:
+            return self._versions.get(resource, 0)
+
+    def changed_at(self, resource: str) -> float:
+        """time.monotonic() of the last bump, -inf if never bumped"""
+        with self._lock:
+            return self._changed_at.get(resource, float("-inf"))
+
+    def etag(self, resource: str, *params) -> str:
+        """Strong ETag for the current version of a resource and query
+
+        Take the tag before reading the data: a change in between then
+        produces a tag that is already out of date, never one that claims
+        newer data than was sent.
+        """
+        version = self.get(resource)
+        query = zlib.crc32(repr(params).encode())
+        return f'"{resource}-{self.epoch}-{version}-{query:08x}"'
+
+    def matches(self, if_none_match: Optional[str], etag: str) -> bool:
+        """Whether an If-None-Match header lets the request be answered with 304"""
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag.startswith("W/"):
+                # If-None-Match uses weak comparison
+                tag = tag[2:]
+            if tag == "*" or tag == etag:
+                self.not_modified += 1
+                return True
+        return False
+
+    def stats(self) -> dict:
+        """Snapshot of resource versions and 304 counter"""
+        with self._lock:
+            return {
+                "versions": dict(self._versions),
+                "not_modified": self.not_modified,
+            }
+
+
+# Global resource versions, bumped by the write paths
+resource_versions = ResourceVersions()
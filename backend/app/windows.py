@@ -0,0 +1,26 @@
+"""Calendar windows of the time-windowed leaderboards
+
+Windows are UTC days, ISO weeks starting on Monday and calendar months, each
+identified by its first day. A new window begins simply because the start
+computed for new scores, and for reads, moves on; nothing is recomputed.
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from app.models import LeaderboardWindow
+
+
+def window_start(window: LeaderboardWindow, when: datetime) -> date:
+    """First day of the window containing when (naive times are UTC)"""
+    if when.tzinfo is not None:
+        when = when.astimezone(timezone.utc)
+    day = when.date()
+    if window == LeaderboardWindow.week:
+        return day - timedelta(days=day.weekday())
+    if window == LeaderboardWindow.month:
+        return day.replace(day=1)
+    return day
+
+
+def current_window_start(window: LeaderboardWindow, now: Optional[datetime] = None) -> date:
+    return window_start(window, now or datetime.now(timezone.utc))
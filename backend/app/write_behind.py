@@ -0,0 +1,195 @@
+"""Write-behind buffering for score submissions
+
+Instead of one INSERT and commit per submitted score, submissions are
+collected and written with a single bulk INSERT every flush interval or as
+soon as enough rows are waiting. Depending on the write mode a request is
+acknowledged once its batch is committed ("flush_ack") or as soon as it is
+buffered ("immediate_ack", which can lose the buffer if the process dies).
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, List, Optional
+
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import aadd_leaderboard_entry, aadd_leaderboard_entries
+from app.models import LeaderboardEntry
+
+
+def _unwritable(error: Exception) -> bool:
+    """Whether the database rejected the rows themselves, rather than being unavailable"""
+    return isinstance(error, (DataError, IntegrityError)) and not error.connection_invalidated
+
+
+class ScoreWriteBuffer:
+    """Collects leaderboard entries and writes them in batches"""
+
+    def __init__(
+        self,
+        mode: str = "direct",
+        flush_interval_ms: int = 50,
+        flush_max_rows: int = 500,
+        max_rows: int = 10000,
+        writer: Callable[[List[LeaderboardEntry]], Awaitable[None]] = aadd_leaderboard_entries,
+    ):
+        self.mode = mode
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_max_rows = flush_max_rows
+        self.max_rows = max_rows
+        self._writer = writer
+        self._buffer: list = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        # Metrics
+        self.flushes = 0
+        self.flush_failures = 0
+        self.rows_flushed = 0
+        self.rows_dropped = 0  # acknowledged rows that could not be written on their own
+        self.max_flush_rows = 0
+        self.flush_seconds_total = 0.0
+        self.max_flush_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        """Start the background flusher on the running event loop"""
+        if self.mode == "direct" or self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def submit(self, entry: LeaderboardEntry, db: Optional[AsyncSession] = None):
+        """Record a score, returning once the write mode considers it accepted
+
+        In direct mode the entry is written in db, the request's session,
+        if given; batches are always written in a session of their own.
+        """
+        if not self.running:
+            await aadd_leaderboard_entry(entry, db)
+            return
+
+        # A full buffer applies backpressure by waiting for the flush
+        wait = self.mode == "flush_ack" or len(self._buffer) >= self.max_rows
+        future = asyncio.get_running_loop().create_future() if wait else None
+        self._buffer.append((entry, future))
+        if len(self._buffer) >= self.flush_max_rows:
+            self._wakeup.set()
+        if future is not None:
+            await future
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write everything buffered so far"""
+        while self._buffer:
+            batch = self._buffer[:self.flush_max_rows]
+            del self._buffer[:self.flush_max_rows]
+
+            start = time.perf_counter()
+            try:
+                await self._writer([entry for entry, _ in batch])
+            except Exception as e:
+                self.flush_failures += 1
+                if not _unwritable(e):
+                    print(f"⚠️  Score flush of {len(batch)} rows failed: {e}")
+                    self._retry_later(batch, e)
+                    return
+                print(f"⚠️  Score flush of {len(batch)} rows was rejected, retrying them one by one: {e}")
+                if not await self._write_one_by_one(batch):
+                    return
+                continue
+
+            elapsed = time.perf_counter() - start
+            self.flushes += 1
+            self.rows_flushed += len(batch)
+            self.max_flush_rows = max(self.max_flush_rows, len(batch))
+            self.flush_seconds_total += elapsed
+            self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+            for _, future in batch:
+                if future is not None and not future.done():
+                    future.set_result(None)
+
+    def _retry_later(self, rows: list, error: Exception):
+        # Callers waiting for these rows get the error; acknowledged rows
+        # have nobody to report to and go back in front of the buffer
+        for _, future in rows:
+            if future is not None and not future.done():
+                future.set_exception(error)
+        self._buffer[:0] = [(entry, f) for entry, f in rows if f is None]
+
+    async def _write_one_by_one(self, batch: list) -> bool:
+        """Write the rows of a rejected batch separately, so one bad row cannot block the rest
+
+        A row the database rejects (a data or integrity error) cannot be
+        stored: its caller gets the error, or if it was already acknowledged
+        it is dropped. Any other error means the database became
+        unavailable; that row and the ones not tried yet are kept for the
+        next flush and False is returned.
+        """
+        for i, (entry, future) in enumerate(batch):
+            try:
+                await self._writer([entry])
+            except Exception as e:
+                if not _unwritable(e):
+                    self._retry_later(batch[i:], e)
+                    return False
+                if future is None:
+                    self.rows_dropped += 1
+                    print(f"❌ Dropped score {entry.id} of {entry.username}, it cannot be written: {e}")
+                elif not future.done():
+                    future.set_exception(e)
+                continue
+            self.rows_flushed += 1
+            if future is not None and not future.done():
+                future.set_result(None)
+        return True
+
+    async def drain(self):
+        """Stop the flusher and write whatever is still buffered"""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        # Let a flush in progress finish rather than cancelling it midway
+        self._stopping = True
+        self._wakeup.set()
+        await task
+        await self.flush()
+        if self._buffer:
+            print(f"❌ {len(self._buffer)} buffered scores could not be written")
+
+    def stats(self) -> dict:
+        """Snapshot of buffer depth and flush size/latency counters"""
+        return {
+            "mode": self.mode,
+            "buffered": len(self._buffer),
+            "flushes": self.flushes,
+            "flush_failures": self.flush_failures,
+            "rows_flushed": self.rows_flushed,
+            "rows_dropped": self.rows_dropped,
+            "max_flush_rows": self.max_flush_rows,
+            "flush_seconds_total": self.flush_seconds_total,
+            "max_flush_seconds": self.max_flush_seconds,
+        }
+
+
+# Global score buffer, started in the application lifespan
+score_writer = ScoreWriteBuffer(
+    mode=settings.score_write_mode,
+    flush_interval_ms=settings.score_flush_interval_ms,
+    flush_max_rows=settings.score_flush_max_rows,
+    max_rows=settings.score_buffer_max_rows,
+)
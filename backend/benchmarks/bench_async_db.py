@@ -0,0 +1,112 @@
+"""Concurrent-request throughput of the sync vs async database helpers
+
+Simulates N concurrent requests on one event loop, each reading the
+leaderboard. "sync" calls the blocking helper directly from the coroutine,
+which is what the routes did before; "async" awaits the async helper. Besides
+throughput it reports the worst event-loop stall seen by a 1 ms ticker, which
+is what every other request on the worker experiences.
+
+Usage:
+    uv run python -m benchmarks.bench_async_db [--requests 2000] [--concurrency 50]
+
+DATABASE_URL selects the database (a temporary SQLite file by default).
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+
+if "DATABASE_URL" not in os.environ:
+    _fd, _path = tempfile.mkstemp(suffix=".db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{_path}"
+
+from app.database import (  # noqa: E402
+    init_db, get_leaderboard, aget_leaderboard, async_engine, SessionLocal,
+)
+from app.db_models import LeaderboardEntryDB, GameModeEnum  # noqa: E402
+from app.models import GameMode  # noqa: E402
+
+
+def seed(rows: int):
+    db = SessionLocal()
+    db.add_all(
+        LeaderboardEntryDB(
+            id=str(uuid.uuid4()),
+            username=f"player{i % 100}",
+            score=(i * 7919) % 10000,
+            mode=GameModeEnum.walls if i % 2 else GameModeEnum.pass_through,
+            timestamp=datetime.now(timezone.utc)
+        )
+        for i in range(rows)
+    )
+    db.commit()
+    db.close()
+
+
+async def run(name: str, handler, requests: int, concurrency: int) -> dict:
+    remaining = requests
+    max_stall = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal max_stall
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            max_stall = max(max_stall, now - last - 0.001)
+            last = now
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await handler()
+
+    tick = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await tick
+
+    return {
+        "name": name,
+        "rps": requests / elapsed,
+        "max_loop_stall_ms": max_stall * 1000,
+    }
+
+
+async def sync_handler():
+    get_leaderboard(GameMode.walls, 10)
+
+
+async def async_handler():
+    await aget_leaderboard(GameMode.walls, 10)
+
+
+async def main(args):
+    results = [
+        await run("sync (before)", sync_handler, args.requests, args.concurrency),
+        await run("async (after)", async_handler, args.requests, args.concurrency),
+    ]
+    await async_engine.dispose()
+
+    print(f"{'path':<16}{'req/s':>10}{'max loop stall':>18}")
+    for r in results:
+        print(f"{r['name']:<16}{r['rps']:>10.0f}{r['max_loop_stall_ms']:>15.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    init_db()
+    seed(args.rows)
+    asyncio.run(main(args))
@@ -0,0 +1,280 @@
+"""Scaling of the database helpers with table size, split by layer
+
+Times get_leaderboard, get_active_games, get_user_by_email and
+add_leaderboard_entry from app.database on datasets of increasing size, and
+breaks each call down into:
+
+    sql      running the same statement through Core and fetching plain rows
+    orm      hydrating ORM objects from those rows (ORM query minus sql)
+    convert  building the returned pydantic models or dicts from the objects
+    other    the rest of the helper: session setup, commit, cache updates
+
+so it is clear which layer a slowdown comes from. Figures are medians over
+--repeat calls, in milliseconds.
+
+Datasets are generated with Core executemany in large batches and grow in
+place from one size to the next, so only the difference is inserted. Ten
+million leaderboard rows take a few minutes on SQLite.
+
+Usage:
+    uv run python -m benchmarks.bench_database [--sizes 1000 10000 100000 1000000]
+        [--games 100 1000 5000] [--limits 10 100] [--repeat 50] [--output results.json]
+
+DATABASE_URL selects the database (a temporary SQLite file by default).
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+
+if "DATABASE_URL" not in os.environ:
+    _fd, _path = tempfile.mkstemp(suffix=".db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{_path}"
+
+from sqlalchemy import delete, insert, select  # noqa: E402
+
+from app.database import (  # noqa: E402
+    engine, init_db, SessionLocal, _leaderboard_query, _entry_from_row, _game_from_db, _user_to_dict,
+    get_leaderboard, get_active_games, get_user_by_email, add_leaderboard_entry,
+)
+from app.db_models import UserDB, LeaderboardEntryDB, ActiveGameDB, GameModeEnum  # noqa: E402
+from app.game_codec import encode_points, encode_point  # noqa: E402
+from app.models import GameMode, LeaderboardEntry  # noqa: E402
+
+BATCH = 50_000
+USERS_PER_ENTRY = 0.1  # players have ten scores each on average
+MODES = [GameModeEnum.walls, GameModeEnum.pass_through]
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _id(prefix: int, i: int) -> str:
+    # Valid, distinct and much cheaper than uuid4() at millions of rows
+    return f"{prefix:08x}-0000-4000-8000-{i:012x}"
+
+
+def _email(i: int) -> str:
+    return f"player{i}@example.com"
+
+
+def _insert_batches(table, rows):
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == BATCH:
+                conn.execute(insert(table), batch)
+                conn.commit()
+                batch = []
+        if batch:
+            conn.execute(insert(table), batch)
+            conn.commit()
+        if engine.dialect.name == "sqlite":
+            conn.exec_driver_sql("PRAGMA synchronous=FULL")
+
+
+def grow_leaderboard(start: int, stop: int, rng: random.Random):
+    """Add leaderboard rows start..stop-1 and their users"""
+    _insert_batches(LeaderboardEntryDB.__table__, (
+        {
+            "id": _id(1, i),
+            "username": f"player{rng.randrange(max(int(stop * USERS_PER_ENTRY), 1))}",
+            # Skewed like real scores: many low, few high
+            "score": int(rng.expovariate(1 / 500)),
+            "mode": MODES[i % 2],
+            "timestamp": EPOCH + timedelta(seconds=i),
+        }
+        for i in range(start, stop)
+    ))
+    _insert_batches(UserDB.__table__, (
+        {
+            "id": _id(2, i),
+            "email": _email(i),
+            "username": f"player{i}",
+            "password_hash": "x" * 60,
+            "created_at": EPOCH,
+        }
+        for i in range(int(start * USERS_PER_ENTRY), int(stop * USERS_PER_ENTRY))
+    ))
+
+
+def fill_active_games(count: int, rng: random.Random):
+    """Replace the active games with count games of varied length"""
+    with engine.begin() as conn:
+        conn.execute(delete(ActiveGameDB))
+    _insert_batches(ActiveGameDB.__table__, (
+        {
+            "id": _id(3, i),
+            "username": f"player{i}",
+            "score": rng.randrange(2000),
+            "mode": MODES[i % 2],
+            "snake": encode_points([{"x": (x % 40), "y": i % 40} for x in range(rng.randrange(3, 60))]),
+            "food": encode_point({"x": rng.randrange(40), "y": rng.randrange(40)}),
+            "updated_at": EPOCH,
+        }
+        for i in range(count)
+    ))
+
+
+def median_ms(fn: Callable, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def breakdown(total: float, sql: float, orm: float, convert: float) -> Dict[str, float]:
+    return {
+        "total": total,
+        "sql": sql,
+        "orm": max(orm - sql, 0.0),
+        "convert": convert,
+        "other": max(total - orm - convert, 0.0),
+    }
+
+
+def bench_leaderboard(mode: GameMode, limit: int, repeat: int) -> Dict[str, float]:
+    # Read as tuples, so there are no ORM objects to hydrate
+    query = _leaderboard_query(mode, limit)
+
+    def sql():
+        with engine.connect() as conn:
+            conn.execute(query).all()
+
+    with engine.connect() as conn:
+        rows = conn.execute(query).all()
+    convert = median_ms(lambda: [_entry_from_row(row) for row in rows], repeat)
+
+    sql_ms = median_ms(sql, repeat)
+    return breakdown(median_ms(lambda: get_leaderboard(mode, limit), repeat), sql_ms, sql_ms, convert)
+
+
+def bench_active_games(repeat: int) -> Dict[str, float]:
+    def sql():
+        with engine.connect() as conn:
+            conn.execute(select(ActiveGameDB.__table__)).all()
+
+    def orm():
+        with SessionLocal() as db:
+            db.query(ActiveGameDB).all()
+
+    with SessionLocal() as db:
+        games = db.query(ActiveGameDB).all()
+        convert = median_ms(lambda: [_game_from_db(game) for game in games], repeat)
+
+    return breakdown(median_ms(get_active_games, repeat), median_ms(sql, repeat), median_ms(orm, repeat), convert)
+
+
+def bench_user_by_email(users: int, repeat: int, rng: random.Random) -> Dict[str, float]:
+    def email():
+        return _email(rng.randrange(users))
+
+    def sql():
+        with engine.connect() as conn:
+            conn.execute(select(UserDB.__table__).where(UserDB.email == email())).first()
+
+    def orm():
+        with SessionLocal() as db:
+            db.query(UserDB).filter(UserDB.email == email()).first()
+
+    with SessionLocal() as db:
+        user = db.query(UserDB).filter(UserDB.email == email()).first()
+        convert = median_ms(lambda: _user_to_dict(user), repeat)
+
+    return breakdown(
+        median_ms(lambda: get_user_by_email(email()), repeat),
+        median_ms(sql, repeat), median_ms(orm, repeat), convert,
+    )
+
+
+def bench_add_entry(repeat: int, rng: random.Random) -> Dict[str, float]:
+    def entry_values() -> dict:
+        return {
+            "id": str(uuid.uuid4()),
+            "username": "bench",
+            "score": rng.randrange(5000),
+            "mode": GameMode.walls,
+            "timestamp": datetime.now(timezone.utc),
+        }
+
+    def sql():
+        values = entry_values()
+        values["mode"] = GameModeEnum.walls
+        with engine.begin() as conn:
+            conn.execute(insert(LeaderboardEntryDB), values)
+
+    def orm():
+        values = entry_values()
+        values["mode"] = GameModeEnum.walls
+        with SessionLocal() as db:
+            db.add(LeaderboardEntryDB(**values))
+            db.commit()
+
+    values = entry_values()
+    return breakdown(
+        median_ms(lambda: add_leaderboard_entry(LeaderboardEntry(**entry_values())), repeat),
+        median_ms(sql, repeat), median_ms(orm, repeat),
+        median_ms(lambda: LeaderboardEntry(**values), repeat),
+    )
+
+
+def print_row(name: str, size: int, r: Dict[str, float]):
+    print(f"{name:<34}{size:>10}" + "".join(f"{r[key]:>10.3f}" for key in ("total", "sql", "orm", "convert", "other")))
+
+
+def main(args):
+    init_db()
+    rng = random.Random(args.seed)
+    results: List[dict] = []
+
+    def record(name: str, size: int, r: Dict[str, float]):
+        print_row(name, size, r)
+        results.append({"function": name, "size": size, **r})
+
+    header = f"{'function':<34}{'rows':>10}" + "".join(f"{key:>10}" for key in ("total", "sql", "orm", "convert", "other"))
+    print(f"Times in ms ({engine.dialect.name})")
+    print(header)
+
+    rows = 0
+    for size in sorted(args.sizes):
+        start = time.perf_counter()
+        grow_leaderboard(rows, size, rng)
+        rows = size
+        print(f"-- {size} leaderboard rows ({time.perf_counter() - start:.1f} s to build)")
+        for mode in (None, GameMode.walls, GameMode.pass_through):
+            for limit in args.limits:
+                name = f"get_leaderboard({mode.value if mode else 'all'}, {limit})"
+                record(name, size, bench_leaderboard(mode, limit, args.repeat))
+        record("get_user_by_email", int(size * USERS_PER_ENTRY), bench_user_by_email(
+            max(int(size * USERS_PER_ENTRY), 1), args.repeat, rng
+        ))
+        record("add_leaderboard_entry", size, bench_add_entry(args.repeat, rng))
+
+    for count in sorted(args.games):
+        fill_active_games(count, rng)
+        print(f"-- {count} active games")
+        record("get_active_games", count, bench_active_games(max(args.repeat // 5, 3)))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"database": engine.dialect.name, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--games", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--limits", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the results as JSON")
+    main(parser.parse_args())
@@ -0,0 +1,37 @@
+"""Storage size and decode time of JSON vs packed active game positions
+
+Compares the JSON text the active_games columns used to hold with the packed
+int16 encoding from app.game_codec, for snakes of increasing length.
+
+Usage:
+    uv run python -m benchmarks.bench_game_codec [--iterations 20000]
+"""
+import argparse
+import json
+import timeit
+
+from app.game_codec import encode_points, decode_points
+
+
+def main(args):
+    print(f"{'length':>8}{'json bytes':>12}{'packed bytes':>14}{'json decode':>14}{'packed decode':>16}")
+    for length in args.lengths:
+        snake = [{"x": i % 20, "y": (i // 20) % 20} for i in range(length)]
+        as_json = json.dumps(snake)
+        packed = encode_points(snake)
+
+        json_time = timeit.timeit(lambda: json.loads(as_json), number=args.iterations)
+        packed_time = timeit.timeit(lambda: decode_points(packed), number=args.iterations)
+
+        print(
+            f"{length:>8}{len(as_json):>12}{len(packed):>14}"
+            f"{json_time / args.iterations * 1e6:>11.2f} us"
+            f"{packed_time / args.iterations * 1e6:>13.2f} us"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[3, 10, 50, 200])
+    main(parser.parse_args())
@@ -0,0 +1,102 @@
+"""CPU time of encoding list responses, response_model vs FastJSONResponse
+
+"response_model" is what FastAPI does with data a route returns: validate
+it against the route's response field, convert it to JSON-compatible
+objects and encode that with the json module (serialize_response plus
+JSONResponse). "fast" is FastJSONResponse, which encodes the same data once.
+Both run on the real routes' response fields, for leaderboard pages and
+active game lists of increasing size, and the outputs are checked to match.
+
+Usage:
+    uv run python -m benchmarks.bench_serialization [--iterations 20000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+
+if "DATABASE_URL" not in os.environ:
+    _fd, _path = tempfile.mkstemp(suffix=".db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{_path}"
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import APIRoute, serialize_response  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.models import LeaderboardEntry, GameMode  # noqa: E402
+from app.responses import FastJSONResponse  # noqa: E402
+
+
+def _response_field(path: str):
+    for route in app.routes:
+        if isinstance(route, APIRoute) and route.path == path:
+            return route.response_field
+    raise LookupError(path)
+
+
+def leaderboard_page(size: int):
+    return [
+        LeaderboardEntry.model_construct(
+            id=str(uuid.uuid4()), username=f"player{i}", score=10000 - i,
+            mode=GameMode.walls, timestamp=datetime.now(timezone.utc),
+        )
+        for i in range(size)
+    ]
+
+
+def active_games(size: int):
+    return [
+        {
+            "id": str(uuid.uuid4()), "username": f"player{i}", "score": i * 10, "mode": "walls",
+            "snake": [{"x": x % 40, "y": i % 40} for x in range(20)], "food": {"x": 3, "y": 4},
+        }
+        for i in range(size)
+    ]
+
+
+def cpu_time(fn, iterations: int) -> float:
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) / iterations
+
+
+def main(args):
+    loop = asyncio.new_event_loop()
+    cases = [
+        ("leaderboard", size, "/api/leaderboard", leaderboard_page(size)) for size in (10, 100)
+    ] + [
+        ("active games", size, "/api/games/active", active_games(size)) for size in (10, 100, 1000)
+    ]
+
+    print(f"{'response':<14}{'items':>7}{'response_model':>17}{'fast':>12}{'saved':>9}")
+    for name, size, path, content in cases:
+        field = _response_field(path)
+
+        def standard():
+            return JSONResponse(loop.run_until_complete(
+                serialize_response(field=field, response_content=content)
+            )).body
+
+        def fast():
+            return FastJSONResponse(content).body
+
+        assert json.loads(standard()) == json.loads(fast())
+        iterations = max(args.iterations // size, 20)
+        before = cpu_time(standard, iterations)
+        after = cpu_time(fast, iterations)
+        print(
+            f"{name:<14}{size:>7}{before * 1e6:>14.0f} us{after * 1e6:>9.0f} us"
+            f"{(1 - after / before) * 100:>8.0f}%"
+        )
+    loop.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    main(parser.parse_args())
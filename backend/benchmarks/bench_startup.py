@@ -0,0 +1,109 @@
+"""Time from process launch to the first request served
+
+Starts uvicorn repeatedly in each startup schema mode and measures how long
+it takes from launching the process to the first successful response from
+/api/health, which uvicorn only serves once the lifespan startup is done.
+After each launch the worker's own breakdown is read from /api/metrics, so
+the report also shows where the time went (imports, schema, cache loads).
+
+The database is migrated with Alembic first, as check_revision requires.
+
+Usage:
+    uv run python -m benchmarks.bench_startup [--runs 5]
+        [--modes create_all check_revision] [--warm-connections 0]
+
+DATABASE_URL selects the database (a temporary SQLite file by default).
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, Tuple
+
+if "DATABASE_URL" not in os.environ:
+    _fd, _path = tempfile.mkstemp(suffix=".db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{_path}"
+
+import httpx  # noqa: E402
+
+MODES = ("create_all", "check_revision")
+PHASE = re.compile(r'^snake_arena_startup_phase_seconds\{key="([^"]+)"\} (\S+)$', re.M)
+
+
+def migrate():
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(os.path.join(os.path.dirname(__file__), "..", "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", os.environ["DATABASE_URL"].replace("%", "%%"))
+    command.upgrade(config, "head")
+
+
+def launch(mode: str, port: int, warm_connections: int, timeout: float = 60.0) -> Tuple[float, Dict[str, float]]:
+    """Seconds from launch to the first response, and the worker's startup phases"""
+    env = dict(os.environ, STARTUP_SCHEMA_MODE=mode, STARTUP_WARM_CONNECTIONS=str(warm_connections))
+    url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning",
+         "--no-access-log"],
+        env=env, stdout=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(timeout=5.0) as client:
+            while True:
+                if server.poll() is not None:
+                    raise SystemExit(f"uvicorn exited with status {server.returncode} in {mode} mode")
+                if time.perf_counter() - start > timeout:
+                    raise SystemExit(f"uvicorn did not respond within {timeout:g} seconds in {mode} mode")
+                try:
+                    if client.get(f"{url}/api/health").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.005)
+            elapsed = time.perf_counter() - start
+            metrics = client.get(f"{url}/api/metrics").text
+    finally:
+        server.terminate()
+        server.wait()
+    return elapsed, {name: float(value) for name, value in PHASE.findall(metrics)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="launches per mode")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--warm-connections", type=int, default=0, help="STARTUP_WARM_CONNECTIONS")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    migrate()
+    # One unmeasured launch, so every measured one finds the bytecode cached
+    launch(args.modes[0], args.port, args.warm_connections)
+
+    for mode in args.modes:
+        times = []
+        phases = defaultdict(list)
+        for _ in range(args.runs):
+            elapsed, breakdown = launch(mode, args.port, args.warm_connections)
+            times.append(elapsed)
+            for name, seconds in breakdown.items():
+                phases[name].append(seconds)
+
+        print(f"\n{mode}: launch to first response over {args.runs} runs")
+        print(f"  {'median':<20}{statistics.median(times) * 1000:>9.1f} ms")
+        print(f"  {'min':<20}{min(times) * 1000:>9.1f} ms")
+        print(f"  {'max':<20}{max(times) * 1000:>9.1f} ms")
+        print("  median per phase, as measured by the worker:")
+        for name, values in phases.items():
+            print(f"    {name:<18}{statistics.median(values) * 1000:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
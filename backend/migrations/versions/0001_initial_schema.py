@@ -0,0 +1,72 @@
+"""Initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 09:00:00.000000
+
+Databases created before migrations were introduced already have these
+tables; mark them as current with `alembic stamp 0001` before upgrading.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+game_mode = sa.Enum("walls", "pass_through", name="gamemodeenum")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "users",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("password_hash", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "leaderboard",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False),
+        sa.Column("mode", game_mode, nullable=False),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_leaderboard_id", "leaderboard", ["id"])
+    op.create_index("ix_leaderboard_username", "leaderboard", ["username"])
+    op.create_index("ix_leaderboard_mode", "leaderboard", ["mode"])
+
+    op.create_table(
+        "active_games",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False),
+        sa.Column("mode", game_mode, nullable=False),
+        sa.Column("snake", sa.Text(), nullable=False),
+        sa.Column("food", sa.Text(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_active_games_id", "active_games", ["id"])
+    op.create_index("ix_active_games_username", "active_games", ["username"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("active_games")
+    op.drop_table("leaderboard")
+    op.drop_table("users")
+    game_mode.drop(op.get_bind(), checkfirst=True)
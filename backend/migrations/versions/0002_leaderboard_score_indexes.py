@@ -0,0 +1,47 @@
+"""Composite score indexes for the leaderboard
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 10:00:00.000000
+
+Replaces the single-column mode index with (mode, score DESC, id DESC) and
+adds (score DESC, id DESC) for the all-modes leaderboard, so top-N and
+keyset-paginated reads walk an index instead of sorting. On Postgres both
+indexes cover the remaining columns to allow index-only scans.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_leaderboard_mode_score_id",
+        "leaderboard",
+        ["mode", sa.text("score DESC"), sa.text("id DESC")],
+        postgresql_include=["username", "timestamp"],
+    )
+    op.create_index(
+        "ix_leaderboard_score_id",
+        "leaderboard",
+        [sa.text("score DESC"), sa.text("id DESC")],
+        postgresql_include=["mode", "username", "timestamp"],
+    )
+    # The composite index starts with mode, so this one is redundant
+    op.drop_index("ix_leaderboard_mode", table_name="leaderboard")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index("ix_leaderboard_mode", "leaderboard", ["mode"])
+    op.drop_index("ix_leaderboard_score_id", table_name="leaderboard")
+    op.drop_index("ix_leaderboard_mode_score_id", table_name="leaderboard")
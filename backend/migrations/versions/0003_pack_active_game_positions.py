@@ -0,0 +1,96 @@
+"""Store active game positions as packed binary
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 11:00:00.000000
+
+Converts active_games.snake and active_games.food from JSON text to packed
+int16 (x, y) pairs, rewriting existing rows. The format is that of
+app.game_codec at the time, repeated here so the migration does not change
+if the application code does.
+"""
+import json
+import struct
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _encode_points(points) -> bytes:
+    """Pack {"x", "y"} dicts into little-endian int16 (x, y) pairs"""
+    flat = [value for point in points for value in (point["x"], point["y"])]
+    return struct.pack(f"<{len(flat)}h", *flat)
+
+
+def _encode_point(point) -> bytes:
+    return _encode_points([point])
+
+
+def _decode_points(data: bytes) -> list:
+    values = iter(struct.unpack(f"<{len(data) // 2}h", data))
+    return [{"x": x, "y": y} for x, y in zip(values, values)]
+
+
+def _decode_point(data: bytes) -> dict:
+    return _decode_points(data)[0]
+
+
+def _swap_columns(old_type, new_type, convert_snake, convert_food):
+    """Replace snake/food with columns of new_type, converting every row"""
+    active_games = sa.table(
+        "active_games",
+        sa.column("id", sa.String()),
+        sa.column("snake", old_type),
+        sa.column("food", old_type),
+        sa.column("snake_packed", new_type),
+        sa.column("food_packed", new_type),
+    )
+
+    with op.batch_alter_table("active_games") as batch:
+        batch.add_column(sa.Column("snake_packed", new_type, nullable=True))
+        batch.add_column(sa.Column("food_packed", new_type, nullable=True))
+
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.select(active_games.c.id, active_games.c.snake, active_games.c.food)
+    ).all()
+    for game_id, snake, food in rows:
+        connection.execute(
+            active_games.update()
+            .where(active_games.c.id == game_id)
+            .values(snake_packed=convert_snake(snake), food_packed=convert_food(food))
+        )
+
+    with op.batch_alter_table("active_games") as batch:
+        batch.drop_column("snake")
+        batch.drop_column("food")
+        batch.alter_column("snake_packed", new_column_name="snake", existing_type=new_type, nullable=False)
+        batch.alter_column("food_packed", new_column_name="food", existing_type=new_type, nullable=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _swap_columns(
+        sa.Text(),
+        sa.LargeBinary(),
+        lambda snake: _encode_points(json.loads(snake)),
+        lambda food: _encode_point(json.loads(food)),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _swap_columns(
+        sa.LargeBinary(),
+        sa.Text(),
+        lambda snake: json.dumps(_decode_points(snake)),
+        lambda food: json.dumps(_decode_point(food)),
+    )
@@ -0,0 +1,76 @@
+"""Best score per user and mode
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 12:00:00.000000
+
+Adds user_best_scores, keyed by (username, mode) and kept up to date by an
+upsert whenever scores are added, for the best-per-player leaderboard.
+Existing leaderboard entries are backfilled.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+game_mode = sa.Enum("walls", "pass_through", name="gamemodeenum", create_type=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    user_best_scores = op.create_table(
+        "user_best_scores",
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("mode", game_mode, nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False),
+        sa.Column("entry_id", sa.String(), nullable=False),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("username", "mode"),
+    )
+    op.create_index(
+        "ix_user_best_scores_mode_score_entry",
+        "user_best_scores",
+        ["mode", sa.text("score DESC"), sa.text("entry_id DESC")],
+        postgresql_include=["username", "timestamp"],
+    )
+    op.create_index(
+        "ix_user_best_scores_score_entry",
+        "user_best_scores",
+        [sa.text("score DESC"), sa.text("entry_id DESC")],
+        postgresql_include=["mode", "username", "timestamp"],
+    )
+
+    # Each user's best entry per mode: no entry of theirs ranks above it
+    leaderboard = sa.table(
+        "leaderboard",
+        sa.column("id", sa.String()),
+        sa.column("username", sa.String()),
+        sa.column("score", sa.Integer()),
+        sa.column("mode", game_mode),
+        sa.column("timestamp", sa.DateTime()),
+    )
+    better = leaderboard.alias("better")
+    best_entries = sa.select(
+        leaderboard.c.username, leaderboard.c.mode, leaderboard.c.score, leaderboard.c.id, leaderboard.c.timestamp
+    ).where(~sa.exists().where(
+        better.c.username == leaderboard.c.username,
+        better.c.mode == leaderboard.c.mode,
+        sa.tuple_(better.c.score, better.c.id) > sa.tuple_(leaderboard.c.score, leaderboard.c.id),
+    ))
+    op.execute(user_best_scores.insert().from_select(
+        ["username", "mode", "score", "entry_id", "timestamp"], best_entries
+    ))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_user_best_scores_score_entry", table_name="user_best_scores")
+    op.drop_index("ix_user_best_scores_mode_score_entry", table_name="user_best_scores")
+    op.drop_table("user_best_scores")
@@ -0,0 +1,103 @@
+"""Best scores per day, week and month
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 13:00:00.000000
+
+Adds leaderboard_windows, the best entry of each user per mode in every
+calendar window, kept up to date by an upsert whenever scores are added.
+Only the windows in progress are backfilled, from the entries since the
+earliest of their starts; older windows start out empty. Window starts are
+computed as app.windows did at the time, repeated here so the migration
+does not change if the application code does.
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+game_mode = sa.Enum("walls", "pass_through", name="gamemodeenum", create_type=False)
+window_period = sa.Enum("day", "week", "month", name="leaderboardwindowenum")
+
+
+def _window_start(window: str, when: datetime) -> date:
+    """First day of the UTC day, ISO week or calendar month containing when"""
+    if when.tzinfo is not None:
+        when = when.astimezone(timezone.utc)
+    day = when.date()
+    if window == "week":
+        return day - timedelta(days=day.weekday())
+    if window == "month":
+        return day.replace(day=1)
+    return day
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    leaderboard_windows = op.create_table(
+        "leaderboard_windows",
+        sa.Column("period", window_period, nullable=False),
+        sa.Column("period_start", sa.Date(), nullable=False),
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("mode", game_mode, nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False),
+        sa.Column("entry_id", sa.String(), nullable=False),
+        sa.Column("timestamp", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("period", "period_start", "username", "mode"),
+    )
+    op.create_index(
+        "ix_leaderboard_windows_mode_score_entry",
+        "leaderboard_windows",
+        ["period", "period_start", "mode", sa.text("score DESC"), sa.text("entry_id DESC")],
+        postgresql_include=["username", "timestamp"],
+    )
+    op.create_index(
+        "ix_leaderboard_windows_score_entry",
+        "leaderboard_windows",
+        ["period", "period_start", sa.text("score DESC"), sa.text("entry_id DESC")],
+        postgresql_include=["mode", "username", "timestamp"],
+    )
+
+    leaderboard = sa.table(
+        "leaderboard",
+        sa.column("id", sa.String()),
+        sa.column("username", sa.String()),
+        sa.column("score", sa.Integer()),
+        sa.column("mode", game_mode),
+        sa.column("timestamp", sa.DateTime()),
+    )
+    now = datetime.now(timezone.utc)
+    starts = {window: _window_start(window, now) for window in window_period.enums}
+    since = datetime.combine(min(starts.values()), datetime.min.time())
+    best = {}
+    for entry_id, username, score, mode, timestamp in op.get_bind().execute(
+        sa.select(leaderboard.c.id, leaderboard.c.username, leaderboard.c.score, leaderboard.c.mode,
+                  leaderboard.c.timestamp).where(leaderboard.c.timestamp >= since)
+    ):
+        for window, start in starts.items():
+            if _window_start(window, timestamp) != start:
+                continue
+            key = (window, start, username, mode)
+            if key not in best or (score, entry_id) > (best[key]["score"], best[key]["entry_id"]):
+                best[key] = {
+                    "period": window, "period_start": start, "username": username, "mode": mode,
+                    "score": score, "entry_id": entry_id, "timestamp": timestamp,
+                }
+    if best:
+        op.bulk_insert(leaderboard_windows, list(best.values()))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_leaderboard_windows_score_entry", table_name="leaderboard_windows")
+    op.drop_index("ix_leaderboard_windows_mode_score_entry", table_name="leaderboard_windows")
+    op.drop_table("leaderboard_windows")
+    window_period.drop(op.get_bind(), checkfirst=True)
@@ -4,6 +4,14 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.db_models import Base
 from app.database import init_db
+from app.rate_limit import auth_rate_limiter
+
+
+@pytest.fixture(autouse=True)
+def reset_auth_rate_limits():
+    """Every test client request comes from the same address"""
+    auth_rate_limiter.clear()
+    yield
 
 
 @pytest.fixture(scope="function")
@@ -30,6 +30,22 @@ def test_signup():
     assert "token" in data
 
 
+def test_signup_duplicate_email(monkeypatch):
+    from app.routers import auth
+    signup = {"email": "taken@example.com", "username": "first", "password": "password123"}
+    assert client.post("/api/auth/signup", json=signup).status_code == 201
+    assert client.post("/api/auth/signup", json=signup).status_code == 409
+
+    # A signup that passed the check while another was hashing hits the unique constraint
+    async def not_found(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(auth, "aget_user_by_email", not_found)
+    response = client.post("/api/auth/signup", json=signup)
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Email already exists"
+
+
 def test_login():
     # First signup
     client.post(
@@ -54,3 +70,19 @@ def test_login_invalid_credentials():
         json={"email": "wrong@example.com", "password": "wrongpassword"}
     )
     assert response.status_code == 401
+
+
+def test_me_is_served_from_user_cache():
+    from app.cache import user_cache
+    response = client.post(
+        "/api/auth/signup",
+        json={"email": "cached@example.com", "username": "cacheduser", "password": "password123"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['token']}"}
+
+    first = client.get("/api/auth/me", headers=headers)
+    hits = user_cache.stats()["hits"]
+    second = client.get("/api/auth/me", headers=headers)
+
+    assert first.json() == second.json()
+    assert user_cache.stats()["hits"] == hits + 1
@@ -0,0 +1,117 @@
+import asyncio
+from app.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 4.9
+    assert cache.get("a") == 1
+    clock.now = 5.0
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_concurrent_misses_are_coalesced():
+    cache = TTLCache(maxsize=10, ttl=60)
+    calls = []
+
+    async def loader(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return key.upper()
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_load("a", loader) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["A"] * 5
+    assert calls == ["a"]
+    assert cache.stats()["coalesced"] == 4
+    assert cache.get("a") == "A"
+
+
+def test_invalidation_during_load_skips_store():
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    async def loader(key):
+        cache.invalidate(key)
+        return "stale"
+
+    assert asyncio.run(cache.get_or_load("a", loader)) == "stale"
+    assert cache.get("a") is None
+
+
+def test_none_is_not_cached():
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    async def loader(key):
+        return None
+
+    assert asyncio.run(cache.get_or_load("a", loader)) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_cancelled_owner_does_not_fail_waiters():
+    cache = TTLCache(maxsize=10, ttl=60)
+    calls = []
+
+    async def loader(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return key.upper()
+
+    async def scenario():
+        owner = asyncio.create_task(cache.get_or_load("a", loader))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(cache.get_or_load("a", loader)) for _ in range(3)]
+        await asyncio.sleep(0)
+        owner.cancel()
+        # A cancelled waiter leaves the load to the others
+        waiters[0].cancel()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        return owner.cancelled(), results
+
+    owner_cancelled, results = asyncio.run(scenario())
+    assert owner_cancelled
+    assert isinstance(results[0], asyncio.CancelledError)
+    assert results[1:] == ["A", "A"]
+    # One waiter took over the load
+    assert calls == ["a", "a"]
+    assert cache.get("a") == "A"
+
+
+def test_load_errors_reach_waiters():
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    async def loader(key):
+        await asyncio.sleep(0.01)
+        raise LookupError(key)
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_load("a", loader) for _ in range(3)), return_exceptions=True)
+
+    assert [type(result) for result in asyncio.run(scenario())] == [LookupError] * 3
@@ -0,0 +1,72 @@
+import asyncio
+import pytest
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from app.db_pool import PoolMetrics, instrumented
+
+
+def make_engine(tmp_path, metrics, **pool_args):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=instrumented(QueuePool, metrics),
+        **pool_args
+    )
+    metrics.listen(engine.pool)
+    return engine
+
+
+def test_counts_checkouts_and_connections(tmp_path):
+    metrics = PoolMetrics()
+    engine = make_engine(tmp_path, metrics, pool_size=2)
+    for _ in range(3):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    stats = metrics.stats(engine.pool)
+    assert stats["checkouts"] == 3
+    assert stats["checkins"] == 3
+    assert stats["connects"] == 1
+    assert stats["checked_out"] == 0
+    assert stats["idle"] == 1
+
+
+def test_records_wait_and_timeout(tmp_path):
+    metrics = PoolMetrics()
+    engine = make_engine(tmp_path, metrics, pool_size=1, max_overflow=0, pool_timeout=0.05)
+
+    with engine.connect():
+        assert metrics.stats(engine.pool)["checked_out"] == 1
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    stats = metrics.stats(engine.pool)
+    assert stats["timeouts"] == 1
+    assert stats["max_wait_seconds"] >= 0.05
+
+
+def test_survives_pool_recreation(tmp_path):
+    metrics = PoolMetrics()
+    engine = make_engine(tmp_path, metrics)
+    engine.dispose()
+    with engine.connect():
+        pass
+
+    assert metrics.stats(engine.pool)["checkouts"] == 1
+
+
+def test_async_pool(tmp_path):
+    metrics = PoolMetrics()
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=instrumented(AsyncAdaptedQueuePool, metrics)
+    )
+    metrics.listen(engine.sync_engine.pool)
+
+    async def scenario():
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+        await engine.dispose()
+
+    asyncio.run(scenario())
+    assert metrics.checkouts == 1
@@ -0,0 +1,115 @@
+import asyncio
+import json
+from app.events import InvalidationBus, InProcessBackend, PostgresBackend, RESYNC, MAX_MESSAGE_BYTES
+
+
+def test_events_reach_other_buses_only():
+    backend = InProcessBackend()
+    worker_a, worker_b, worker_c = (InvalidationBus(backend) for _ in range(3))
+    received = {"a": [], "b": [], "c": []}
+    worker_a.subscribe("topic", received["a"].append)
+    worker_b.subscribe("topic", received["b"].append)
+    worker_c.subscribe("other", received["c"].append)
+
+    worker_a.publish("topic", {"key": [1, 2]})
+
+    assert received == {"a": [], "b": [{"key": [1, 2]}], "c": []}
+    assert worker_a.stats()["published"] == 1
+    assert worker_b.stats()["received"] == 1
+
+
+def test_failing_handler_does_not_stop_others():
+    backend = InProcessBackend()
+    sender, receiver = InvalidationBus(backend), InvalidationBus(backend)
+    received = []
+
+    def fail(payload):
+        raise RuntimeError("broken cache")
+
+    receiver.subscribe("topic", fail)
+    receiver.subscribe("topic", received.append)
+    sender.publish("topic", "x")
+
+    assert received == ["x"]
+    assert receiver.stats()["handler_errors"] == 1
+
+
+def test_resync_is_local():
+    backend = InProcessBackend()
+    bus, other = InvalidationBus(backend), InvalidationBus(backend)
+    resyncs = []
+    bus.subscribe(RESYNC, resyncs.append)
+    other.subscribe(RESYNC, resyncs.append)
+
+    bus.resync()
+
+    assert resyncs == [None]
+
+
+def test_postgres_backend_drops_until_started_and_replaces_large_events():
+    backend = PostgresBackend("postgresql://unused", "channel")
+    bus = InvalidationBus(backend)
+
+    bus.publish("topic", "small")
+    assert backend.stats()["dropped"] == 1
+
+    async def queued():
+        # Pretend the listener is running on this loop
+        backend._loop = asyncio.get_running_loop()
+        backend._queue = asyncio.Queue()
+        bus.publish("topic", "x" * MAX_MESSAGE_BYTES)
+        await asyncio.sleep(0)
+        return backend._queue.get_nowait()
+
+    message = json.loads(asyncio.run(queued()))
+    assert message == {"origin": bus.origin, "topic": RESYNC, "payload": None}
+    assert backend.stats()["oversized"] == 1
+
+
+def test_postgres_backend_resyncs_others_after_a_failed_notify(monkeypatch):
+    import asyncpg
+
+    class FakeConnection:
+        def __init__(self, fail):
+            self.fail = fail
+            self.notified = []
+
+        async def add_listener(self, channel, callback):
+            pass
+
+        async def execute(self, query, channel, message):
+            if self.fail:
+                raise ConnectionError("connection reset")
+            self.notified.append(json.loads(message))
+
+        def is_closed(self):
+            return False
+
+        async def close(self, timeout=None):
+            pass
+
+    connections = [FakeConnection(fail=True), FakeConnection(fail=False)]
+    unused = iter(connections)
+
+    async def connect(dsn):
+        return next(unused)
+
+    monkeypatch.setattr(asyncpg, "connect", connect)
+    backend = PostgresBackend("postgresql://unused", "channel", reconnect_seconds=0.01)
+    bus = InvalidationBus(backend)
+    resyncs = []
+    bus.subscribe(RESYNC, resyncs.append)
+
+    async def scenario():
+        await bus.start()
+        bus.publish("topic", "lost")
+        for _ in range(100):
+            if connections[1].notified:
+                break
+            await asyncio.sleep(0.01)
+        await bus.stop()
+
+    asyncio.run(scenario())
+    assert connections[1].notified == [{"origin": bus.origin, "topic": RESYNC, "payload": None}]
+    assert resyncs == [None]
+    assert backend.stats()["dropped"] == 1
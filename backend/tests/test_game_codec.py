@@ -0,0 +1,26 @@
+import json
+from app.game_codec import encode_points, encode_point, decode_points, decode_point
+from app.models import Point
+
+
+def test_points_roundtrip():
+    snake = [{"x": 10, "y": 10}, {"x": 9, "y": 10}, {"x": 0, "y": 19}, {"x": -1, "y": 300}]
+    assert decode_points(encode_points(snake)) == snake
+
+
+def test_point_models_are_accepted():
+    data = encode_point(Point(x=5, y=7))
+    assert data == encode_point({"x": 5, "y": 7})
+    assert decode_point(data) == {"x": 5, "y": 7}
+
+
+def test_packed_is_smaller_than_json():
+    snake = [{"x": i % 20, "y": i // 20} for i in range(100)]
+    packed = encode_points(snake)
+    assert len(packed) == 4 * len(snake)
+    assert len(packed) < len(json.dumps(snake)) / 3
+
+
+def test_empty_snake():
+    assert encode_points([]) == b""
+    assert decode_points(b"") == []
@@ -0,0 +1,115 @@
+import asyncio
+import pytest
+from app.game_registry import GameRegistry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingSaver:
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    async def __call__(self, games, ended):
+        if self.fail:
+            raise RuntimeError("database down")
+        self.calls.append((games, ended))
+
+
+def push(registry, game_id, score, username="player", x=1):
+    return registry.update(game_id, username, score, "walls", [{"x": x, "y": 1}], {"x": 5, "y": 5})
+
+
+def test_last_write_wins_and_coalesces():
+    saver = RecordingSaver()
+    registry = GameRegistry(shards=4, saver=saver)
+    for score in range(10):
+        push(registry, "a", score, x=score)
+
+    assert registry.get("a")["score"] == 9
+    assert registry.get("a")["snake"] == [{"x": 9, "y": 1}]
+
+    asyncio.run(registry.checkpoint())
+    games, ended = saver.calls[0]
+    assert [(g["id"], g["score"]) for g in games] == [("a", 9)]
+    assert ended == []
+    assert registry.stats()["coalesced"] == 9
+
+    # Nothing changed since, nothing to write
+    asyncio.run(registry.checkpoint())
+    assert len(saver.calls) == 1
+
+
+def test_other_users_cannot_touch_a_game():
+    registry = GameRegistry(saver=RecordingSaver())
+    push(registry, "a", 10, username="alice")
+
+    assert push(registry, "a", 99, username="mallory") is False
+    assert registry.end("a", "mallory") is False
+    assert registry.get("a")["score"] == 10
+
+
+def test_ended_and_expired_games_are_deleted():
+    clock = FakeClock()
+    saver = RecordingSaver()
+    registry = GameRegistry(timeout=30, saver=saver, clock=clock)
+    push(registry, "ended", 1)
+    push(registry, "stale", 2)
+    clock.now = 20
+    push(registry, "live", 3)
+    registry.end("ended", "player")
+
+    clock.now = 40
+    asyncio.run(registry.checkpoint())
+
+    games, ended = saver.calls[0]
+    assert [g["id"] for g in games] == ["live"]
+    assert sorted(ended) == ["ended", "stale"]
+    assert [g["id"] for g in registry.rows()] == ["live"]
+
+
+def test_loaded_games_expire_unless_played():
+    clock = FakeClock()
+    saver = RecordingSaver()
+    registry = GameRegistry(timeout=30, saver=saver, clock=clock)
+    clock.now = 1000
+    registry.load([
+        {"id": game_id, "username": "player", "score": 5, "mode": "walls",
+         "snake": [{"x": 1, "y": 1}], "food": {"x": 2, "y": 2}}
+        for game_id in ("abandoned", "resumed")
+    ])
+
+    clock.now += 20
+    asyncio.run(registry.checkpoint())
+    assert registry.get("abandoned")["score"] == 5
+    push(registry, "resumed", 6)
+
+    clock.now += 20
+    asyncio.run(registry.checkpoint())
+    assert registry.get("abandoned") is None
+    assert registry.get("resumed")["score"] == 6
+    assert saver.calls[-1][1] == ["abandoned"]
+
+
+def test_failed_checkpoint_is_retried():
+    saver = RecordingSaver(fail=True)
+    registry = GameRegistry(saver=saver)
+    push(registry, "a", 1)
+    push(registry, "b", 2)
+    registry.end("b", "player")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(registry.checkpoint())
+    assert registry.stats()["pending_writes"] == 2
+
+    saver.fail = False
+    asyncio.run(registry.checkpoint())
+    games, ended = saver.calls[0]
+    assert [g["id"] for g in games] == ["a"]
+    assert ended == ["b"]
@@ -2,6 +2,7 @@ from fastapi.testclient import TestClient
 from app.main import app
 from app.db_models import Base
 from app.database import engine
+from app.game_registry import game_registry
 import pytest
 
 
@@ -10,6 +11,7 @@ def setup_test_db():
     """Setup test database for each test"""
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    game_registry.clear()
     yield
     Base.metadata.drop_all(bind=engine)
 
@@ -21,3 +23,65 @@ def test_get_active_games():
     response = client.get("/api/games/active")
     assert response.status_code == 200
     assert isinstance(response.json(), list)
+
+
+def get_auth_token(username):
+    response = client.post(
+        "/api/auth/signup",
+        json={"email": f"{username}@example.com", "username": username, "password": "password123"}
+    )
+    return response.json()["token"]
+
+
+def game_state(score):
+    return {
+        "score": score,
+        "mode": "walls",
+        "snake": [{"x": 10, "y": 10}, {"x": 9, "y": 10}],
+        "food": {"x": 3, "y": 4}
+    }
+
+
+def test_push_game_state():
+    headers = {"Authorization": f"Bearer {get_auth_token('gamer')}"}
+    for score in [10, 20]:
+        response = client.put("/api/games/game-1", json=game_state(score), headers=headers)
+        assert response.status_code == 204
+
+    games = client.get("/api/games/active").json()
+    assert games == [{"id": "game-1", "username": "gamer", **game_state(20)}]
+
+    response = client.delete("/api/games/game-1", headers=headers)
+    assert response.status_code == 204
+    assert client.get("/api/games/active").json() == []
+
+
+def test_invalid_game_state_is_rejected():
+    headers = {"Authorization": f"Bearer {get_auth_token('cheater')}"}
+    too_far = dict(game_state(10), food={"x": 40000, "y": 4})
+    too_long = dict(game_state(10), snake=[{"x": 1, "y": 1}] * 20000)
+    for state in [too_far, too_long, game_state(-1)]:
+        assert client.put("/api/games/game-4", json=state, headers=headers).status_code == 422
+    assert client.get("/api/games/active").json() == []
+
+
+def test_cannot_push_another_users_game():
+    owner = {"Authorization": f"Bearer {get_auth_token('owner')}"}
+    other = {"Authorization": f"Bearer {get_auth_token('other')}"}
+    client.put("/api/games/game-2", json=game_state(10), headers=owner)
+
+    assert client.put("/api/games/game-2", json=game_state(99), headers=other).status_code == 403
+    assert client.delete("/api/games/game-2", headers=other).status_code == 403
+    assert client.put("/api/games/game-2", json=game_state(99)).status_code == 401
+
+
+def test_active_games_not_modified():
+    headers = {"Authorization": f"Bearer {get_auth_token('poller')}"}
+    etag = client.get("/api/games/active").headers["etag"]
+
+    assert client.get("/api/games/active", headers={"If-None-Match": etag}).status_code == 304
+
+    client.put("/api/games/game-3", json=game_state(10), headers=headers)
+    changed = client.get("/api/games/active", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert len(changed.json()) == 1
@@ -0,0 +1,38 @@
+import time
+import pytest
+from app.hashing import HashingExecutor, HashingQueueFull, HashPriority
+
+
+@pytest.fixture
+def executor():
+    executor = HashingExecutor(max_workers=1, max_queue=2)
+    yield executor
+    executor.shutdown()
+
+
+def test_login_jumps_queued_signups(executor):
+    finished = []
+    blocker = executor.submit(HashPriority.signup, time.sleep, 0.5)
+    signup = executor.submit(HashPriority.signup, time.sleep, 0)
+    login = executor.submit(HashPriority.login, time.sleep, 0)
+    signup.add_done_callback(lambda f: finished.append("signup"))
+    login.add_done_callback(lambda f: finished.append("login"))
+
+    blocker.result(timeout=30)
+    signup.result(timeout=30)
+    login.result(timeout=30)
+    assert finished == ["login", "signup"]
+
+
+def test_full_queue_rejects_jobs(executor):
+    executor.submit(HashPriority.signup, time.sleep, 0.5)
+    executor.submit(HashPriority.signup, time.sleep, 0)
+    executor.submit(HashPriority.signup, time.sleep, 0)
+
+    with pytest.raises(HashingQueueFull):
+        executor.submit(HashPriority.signup, time.sleep, 0)
+
+    stats = executor.stats()
+    assert stats["queue_depth"] == 2
+    assert stats["max_queue_depth"] == 2
+    assert stats["rejected"] == 1
@@ -0,0 +1,39 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database import pool_stats
+
+client = TestClient(app)
+
+
+def test_liveness():
+    response = client.get("/api/health")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+
+def test_readiness_reports_pools():
+    response = client.get("/api/health/ready")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert set(body["pools"]) == {"sync", "async"}
+
+
+def test_readiness_failure_hides_error_details(monkeypatch, capsys):
+    from app.routers import health
+
+    async def unreachable():
+        raise ConnectionError("password authentication failed for user admin at db.internal")
+
+    monkeypatch.setattr(health, "aping_database", unreachable)
+    response = client.get("/api/health/ready")
+    assert response.status_code == 503
+    assert response.json()["detail"] == "ConnectionError"
+    assert "db.internal" not in response.text
+    assert "db.internal" in capsys.readouterr().out
+
+
+def test_sync_pool_is_instrumented():
+    stats = pool_stats()["sync"]
+    assert stats["size"] > 0
+    assert "max_wait_seconds" in stats
@@ -41,7 +41,132 @@ def test_submit_score():
     assert response.status_code == 201
 
 
+def test_submit_score_out_of_range():
+    token = get_auth_token()
+    for score in [-1, 2**31, 2**63]:
+        response = client.post(
+            "/api/leaderboard",
+            json={"score": score, "mode": "walls"},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 422
+
+
 def test_get_leaderboard():
     response = client.get("/api/leaderboard")
     assert response.status_code == 200
     assert isinstance(response.json(), list)
+
+
+def test_leaderboard_cursor_pagination():
+    token = get_auth_token()
+    for score in [50, 40, 30]:
+        client.post(
+            "/api/leaderboard",
+            json={"score": score, "mode": "walls"},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+    first = client.get("/api/leaderboard", params={"limit": 2})
+    assert [e["score"] for e in first.json()] == [50, 40]
+    cursor = first.headers["X-Next-Cursor"]
+
+    second = client.get("/api/leaderboard", params={"limit": 2, "cursor": cursor})
+    assert [e["score"] for e in second.json()] == [30]
+    assert "X-Next-Cursor" not in second.headers
+
+
+def test_leaderboard_invalid_cursor():
+    response = client.get("/api/leaderboard", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_leaderboard_not_modified():
+    token = get_auth_token()
+    first = client.get("/api/leaderboard", params={"mode": "walls"})
+    etag = first.headers["etag"]
+
+    again = client.get("/api/leaderboard", params={"mode": "walls"}, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+    # Other queries have their own tags
+    other = client.get("/api/leaderboard", params={"mode": "walls", "limit": 5}, headers={"If-None-Match": etag})
+    assert other.status_code == 200
+
+    client.post(
+        "/api/leaderboard",
+        json={"score": 10, "mode": "walls"},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    changed = client.get("/api/leaderboard", params={"mode": "walls"}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_leaderboard_distinct_users():
+    token = get_auth_token()
+    for score in [70, 90, 80]:
+        client.post(
+            "/api/leaderboard",
+            json={"score": score, "mode": "walls"},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+    every = client.get("/api/leaderboard", params={"mode": "walls"})
+    assert [e["score"] for e in every.json()] == [90, 80, 70]
+
+    best = client.get("/api/leaderboard", params={"mode": "walls", "distinct": "users"})
+    assert [(e["username"], e["score"]) for e in best.json()] == [("leaderboarduser", 90)]
+    assert best.headers["etag"] != every.headers["etag"]
+
+    invalid = client.get("/api/leaderboard", params={"distinct": "modes"})
+    assert invalid.status_code == 422
+
+
+def test_leaderboard_windows():
+    token = get_auth_token()
+    for score in [40, 60]:
+        client.post(
+            "/api/leaderboard",
+            json={"score": score, "mode": "walls"},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+    for window in ("day", "week", "month"):
+        response = client.get("/api/leaderboard", params={"mode": "walls", "window": window})
+        assert response.status_code == 200
+        assert [(e["username"], e["score"]) for e in response.json()] == [("leaderboarduser", 60)]
+
+    day = client.get("/api/leaderboard", params={"window": "day"})
+    week = client.get("/api/leaderboard", params={"window": "week"})
+    assert day.headers["etag"] != week.headers["etag"]
+
+    invalid = client.get("/api/leaderboard", params={"window": "year"})
+    assert invalid.status_code == 422
+
+
+def test_leaderboard_ignores_invalid_token():
+    # The token only routes reads; the leaderboard stays public
+    response = client.get("/api/leaderboard", headers={"Authorization": "Bearer not-a-token"})
+    assert response.status_code == 200
+
+
+def test_my_rank():
+    response = client.get("/api/leaderboard/me")
+    assert response.status_code in (401, 403)
+
+    token = get_auth_token()
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/api/leaderboard/me", headers=headers).json() == {"rank": None, "total": 0, "entries": []}
+
+    for score in [100, 300, 200]:
+        client.post("/api/leaderboard", json={"score": score, "mode": "walls"}, headers=headers)
+
+    response = client.get("/api/leaderboard/me", params={"mode": "walls", "neighbors": 1}, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["rank"] == 1
+    assert body["total"] == 3
+    assert [(e["score"], e["rank"]) for e in body["entries"]] == [(300, 1), (200, 2)]
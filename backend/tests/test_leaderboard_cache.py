@@ -0,0 +1,57 @@
+import uuid
+from datetime import datetime, timezone
+from app.leaderboard_cache import TopKLeaderboard
+from app.models import LeaderboardEntry, GameMode
+
+
+def make_entry(score, mode=GameMode.walls):
+    return LeaderboardEntry(
+        id=str(uuid.uuid4()),
+        username="player",
+        score=score,
+        mode=mode,
+        timestamp=datetime.now(timezone.utc)
+    )
+
+
+def test_not_answered_until_loaded():
+    board = TopKLeaderboard(k=3)
+    board.add(make_entry(10))
+    assert board.get(None, 3) is None
+
+    board.load({})
+    assert board.get(None, 3) == []
+
+
+def test_keeps_best_k_per_mode():
+    board = TopKLeaderboard(k=3)
+    board.load({})
+    for score in [10, 50, 30, 20, 40]:
+        board.add(make_entry(score))
+    board.add(make_entry(99, GameMode.pass_through))
+
+    assert [e.score for e in board.get(GameMode.walls, 3)] == [50, 40, 30]
+    assert [e.score for e in board.get(GameMode.walls, 2)] == [50, 40]
+    assert [e.score for e in board.get(GameMode.pass_through, 3)] == [99]
+    assert [e.score for e in board.get(None, 3)] == [99, 50, 40]
+
+
+def test_limit_above_k_is_a_miss():
+    board = TopKLeaderboard(k=3)
+    board.load({})
+    assert board.get(None, 4) is None
+    assert board.stats()["misses"] == 1
+
+
+def test_entries_added_during_resync_survive_reload():
+    board = TopKLeaderboard(k=3)
+    seen = make_entry(20)
+    board.begin_resync()
+    # Added while the reload query runs, visible to it or not
+    late = make_entry(30)
+    board.add(seen)
+    board.add(late)
+    board.load({None: [seen], GameMode.walls: [seen]})
+
+    assert [e.score for e in board.get(GameMode.walls, 3)] == [30, 20]
+    assert [e.score for e in board.get(None, 3)] == [30, 20]
@@ -0,0 +1,46 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from app.db_models import Base
+from app.database import engine
+from app.metrics import Histogram, _statement_labels, _stats_lines
+
+client = TestClient(app)
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_seconds", "Test", ("op",), buckets=(0.1, 1.0))
+    histogram.observe(("a",), 0.05)
+    histogram.observe(("a",), 0.5)
+    histogram.observe(("a",), 5.0)
+
+    lines = histogram.render()
+    assert 'test_seconds_bucket{op="a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{op="a",le="1.0"} 2' in lines
+    assert 'test_seconds_bucket{op="a",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{op="a"} 3' in lines
+
+
+def test_statement_labels():
+    assert _statement_labels("SELECT leaderboard.id FROM leaderboard WHERE x = ?") == ("SELECT", "leaderboard")
+    assert _statement_labels('INSERT INTO "users" (username) VALUES (?)') == ("INSERT", "users")
+    assert _statement_labels("UPDATE active_games SET score = ?") == ("UPDATE", "active_games")
+    assert _statement_labels("COMMIT") == ("COMMIT", "")
+
+
+def test_stats_lines_are_numeric():
+    lines = _stats_lines("cache", {"loaded": True, "size": 3, "by": {"br": 2}, "name": "x"})
+    assert lines == [
+        "snake_arena_cache_loaded 1",
+        "snake_arena_cache_size 3",
+        'snake_arena_cache_by{key="br"} 2',
+    ]
+
+
+def test_metrics_endpoint():
+    Base.metadata.create_all(bind=engine)
+    client.get("/api/leaderboard")
+    response = client.get("/api/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/leaderboard",status="200"}' in response.text
+    assert 'db_statement_duration_seconds_count{operation="SELECT",table="leaderboard"}' in response.text
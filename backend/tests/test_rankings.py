@@ -0,0 +1,64 @@
+import random
+import uuid
+from datetime import datetime, timezone
+from app.rankings import ScoreCounts, RankIndex
+from app.models import LeaderboardEntry, GameMode
+
+
+def make_entry(score, mode=GameMode.walls):
+    return LeaderboardEntry(
+        id=str(uuid.uuid4()),
+        username="player",
+        score=score,
+        mode=mode,
+        timestamp=datetime.now(timezone.utc)
+    )
+
+
+def test_counts_match_brute_force():
+    rng = random.Random(7)
+    counts = ScoreCounts(max_score=100)
+    scores = []
+    # Includes scores above the tree and at its edges
+    for _ in range(500):
+        score = rng.choice([rng.randrange(0, 101), rng.randrange(100, 1000), 0, 100, 101])
+        counts.add(score)
+        scores.append(score)
+
+    assert counts.total == len(scores)
+    for probe in [0, 1, 50, 99, 100, 101, 500, 999, 5000]:
+        assert counts.count_above(probe) == sum(s > probe for s in scores), probe
+
+
+def test_negative_scores_rank_as_zero():
+    counts = ScoreCounts(max_score=10)
+    counts.add(-5)
+    counts.add(3)
+    assert counts.count_above(-1) == 1
+    assert counts.count_above(0) == 1
+
+
+def test_rank_index_per_mode_and_overall():
+    index = RankIndex(max_score=1000)
+    assert index.rank(None, 10) is None
+
+    index.load([(GameMode.walls, 50, 2), (GameMode.pass_through, 70, 1)])
+    index.add(make_entry(60, GameMode.walls))
+
+    assert index.rank(GameMode.walls, 50) == (2, 3)
+    assert index.rank(GameMode.walls, 60) == (1, 3)
+    assert index.rank(GameMode.pass_through, 70) == (1, 1)
+    assert index.rank(None, 50) == (3, 4)
+
+
+def test_scores_added_during_resync_are_kept():
+    index = RankIndex(max_score=1000)
+    index.begin_resync()
+    index.add(make_entry(90))
+    index.load([(GameMode.walls, 10, 1)])
+    assert index.rank(GameMode.walls, 10) == (2, 2)
+
+    index.begin_resync()
+    index.cancel_resync()
+    index.load([])
+    assert index.rank(GameMode.walls, 10) == (1, 0)
@@ -0,0 +1,131 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from app.main import app
+from app.rate_limit import TokenBucketLimiter, AuthRateLimiter, auth_rate_limiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_allows_burst_then_refills():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(rate=2.0, burst=3, max_keys=10, clock=clock)
+
+    assert [limiter.acquire("a") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire("a") == pytest.approx(0.5)
+    # Other keys have their own bucket
+    assert limiter.acquire("b") == 0.0
+
+    clock.now += 0.5
+    assert limiter.acquire("a") == 0.0
+    assert limiter.acquire("a") > 0
+
+    # Never more than burst tokens, however long the bucket was idle
+    clock.now += 100
+    assert [limiter.acquire("a") for _ in range(4)][-1] > 0
+    assert limiter.stats()["rejected"] == 3
+
+
+def test_bucket_memory_is_bounded():
+    clock = FakeClock()
+    limiter = TokenBucketLimiter(rate=1.0, burst=2, max_keys=3, clock=clock)
+
+    for key in range(10):
+        limiter.acquire(key)
+    assert limiter.stats()["buckets"] == 3
+    assert limiter.stats()["evictions"] == 7
+
+    # Buckets idle long enough to be full are dropped before the limit
+    clock.now += 2
+    limiter.acquire("new")
+    assert limiter.stats()["buckets"] == 1
+
+
+def test_auth_limits_per_ip_and_email():
+    clock = FakeClock()
+    limiter = AuthRateLimiter(
+        enabled=True, ip_rate=1.0, ip_burst=3, email_rate=0.1, email_burst=2, max_keys=100, clock=clock
+    )
+
+    limiter.check("1.1.1.1", "Victim@example.com")
+    limiter.check("2.2.2.2", "victim@example.com ")
+    with pytest.raises(HTTPException) as error:
+        limiter.check("3.3.3.3", "victim@example.com")
+    assert error.value.status_code == 429
+    assert error.value.headers["Retry-After"] == "10"
+
+    # One IP trying many emails
+    limiter.check("1.1.1.1", "other@example.com")
+    limiter.check("1.1.1.1", "third@example.com")
+    with pytest.raises(HTTPException):
+        limiter.check("1.1.1.1", "fourth@example.com")
+
+    AuthRateLimiter(
+        enabled=False, ip_rate=1.0, ip_burst=0, email_rate=1.0, email_burst=0, max_keys=1
+    ).check("1.1.1.1", "a@example.com")
+
+
+def test_login_rejected_before_hashing(monkeypatch):
+    from app.routers import auth
+
+    async def fail(*args):
+        raise AssertionError("no lookup or hash once limited")
+
+    client = TestClient(app)
+    burst = auth_rate_limiter.by_email.burst
+    for _ in range(burst):
+        client.post("/api/auth/login", json={"email": "target@example.com", "password": "guess"})
+
+    monkeypatch.setattr(auth, "aget_user_by_email", fail)
+    monkeypatch.setattr(auth, "averify_password", fail)
+    response = client.post("/api/auth/login", json={"email": "target@example.com", "password": "guess"})
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+
+
+def _request(peer, *forwarded):
+    from starlette.requests import Request
+
+    headers = [(b"x-forwarded-for", value.encode()) for value in forwarded]
+    return Request({"type": "http", "headers": headers, "client": (peer, 1234)})
+
+
+def test_client_ip_behind_trusted_proxies():
+    direct = AuthRateLimiter(
+        enabled=True, ip_rate=1.0, ip_burst=1, email_rate=1.0, email_burst=1, max_keys=10
+    )
+    proxied = AuthRateLimiter(
+        enabled=True, ip_rate=1.0, ip_burst=1, email_rate=1.0, email_burst=1, max_keys=10, trusted_proxy_hops=2
+    )
+
+    assert direct.client_ip(_request("10.0.0.1", "203.0.113.7")) == "10.0.0.1"
+    # Entries left of the ones the proxies appended are client-supplied
+    assert proxied.client_ip(_request("10.0.0.1", "6.6.6.6, 203.0.113.7", "10.0.0.2")) == "203.0.113.7"
+    assert proxied.client_ip(_request("10.0.0.1", "203.0.113.7")) == "10.0.0.1"
+
+
+def test_forwarded_clients_are_limited_separately(monkeypatch):
+    from app.routers import auth
+
+    async def no_user(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(auth, "aget_user_by_email", no_user)
+    monkeypatch.setattr(auth_rate_limiter, "trusted_proxy_hops", 1)
+    monkeypatch.setattr(auth_rate_limiter, "by_ip", TokenBucketLimiter(rate=0.01, burst=1, max_keys=10))
+    client = TestClient(app)
+
+    def login(ip, email):
+        return client.post(
+            "/api/auth/login", json={"email": email, "password": "guess"}, headers={"X-Forwarded-For": ip}
+        ).status_code
+
+    assert login("203.0.113.1", "a@example.com") != 429
+    assert login("203.0.113.1", "b@example.com") == 429
+    assert login("203.0.113.2", "c@example.com") != 429
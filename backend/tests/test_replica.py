@@ -0,0 +1,62 @@
+from app.replica import ReadRouter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_router(clock, enabled=True):
+    return ReadRouter(enabled=enabled, read_your_writes_seconds=5, retry_seconds=10, max_writers=100, clock=clock)
+
+
+def test_without_replica_everything_reads_the_primary():
+    router = make_router(FakeClock(), enabled=False)
+    router.wrote("a@example.com")
+    assert not router.use_replica()
+    assert not router.use_replica("a@example.com")
+    assert router.stats()["primary_reads"] == 2
+
+
+def test_read_your_writes():
+    clock = FakeClock()
+    router = make_router(clock)
+
+    router.wrote("writer@example.com")
+    assert not router.use_replica("writer@example.com")
+    assert router.use_replica("other@example.com")
+    assert router.use_replica()
+
+    clock.now += 5
+    assert router.use_replica("writer@example.com")
+    assert router.stats()["read_your_writes"] == 1
+
+
+def test_failed_replica_is_skipped_until_retry():
+    clock = FakeClock()
+    router = make_router(clock)
+
+    router.failed(ConnectionError("replica down"))
+    assert not router.use_replica()
+    assert router.stats()["healthy"] is False
+
+    clock.now += 10
+    assert router.use_replica()
+    stats = router.stats()
+    assert stats["healthy"] is True
+    assert (stats["fallbacks"], stats["unhealthy_skips"], stats["replica_reads"]) == (1, 1, 1)
+
+
+def test_recent_changes_are_not_read_from_the_replica():
+    clock = FakeClock()
+    router = make_router(clock)
+
+    clock.now = 100
+    assert not router.settled(98)
+    assert router.settled(95)
+    assert router.settled(float("-inf"))
+    assert make_router(clock, enabled=False).settled(100)
+    assert router.stats()["fresh_tags"] == 1
@@ -0,0 +1,33 @@
+import json
+from datetime import datetime, timezone
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models import LeaderboardEntry, GameMode
+from app.responses import FastJSONResponse
+
+client = TestClient(app)
+
+
+def test_same_json_as_response_model_path():
+    entries = [
+        LeaderboardEntry(id="a", username="alice", score=10, mode=GameMode.walls,
+                         timestamp=datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)),
+        LeaderboardEntry.model_construct(id="b", username="bob", score=5, mode=GameMode.pass_through,
+                                         timestamp=datetime(2025, 1, 2, 3, 4, 5)),
+    ]
+    body = FastJSONResponse(entries).body
+    assert json.loads(body) == jsonable_encoder(entries)
+    assert json.loads(body)[1]["mode"] == "pass-through"
+
+
+def test_openapi_schema_keeps_response_models():
+    paths = client.get("/api/openapi.json").json()["paths"]
+    leaderboard = paths["/api/leaderboard"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert leaderboard == {
+        "type": "array",
+        "items": {"$ref": "#/components/schemas/LeaderboardEntry"},
+        "title": "Response Get Leaderboard Entries Api Leaderboard Get",
+    }
+    active = paths["/api/games/active"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert active["items"] == {"$ref": "#/components/schemas/ActiveGame"}
@@ -0,0 +1,110 @@
+import asyncio
+import json
+from app.spectator import SpectatorHub, diff_snake
+from app.models import GameMode
+
+
+def point(x, y):
+    return {"x": x, "y": y}
+
+
+def make_game(game_id, snake, food=None, score=0, mode="walls"):
+    return {
+        "id": game_id,
+        "username": "player",
+        "score": score,
+        "mode": mode,
+        "snake": snake,
+        "food": food or point(0, 0),
+    }
+
+
+def test_diff_snake_move_and_grow():
+    old = [point(5, 5), point(4, 5), point(3, 5)]
+
+    assert diff_snake(old, [point(6, 5), point(5, 5), point(4, 5)]) == ([point(6, 5)], 1)
+    assert diff_snake(old, [point(6, 5)] + old) == ([point(6, 5)], 0)
+    assert diff_snake(old, old) == ([], 0)
+
+
+def test_diff_snake_unrelated_sends_everything():
+    old = [point(5, 5), point(4, 5)]
+    new = [point(1, 1), point(1, 2)]
+
+    assert diff_snake(old, new) == (new, 2)
+    assert diff_snake([], new) == (new, 0)
+
+
+def drain(subscriber):
+    messages = []
+    while not subscriber.queue.empty():
+        messages.append(json.loads(subscriber.queue.get_nowait()))
+    return messages
+
+
+def test_snapshot_then_deltas():
+    games = [make_game("a", [point(5, 5), point(4, 5)], score=10)]
+
+    async def loader():
+        return games
+
+    async def scenario():
+        hub = SpectatorHub(poll_interval=60, loader=loader)
+        subscriber = await hub.subscribe()
+        snapshot = drain(subscriber)
+
+        hub.publish([make_game("a", [point(6, 5), point(5, 5)], food=point(9, 9), score=20)])
+        moved = drain(subscriber)
+        hub.publish([])
+        ended = drain(subscriber)
+        hub.unsubscribe(subscriber)
+        return snapshot, moved, ended
+
+    snapshot, moved, ended = asyncio.run(scenario())
+
+    assert snapshot == [{"type": "snapshot", "games": games}]
+    assert moved == [{"type": "delta", "events": [{
+        "type": "update", "id": "a", "head": [point(6, 5)], "tail": 1,
+        "food": point(9, 9), "score": 20,
+    }]}]
+    assert ended == [{"type": "delta", "events": [{"type": "ended", "id": "a"}]}]
+
+
+def test_filters_by_mode_and_game():
+    async def loader():
+        return []
+
+    async def scenario():
+        hub = SpectatorHub(poll_interval=60, loader=loader)
+        by_mode = await hub.subscribe(mode=GameMode.pass_through)
+        by_game = await hub.subscribe(game_id="a")
+        drain(by_mode), drain(by_game)
+
+        hub.publish([
+            make_game("a", [point(1, 1)]),
+            make_game("b", [point(2, 2)], mode="pass-through"),
+        ])
+        return drain(by_mode), drain(by_game)
+
+    by_mode, by_game = asyncio.run(scenario())
+
+    assert [e["game"]["id"] for e in by_mode[0]["events"]] == ["b"]
+    assert [e["game"]["id"] for e in by_game[0]["events"]] == ["a"]
+
+
+def test_slow_subscriber_gets_fresh_snapshot():
+    async def loader():
+        return []
+
+    async def scenario():
+        hub = SpectatorHub(poll_interval=60, queue_size=2, loader=loader)
+        subscriber = await hub.subscribe()
+        for score in range(5):
+            hub.publish([make_game("a", [point(1, 1)], score=score)])
+        return drain(subscriber), hub.stats()
+
+    messages, stats = asyncio.run(scenario())
+
+    assert messages[0]["type"] == "snapshot"
+    assert messages[0]["games"][0]["score"] >= 2
+    assert stats["resnapshots"] >= 1
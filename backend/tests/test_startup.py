@@ -0,0 +1,51 @@
+import subprocess
+import sys
+from app.startup import StartupTimer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_phases_are_timed_in_order():
+    clock = FakeClock()
+    timer = StartupTimer(clock)
+    clock.now = 1.0
+    timer.record("imports", timer.elapsed())
+    with timer.phase("schema"):
+        clock.now = 1.25
+    with timer.phase("caches"):
+        clock.now = 1.5
+    timer.ready()
+
+    assert timer.stats() == {
+        "phase_seconds": {"imports": 1.0, "schema": 0.25, "caches": 0.25},
+        "ready_seconds": 1.5,
+    }
+    assert [line.split()[0] for line in timer.report().splitlines()] == ["imports", "schema", "caches", "ready"]
+
+
+def test_failed_phase_is_still_recorded():
+    clock = FakeClock()
+    timer = StartupTimer(clock)
+    try:
+        with timer.phase("schema"):
+            clock.now = 2.0
+            raise RuntimeError("database is down")
+    except RuntimeError:
+        pass
+    assert timer.stats() == {"phase_seconds": {"schema": 2.0}}
+
+
+def test_app_does_not_import_jose_or_passlib():
+    # They are imported on first use, so workers start faster
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, app.main; print(sorted({m.split('.')[0] for m in sys.modules} "
+                               "& {'jose', 'passlib', 'argon2'}))"],
+        capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip() == "[]"
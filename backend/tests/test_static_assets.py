@@ -0,0 +1,80 @@
+import gzip
+import brotli
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from app.static_assets import StaticIndex, IMMUTABLE_CACHE_CONTROL
+
+BUNDLE = b"console.log('snake arena');\n" * 200
+
+
+@pytest.fixture
+def client(tmp_path):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "index-abc123.js").write_bytes(BUNDLE)
+    (tmp_path / "assets" / "logo-abc123.png").write_bytes(b"\x89PNG" + bytes(range(256)) * 8)
+    (tmp_path / "index.html").write_bytes(b"<!doctype html><div id=root></div>")
+    (tmp_path / "big.txt").write_bytes(b"x" * 5000)
+
+    index = StaticIndex(str(tmp_path), memory_max_file_bytes=4096)
+    index.build()
+    app = FastAPI()
+
+    @app.get("/{full_path:path}")
+    async def catch_all(request: Request, full_path: str):
+        return index.response(request, full_path)
+
+    test_client = TestClient(app)
+    test_client.index = index
+    return test_client
+
+
+def test_serves_best_accepted_encoding(client):
+    br = client.get("/assets/index-abc123.js", headers={"Accept-Encoding": "gzip, br"})
+    assert br.headers["content-encoding"] == "br"
+    assert br.headers["vary"] == "Accept-Encoding"
+    assert br.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert br.content == BUNDLE  # decoded by the client
+
+    gz = client.get("/assets/index-abc123.js", headers={"Accept-Encoding": "gzip, br;q=0"})
+    assert gz.headers["content-encoding"] == "gzip"
+    assert gz.headers["etag"] != br.headers["etag"]
+
+    plain = client.get("/assets/index-abc123.js", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.content == BUNDLE
+
+
+def test_precomputed_variants_decode_to_original(client):
+    asset = client.index.lookup("assets/index-abc123.js")
+    assert brotli.decompress(asset.variants["br"]) == BUNDLE
+    assert gzip.decompress(asset.variants["gzip"]) == BUNDLE
+    assert client.index.lookup("assets/logo-abc123.png").variants == {}
+
+
+def test_conditional_requests(client):
+    first = client.get("/assets/index-abc123.js", headers={"Accept-Encoding": "br"})
+
+    by_etag = client.get("/assets/index-abc123.js", headers={
+        "Accept-Encoding": "br", "If-None-Match": first.headers["etag"]
+    })
+    assert by_etag.status_code == 304
+    assert by_etag.content == b""
+
+    by_date = client.get("/index.html", headers={"If-Modified-Since": first.headers["last-modified"]})
+    assert by_date.status_code == 304
+
+
+def test_spa_fallback_and_missing_assets(client):
+    route = client.get("/leaderboard")
+    assert route.status_code == 200
+    assert route.headers["cache-control"] == "no-cache"
+    assert b"id=root" in route.content
+
+    assert client.get("/assets/missing.js").status_code == 404
+
+
+def test_large_files_are_streamed(client):
+    response = client.get("/big.txt", headers={"Accept-Encoding": "identity"})
+    assert response.content == b"x" * 5000
+    assert client.index.stats()["from_disk"] == 1
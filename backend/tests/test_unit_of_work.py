@@ -0,0 +1,86 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+import pytest
+from app import database
+from app.main import app
+from app.cache import user_cache
+from app.database import engine
+from app.db_models import Base
+from app.leaderboard_cache import leaderboard_cache
+from app.models import GameMode
+from app.rankings import rank_index
+
+
+@pytest.fixture(autouse=True)
+def setup_test_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    user_cache.clear()
+    leaderboard_cache.clear()
+    rank_index.clear()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+client = TestClient(app)
+
+
+class DatabaseUse:
+    """Checkouts from the async pool and commits on it during a request"""
+
+    def __init__(self):
+        self.commits = 0
+        event.listen(database.async_engine.sync_engine, "commit", self._commit)
+
+    def _commit(self, connection):
+        self.commits += 1
+
+    def __call__(self, method, url, **kwargs):
+        checkouts = database.async_pool_metrics.checkouts
+        commits = self.commits
+        response = client.request(method, url, **kwargs)
+        assert response.status_code < 400, response.text
+        return database.async_pool_metrics.checkouts - checkouts, self.commits - commits
+
+    def close(self):
+        event.remove(database.async_engine.sync_engine, "commit", self._commit)
+
+
+@pytest.fixture
+def use():
+    use = DatabaseUse()
+    yield use
+    use.close()
+
+
+def test_one_checkout_and_commit_per_request(use):
+    signup = {"email": "uow@example.com", "username": "uow", "password": "password123"}
+    # The duplicate check's connection is returned before the password is hashed
+    assert use("POST", "/api/auth/signup", json=signup) == (2, 1)
+    token = client.post("/api/auth/login", json=signup).json()["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    # Read only: the connection is returned before the password is checked
+    assert use("POST", "/api/auth/login", json=signup) == (1, 0)
+
+    # The user is loaded in the same session as the route's own queries
+    user_cache.clear()
+    assert use("POST", "/api/leaderboard", json={"score": 100, "mode": "walls"}, headers=headers) == (1, 1)
+    user_cache.clear()
+    rank_index.clear()
+    assert use("GET", "/api/leaderboard/me", headers=headers) == (1, 1)
+    user_cache.clear()
+    assert use("GET", "/api/auth/me", headers=headers) == (1, 1)
+    assert use("GET", "/api/leaderboard?distinct=users", headers=headers) == (1, 1)
+
+
+def test_requests_served_from_memory_use_no_connection(use):
+    signup = {"email": "cached@example.com", "username": "cached", "password": "password123"}
+    token = client.post("/api/auth/signup", json=signup).json()["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    client.get("/api/auth/me", headers=headers)
+    leaderboard_cache.load({None: [], GameMode.walls: [], GameMode.pass_through: []})
+
+    assert use("GET", "/api/auth/me", headers=headers) == (0, 0)
+    assert use("GET", "/api/leaderboard") == (0, 0)
+    assert use("GET", "/api/games/active") == (0, 0)
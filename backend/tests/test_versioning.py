@@ -0,0 +1,30 @@
+from app.versioning import ResourceVersions
+
+
+def test_etag_changes_with_version_and_query():
+    versions = ResourceVersions()
+    tag = versions.etag("board", "walls", 10)
+
+    assert versions.etag("board", "walls", 10) == tag
+    assert versions.etag("board", "walls", 20) != tag
+    assert versions.etag("other", "walls", 10) != tag
+
+    versions.bump("board")
+    assert versions.etag("board", "walls", 10) != tag
+
+
+def test_if_none_match_parsing():
+    versions = ResourceVersions()
+    tag = versions.etag("board")
+
+    assert versions.matches(tag, tag)
+    assert versions.matches(f'"stale", {tag}', tag)
+    assert versions.matches(f"W/{tag}", tag)
+    assert versions.matches("*", tag)
+    assert not versions.matches('"stale"', tag)
+    assert not versions.matches(None, tag)
+    assert versions.stats()["not_modified"] == 4
+
+
+def test_tags_differ_between_processes():
+    assert ResourceVersions().etag("board") != ResourceVersions().etag("board")
@@ -0,0 +1,25 @@
+from datetime import date, datetime, timedelta, timezone
+from app.models import LeaderboardWindow
+from app.windows import window_start, current_window_start
+
+
+def test_window_starts():
+    # A Sunday, late in the month
+    when = datetime(2026, 5, 31, 23, 30)
+    assert window_start(LeaderboardWindow.day, when) == date(2026, 5, 31)
+    assert window_start(LeaderboardWindow.week, when) == date(2026, 5, 25)
+    assert window_start(LeaderboardWindow.month, when) == date(2026, 5, 1)
+
+
+def test_window_starts_are_utc():
+    # Already the next day, week and month in UTC
+    when = datetime(2026, 5, 31, 23, 30, tzinfo=timezone(timedelta(hours=-2)))
+    for window in LeaderboardWindow:
+        assert window_start(window, when) == date(2026, 6, 1)
+
+
+def test_current_window_start():
+    now = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+    assert current_window_start(LeaderboardWindow.week, now) == date(2025, 12, 29)
+    today = datetime.now(timezone.utc).date()
+    assert current_window_start(LeaderboardWindow.day) == today
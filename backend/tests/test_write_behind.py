@@ -0,0 +1,163 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+import pytest
+from sqlalchemy.exc import DataError, OperationalError
+from app.models import LeaderboardEntry, GameMode
+from app.write_behind import ScoreWriteBuffer
+
+
+def make_entry(score):
+    return LeaderboardEntry(
+        id=str(uuid.uuid4()),
+        username="player",
+        score=score,
+        mode=GameMode.walls,
+        timestamp=datetime.now(timezone.utc)
+    )
+
+
+class RecordingWriter:
+    def __init__(self, fail=0):
+        self.batches = []
+        self.fail = fail
+
+    async def __call__(self, entries):
+        if self.fail:
+            self.fail -= 1
+            raise RuntimeError("database unavailable")
+        self.batches.append([e.score for e in entries])
+
+
+def test_flush_ack_waits_for_one_bulk_write():
+    writer = RecordingWriter()
+    buffer = ScoreWriteBuffer("flush_ack", flush_interval_ms=10000, flush_max_rows=3, writer=writer)
+
+    async def scenario():
+        buffer.start()
+        await asyncio.gather(*(buffer.submit(make_entry(s)) for s in [1, 2, 3]))
+        batches = list(writer.batches)
+        await buffer.drain()
+        return batches
+
+    assert asyncio.run(scenario()) == [[1, 2, 3]]
+    assert buffer.stats()["max_flush_rows"] == 3
+
+
+def test_immediate_ack_is_written_on_drain():
+    writer = RecordingWriter()
+    buffer = ScoreWriteBuffer("immediate_ack", flush_interval_ms=10000, writer=writer)
+
+    async def scenario():
+        buffer.start()
+        await buffer.submit(make_entry(1))
+        await buffer.submit(make_entry(2))
+        assert writer.batches == []
+        await buffer.drain()
+
+    asyncio.run(scenario())
+    assert writer.batches == [[1, 2]]
+    assert buffer.stats()["buffered"] == 0
+
+
+def test_failed_flush_reports_or_retries():
+    writer = RecordingWriter(fail=1)
+    buffer = ScoreWriteBuffer("flush_ack", flush_interval_ms=10000, flush_max_rows=1, writer=writer)
+
+    async def scenario():
+        buffer.start()
+        with pytest.raises(RuntimeError):
+            await buffer.submit(make_entry(1))
+        await buffer.submit(make_entry(2))
+        await buffer.drain()
+
+    asyncio.run(scenario())
+    assert writer.batches == [[2]]
+    assert buffer.stats()["flush_failures"] == 1
+
+    # Acknowledged scores stay buffered until a flush succeeds
+    writer = RecordingWriter(fail=1)
+    buffer = ScoreWriteBuffer("immediate_ack", flush_interval_ms=10000, writer=writer)
+
+    async def retry():
+        buffer.start()
+        await buffer.submit(make_entry(3))
+        await buffer.flush()
+        assert buffer.stats()["buffered"] == 1
+        await buffer.drain()
+
+    asyncio.run(retry())
+    assert writer.batches == [[3]]
+
+
+class PoisonWriter(RecordingWriter):
+    """Rejects every write that includes a negative score, and goes down after `up_for` writes"""
+
+    def __init__(self, up_for=None):
+        super().__init__()
+        self.up_for = up_for
+
+    async def __call__(self, entries):
+        if any(e.score < 0 for e in entries):
+            raise DataError("INSERT", {}, ValueError("value out of range"))
+        if self.up_for is not None and len(self.batches) >= self.up_for:
+            raise OperationalError("INSERT", {}, ConnectionError("connection refused"))
+        self.batches.append([e.score for e in entries])
+
+
+def test_unwritable_score_does_not_block_later_ones():
+    writer = PoisonWriter()
+    buffer = ScoreWriteBuffer("immediate_ack", flush_interval_ms=10000, writer=writer)
+
+    async def scenario():
+        buffer.start()
+        for score in [-1, 1, 2]:
+            await buffer.submit(make_entry(score))
+        await buffer.flush()
+        await buffer.submit(make_entry(3))
+        await buffer.drain()
+
+    asyncio.run(scenario())
+    assert writer.batches == [[1], [2], [3]]
+    stats = buffer.stats()
+    assert stats["rows_dropped"] == 1
+    assert stats["buffered"] == 0
+
+
+def test_outage_keeps_acknowledged_scores():
+    writer = RecordingWriter(fail=2)
+    buffer = ScoreWriteBuffer("immediate_ack", flush_interval_ms=10000, writer=writer)
+
+    async def scenario():
+        buffer.start()
+        for score in [1, 2, 3, 4]:
+            await buffer.submit(make_entry(score))
+        await buffer.flush()
+        await buffer.flush()
+        assert buffer.stats()["buffered"] == 4
+        await buffer.drain()
+
+    asyncio.run(scenario())
+    # Not retried one by one, as nothing says a row is at fault
+    assert writer.batches == [[1, 2, 3, 4]]
+    assert buffer.stats()["rows_dropped"] == 0
+
+
+def test_outage_during_one_by_one_retry_keeps_scores():
+    writer = PoisonWriter(up_for=1)
+    buffer = ScoreWriteBuffer("immediate_ack", flush_interval_ms=10000, writer=writer)
+
+    async def scenario():
+        buffer.start()
+        for score in [1, -1, 2, 3]:
+            await buffer.submit(make_entry(score))
+        await buffer.flush()
+        buffered = buffer.stats()["buffered"]
+        writer.up_for = None
+        await buffer.drain()
+        return buffered
+
+    # 1 is written, -1 rejected, then the database goes down before 2
+    assert asyncio.run(scenario()) == 2
+    assert writer.batches == [[1], [2, 3]]
+    assert buffer.stats()["rows_dropped"] == 1
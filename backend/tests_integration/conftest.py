@@ -4,6 +4,8 @@ import tempfile
 import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
 from app.db_models import Base
 from app import database
 
@@ -26,11 +28,47 @@ def integration_db():
     database.engine = engine
     database.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     
+    # Point the async path at the same database file
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    original_async_engine = database.async_engine
+    original_async_session_local = database.AsyncSessionLocal
+    
+    database.async_engine = async_engine
+    database.AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    
     yield database.SessionLocal
     
     # Cleanup: restore original engine and session, close and delete temp file
     database.engine = original_engine
     database.SessionLocal = original_session_local
+    database.async_engine = original_async_engine
+    database.AsyncSessionLocal = original_async_session_local
+    engine.dispose()
     
     os.close(db_fd)
     os.unlink(db_path)
+
+
+@pytest.fixture(scope="function")
+def postgres_db():
+    """Point the database layer at TEST_POSTGRES_URL, with asyncpg on the async path"""
+    url = os.getenv("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("needs TEST_POSTGRES_URL of a local Postgres")
+    
+    engine = create_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    async_engine = create_async_engine(url.replace("postgresql://", "postgresql+asyncpg://", 1), poolclass=NullPool)
+    
+    originals = (database.engine, database.SessionLocal, database.async_engine, database.AsyncSessionLocal)
+    database.engine = engine
+    database.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    database.async_engine = async_engine
+    database.AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    
+    yield database.SessionLocal
+    
+    database.engine, database.SessionLocal, database.async_engine, database.AsyncSessionLocal = originals
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
@@ -0,0 +1,177 @@
+"""Integration tests for the async database helpers"""
+import asyncio
+import uuid
+from datetime import datetime, timezone
+import pytest
+from app.database import (
+    acreate_user, aget_user_by_email, aadd_leaderboard_entry,
+    aget_leaderboard, aget_active_games, get_leaderboard, get_async_db,
+)
+from app.leaderboard_cache import leaderboard_cache
+from app.db_models import ActiveGameDB, GameModeEnum
+from app.game_codec import encode_points, encode_point
+from app.models import LeaderboardEntry, GameMode
+
+
+def test_async_user_roundtrip(integration_db):
+    """Test creating and retrieving a user through the async helpers"""
+    async def scenario():
+        created = await acreate_user({
+            "email": "async@example.com",
+            "username": "asyncuser",
+            "password_hash": "hash"
+        })
+        retrieved = await aget_user_by_email("async@example.com")
+        missing = await aget_user_by_email("missing@example.com")
+        return created, retrieved, missing
+
+    created, retrieved, missing = asyncio.run(scenario())
+
+    assert retrieved is not None
+    assert retrieved["id"] == created["id"]
+    assert retrieved["username"] == "asyncuser"
+    assert missing is None
+
+
+def test_async_leaderboard_matches_sync(integration_db):
+    """Test that async writes are visible to both read paths"""
+    async def scenario():
+        for i, score in enumerate([30, 90, 60]):
+            await aadd_leaderboard_entry(LeaderboardEntry(
+                id=str(uuid.uuid4()),
+                username=f"player{i}",
+                score=score,
+                mode=GameMode.walls,
+                timestamp=datetime.now(timezone.utc)
+            ))
+        return await aget_leaderboard(GameMode.walls, 2)
+
+    top = asyncio.run(scenario())
+
+    assert [e.score for e in top] == [90, 60]
+    assert [e.id for e in top] == [e.id for e in get_leaderboard(GameMode.walls, 2)]
+
+
+def test_async_active_games(integration_db):
+    """Test reading active games through the async helper"""
+    db = integration_db()
+    db.add(ActiveGameDB(
+        id=str(uuid.uuid4()),
+        username="async_player",
+        score=40,
+        mode=GameModeEnum.pass_through,
+        snake=encode_points([{"x": 3, "y": 4}, {"x": 2, "y": 4}]),
+        food=encode_point({"x": 7, "y": 7})
+    ))
+    db.commit()
+    db.close()
+
+    games = asyncio.run(aget_active_games())
+
+    assert len(games) == 1
+    assert games[0].mode == GameMode.pass_through
+    assert [(p.x, p.y) for p in games[0].snake] == [(3, 4), (2, 4)]
+
+
+def test_bulk_leaderboard_insert(integration_db):
+    """Test writing several entries with one bulk insert"""
+    from app.database import aadd_leaderboard_entries
+
+    entries = [
+        LeaderboardEntry(
+            id=str(uuid.uuid4()),
+            username=f"bulk{i}",
+            score=i * 10,
+            mode=GameMode.walls if i % 2 else GameMode.pass_through,
+            timestamp=datetime.now(timezone.utc)
+        )
+        for i in range(5)
+    ]
+    asyncio.run(aadd_leaderboard_entries(entries))
+
+    stored = get_leaderboard(limit=10)
+    assert sorted(e.id for e in stored) == sorted(e.id for e in entries)
+    assert {e.mode for e in stored} == {GameMode.walls, GameMode.pass_through}
+
+
+def test_aware_timestamps_are_stored_as_utc(integration_db):
+    """Test that aware datetimes from other zones are written as naive UTC"""
+    from datetime import timedelta
+    from app.database import aadd_leaderboard_entries
+    
+    local = datetime(2026, 10, 17, 14, 0, tzinfo=timezone(timedelta(hours=2)))
+    asyncio.run(aadd_leaderboard_entries([LeaderboardEntry(
+        id=str(uuid.uuid4()), username="zoned", score=10, mode=GameMode.walls, timestamp=local
+    )]))
+    
+    assert get_leaderboard(limit=1)[0].timestamp.replace(tzinfo=None) == datetime(2026, 10, 17, 12, 0)
+
+
+def test_async_writes_on_postgres(postgres_db):
+    """Test that the asyncpg write path takes the aware datetimes signup and submissions build"""
+    from app.database import aadd_leaderboard_entries
+    from app.db_models import UserDB, LeaderboardEntryDB, UserBestScoreDB, LeaderboardWindowScoreDB
+    
+    submitted = datetime.now(timezone.utc)
+    
+    async def scenario():
+        await acreate_user({"email": "pg@example.com", "username": "pg", "password_hash": "hash"})
+        await aadd_leaderboard_entries([LeaderboardEntry(
+            id=str(uuid.uuid4()), username="pg", score=40, mode=GameMode.walls, timestamp=submitted
+        )])
+        return await aget_user_by_email("pg@example.com", replica=False)
+    
+    user = asyncio.run(scenario())
+    
+    db = postgres_db()
+    assert user["username"] == "pg"
+    assert db.query(UserDB).one().created_at.tzinfo is None
+    naive = submitted.replace(tzinfo=None)
+    assert db.query(LeaderboardEntryDB).one().timestamp == naive
+    assert db.query(UserBestScoreDB).one().timestamp == naive
+    assert {w.timestamp for w in db.query(LeaderboardWindowScoreDB)} == {naive}
+    db.close()
+
+
+def test_unit_of_work_commits_once_at_the_end(integration_db):
+    """Test that writes in a request session are committed, and cached, only when the request ends"""
+    entry = LeaderboardEntry(
+        id=str(uuid.uuid4()),
+        username="uow",
+        score=70,
+        mode=GameMode.walls,
+        timestamp=datetime.now(timezone.utc)
+    )
+    leaderboard_cache.load({None: [], GameMode.walls: [], GameMode.pass_through: []})
+    
+    async def scenario():
+        request = get_async_db()
+        db = await request.__anext__()
+        await acreate_user({"email": "uow@example.com", "username": "uow", "password_hash": "hash"}, db)
+        await aadd_leaderboard_entry(entry, db)
+        pending = (await aget_user_by_email("uow@example.com"), leaderboard_cache.get(GameMode.walls, 10))
+        with pytest.raises(StopAsyncIteration):
+            await request.__anext__()
+        return pending, await aget_user_by_email("uow@example.com")
+    
+    try:
+        (user_before, cached_before), user_after = asyncio.run(scenario())
+        assert user_before is None
+        assert cached_before == []
+        assert user_after["username"] == "uow"
+        assert [e.id for e in leaderboard_cache.get(GameMode.walls, 10)] == [entry.id]
+    finally:
+        leaderboard_cache.clear()
+
+
+def test_unit_of_work_rolls_back_on_error(integration_db):
+    """Test that a request that fails after writing leaves nothing behind"""
+    async def scenario():
+        request = get_async_db()
+        db = await request.__anext__()
+        await acreate_user({"email": "failed@example.com", "username": "failed", "password_hash": "hash"}, db)
+        with pytest.raises(RuntimeError):
+            await request.athrow(RuntimeError("route failed"))
+        return await aget_user_by_email("failed@example.com")
+    
+    assert asyncio.run(scenario()) is None
@@ -0,0 +1,154 @@
+"""Integration tests for cross-worker invalidation"""
+import asyncio
+import os
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.database import add_leaderboard_entry, create_user
+from app.events import InvalidationBus, PostgresBackend, invalidation_bus, SCORES_ADDED, USERS_CHANGED
+from app.models import LeaderboardEntry, GameMode
+
+
+@pytest.fixture
+def other_worker():
+    """A second bus on the app's in-process backend, standing in for another worker"""
+    bus = InvalidationBus(invalidation_bus.backend)
+    yield bus
+    invalidation_bus.backend.detach(bus)
+
+
+def test_writes_are_published(integration_db, other_worker):
+    """Test that the database writers publish their changes"""
+    received = []
+    other_worker.subscribe(USERS_CHANGED, lambda emails: received.append(("users", emails)))
+    other_worker.subscribe(SCORES_ADDED, lambda rows: received.append(("scores", rows)))
+    
+    db = integration_db()
+    create_user({"email": "new@example.com", "username": "new", "password_hash": "x"}, db)
+    entry = LeaderboardEntry(
+        id=str(uuid.uuid4()),
+        username="new",
+        score=70,
+        mode=GameMode.pass_through,
+        timestamp=datetime.now(timezone.utc)
+    )
+    add_leaderboard_entry(entry, db)
+    db.close()
+    
+    assert received == [
+        ("users", ["new@example.com"]),
+        ("scores", [[entry.id, "new", 70, "pass-through", entry.timestamp.isoformat()]]),
+    ]
+
+
+def test_other_workers_writes_update_caches(integration_db, other_worker):
+    """Test that events from another worker reach the user cache and leaderboard"""
+    from app.cache import user_cache
+    from app.leaderboard_cache import leaderboard_cache
+    from app.rankings import rank_index
+    from app.versioning import resource_versions, LEADERBOARD
+    
+    user_cache.set("stale@example.com", {"email": "stale@example.com"})
+    leaderboard_cache.load({mode: [] for mode in (None, *GameMode)})
+    rank_index.load([])
+    version = resource_versions.get(LEADERBOARD)
+    
+    try:
+        other_worker.publish(USERS_CHANGED, ["stale@example.com"])
+        other_worker.publish(SCORES_ADDED, [["id-1", "far", 90, "walls", "2026-10-17T12:00:00+00:00"]])
+        
+        assert user_cache.get("stale@example.com") is None
+        assert [(e.id, e.score, e.mode) for e in leaderboard_cache.get(GameMode.walls, 10)] == [
+            ("id-1", 90, GameMode.walls)
+        ]
+        assert rank_index.rank(None, 90) == (1, 1)
+        assert resource_versions.get(LEADERBOARD) == version + 1
+    finally:
+        leaderboard_cache.clear()
+        rank_index.clear()
+
+
+def test_large_batches_are_split_to_fit_notify(other_worker):
+    """Test that score events stay under the NOTIFY limit however long the usernames are"""
+    import json
+    from app.database import _publish_entries
+    from app.events import MAX_MESSAGE_BYTES
+    
+    events = []
+    other_worker.subscribe(SCORES_ADDED, events.append)
+    entries = [
+        LeaderboardEntry(id=str(i), username="ü" * 150, score=i, mode=GameMode.walls,
+                         timestamp=datetime.now(timezone.utc))
+        for i in range(100)
+    ]
+    
+    _publish_entries(entries)
+    
+    assert len(events) > 1
+    assert [row[0] for rows in events for row in rows] == [e.id for e in entries]
+    for rows in events:
+        message = json.dumps({"origin": other_worker.origin, "topic": SCORES_ADDED, "payload": rows})
+        assert len(message.encode()) <= MAX_MESSAGE_BYTES
+
+
+def test_resync_reloads_leaderboard_and_ranks(integration_db):
+    """Test that missed events make the worker reload its leaderboard cache and rank index"""
+    from app import database
+    from app.leaderboard_cache import leaderboard_cache
+    from app.rankings import rank_index
+    
+    db = integration_db()
+    add_leaderboard_entry(LeaderboardEntry(
+        id="missed", username="far", score=80, mode=GameMode.walls, timestamp=datetime.now(timezone.utc)
+    ), db)
+    db.close()
+    leaderboard_cache.load({mode: [] for mode in (None, *GameMode)})
+    rank_index.load([])
+    
+    async def scenario():
+        invalidation_bus.resync()
+        await database._resync_task
+    
+    try:
+        asyncio.run(scenario())
+        assert [e.id for e in leaderboard_cache.get(GameMode.walls, 10)] == ["missed"]
+        assert rank_index.rank(GameMode.walls, 80) == (1, 1)
+    finally:
+        leaderboard_cache.clear()
+        rank_index.clear()
+
+
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_URL"), reason="needs TEST_POSTGRES_URL of a local Postgres")
+def test_postgres_listen_notify():
+    """Test two buses exchanging events through LISTEN/NOTIFY"""
+    url = os.environ["TEST_POSTGRES_URL"]
+    channel = f"test_{uuid.uuid4().hex}"
+    
+    async def scenario():
+        sender = InvalidationBus(PostgresBackend(url, channel))
+        receiver = InvalidationBus(PostgresBackend(url, channel))
+        received = asyncio.Queue()
+        receiver.subscribe("topic", received.put_nowait)
+        sender.subscribe("topic", received.put_nowait)
+        await sender.start()
+        await receiver.start()
+        try:
+            sender.publish("topic", {"n": 1})
+            sender.publish("topic", "x" * 10000)  # too large for NOTIFY
+            first = await asyncio.wait_for(received.get(), 5)
+            await asyncio.sleep(0.2)
+            return first, received.qsize(), sender.stats(), receiver.stats()
+        finally:
+            await sender.stop()
+            await receiver.stop()
+    
+    first, pending, sender_stats, receiver_stats = asyncio.run(scenario())
+    
+    # The sender skips its own event; the large one arrives as a resync
+    assert first == {"n": 1}
+    assert pending == 0
+    assert sender_stats["sent"] == 2
+    assert sender_stats["oversized"] == 1
+    assert receiver_stats["received"] == 2
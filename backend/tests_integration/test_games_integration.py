@@ -1,7 +1,7 @@
 """Integration tests for active games functionality with database"""
 import pytest
-import json
 from app.database import get_active_games
+from app.game_codec import encode_points, encode_point
 from app.db_models import ActiveGameDB, GameModeEnum
 from app.models import Point, GameMode
 import uuid
@@ -20,8 +20,8 @@ def test_active_games_retrieval(integration_db):
         username="active_player",
         score=50,
         mode=GameModeEnum.walls,
-        snake=json.dumps(snake_data),
-        food=json.dumps(food_data)
+        snake=encode_points(snake_data),
+        food=encode_point(food_data)
     )
     
     db.add(game)
@@ -71,8 +71,8 @@ def test_multiple_active_games(integration_db):
             username=game_data["username"],
             score=game_data["score"],
             mode=game_data["mode"],
-            snake=json.dumps(game_data["snake"]),
-            food=json.dumps(game_data["food"])
+            snake=encode_points(game_data["snake"]),
+            food=encode_point(game_data["food"])
         )
         db.add(game)
     
@@ -112,8 +112,8 @@ def test_snake_position_serialization(integration_db):
         username="snake_test",
         score=90,
         mode=GameModeEnum.walls,
-        snake=json.dumps(snake_positions),
-        food=json.dumps({"x": 20, "y": 20})
+        snake=encode_points(snake_positions),
+        food=encode_point({"x": 20, "y": 20})
     )
     
     db.add(game)
@@ -157,8 +157,8 @@ def test_active_games_different_modes(integration_db):
             username=f"player_{mode.value}",
             score=100,
             mode=mode,
-            snake=json.dumps([{"x": 10, "y": 10}]),
-            food=json.dumps({"x": 5, "y": 5})
+            snake=encode_points([{"x": 10, "y": 10}]),
+            food=encode_point({"x": 5, "y": 5})
         )
         db.add(game)
     
@@ -174,3 +174,82 @@ def test_active_games_different_modes(integration_db):
     assert GameMode.pass_through in modes
     
     db.close()
+    
+    
+def test_spectator_stream_sends_deltas(integration_db):
+    """Test the WebSocket stream sends a snapshot, then only what changed"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.game_registry import game_registry
+    from app.spectator import spectator_hub
+    
+    game_id = str(uuid.uuid4())
+    game_registry.clear()
+    game_registry.update(
+        game_id, "streamer", 10, "walls",
+        [{"x": 5, "y": 5}, {"x": 4, "y": 5}], {"x": 9, "y": 9}
+    )
+    
+    original_interval = spectator_hub.poll_interval
+    spectator_hub.poll_interval = 0.01
+    try:
+        client = TestClient(app)
+        with client.websocket_connect("/api/games/live?mode=walls") as ws:
+            snapshot = ws.receive_json()
+            game_registry.update(
+                game_id, "streamer", 20, "walls",
+                [{"x": 6, "y": 5}, {"x": 5, "y": 5}], {"x": 9, "y": 9}
+            )
+            delta = ws.receive_json()
+    finally:
+        spectator_hub.poll_interval = original_interval
+        game_registry.clear()
+    
+    assert snapshot["type"] == "snapshot"
+    assert [g["id"] for g in snapshot["games"]] == [game_id]
+    assert delta == {"type": "delta", "events": [{
+        "type": "update", "id": game_id,
+        "head": [{"x": 6, "y": 5}], "tail": 1, "score": 20
+    }]}
+    assert spectator_hub.stats()["subscribers"] == 0
+    
+    
+def test_registry_checkpoint_roundtrip(integration_db):
+    """Test game state written by a checkpoint is loaded back after a restart"""
+    import asyncio
+    from app.database import aget_active_game_rows
+    from app.game_registry import GameRegistry
+    
+    registry = GameRegistry()
+    for score in [10, 20, 30]:
+        registry.update("kept", "player", score, "pass-through", [{"x": score, "y": 1}], {"x": 2, "y": 2})
+    registry.update("ended", "player", 5, "walls", [{"x": 1, "y": 1}], {"x": 2, "y": 2})
+    asyncio.run(registry.checkpoint())
+    registry.end("ended", "player")
+    asyncio.run(registry.checkpoint())
+    
+    active_games = get_active_games()
+    assert [(g.id, g.score, g.mode) for g in active_games] == [("kept", 30, GameMode.pass_through)]
+    assert active_games[0].snake[0].x == 30
+    
+    restarted = GameRegistry()
+    restarted.load(asyncio.run(aget_active_game_rows()))
+    assert restarted.rows() == registry.rows()
+
+
+def test_registry_checkpoint_on_postgres(postgres_db):
+    """Test that checkpoints write their aware updated_at through asyncpg"""
+    import asyncio
+    from datetime import datetime, timedelta, timezone
+    from app.game_registry import GameRegistry
+    
+    registry = GameRegistry()
+    registry.update("game", "player", 10, "walls", [{"x": 1, "y": 1}], {"x": 2, "y": 2})
+    asyncio.run(registry.checkpoint())
+    
+    db = postgres_db()
+    game = db.query(ActiveGameDB).one()
+    assert game.score == 10
+    assert abs(game.updated_at - datetime.now(timezone.utc).replace(tzinfo=None)) < timedelta(minutes=1)
+    assert registry.stats()["checkpoint_failures"] == 0
+    db.close()
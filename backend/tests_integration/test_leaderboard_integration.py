@@ -201,3 +201,258 @@ def test_multiple_scores_same_user(integration_db):
     assert player_entries[2].score == 50
     
     db.close()
+
+
+def test_keyset_pagination(integration_db):
+    """Test that cursor pages continue exactly where the previous page ended"""
+    db = integration_db()
+    
+    # Duplicate scores make the id tie-breaker matter
+    for i in range(12):
+        entry = LeaderboardEntry(
+            id=str(uuid.uuid4()),
+            username=f"player{i}",
+            score=(i // 3) * 10,
+            mode=GameMode.walls,
+            timestamp=datetime.now(timezone.utc)
+        )
+        add_leaderboard_entry(entry, db)
+    
+    everything = get_leaderboard(limit=12, db=db)
+    
+    pages = []
+    after = None
+    while True:
+        page = get_leaderboard(limit=5, db=db, after=after)
+        pages.extend(page)
+        if len(page) < 5:
+            break
+        after = (page[-1].score, page[-1].id)
+    
+    assert [e.id for e in pages] == [e.id for e in everything]
+    
+    db.close()
+
+
+def test_leaderboard_queries_use_score_indexes(integration_db):
+    """Test that top-N reads walk the composite indexes instead of sorting"""
+    from app.database import _leaderboard_query
+    
+    db = integration_db()
+    engine = db.get_bind()
+    
+    def plan(query):
+        sql = query.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+        rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+        return " | ".join(row[-1] for row in rows)
+    
+    by_mode = plan(_leaderboard_query(GameMode.walls, 10))
+    assert "ix_leaderboard_mode_score_id" in by_mode
+    assert "TEMP B-TREE" not in by_mode
+    
+    by_mode_page = plan(_leaderboard_query(GameMode.walls, 10, after=(100, "abc")))
+    assert "ix_leaderboard_mode_score_id" in by_mode_page
+    assert "TEMP B-TREE" not in by_mode_page
+    
+    all_modes = plan(_leaderboard_query(None, 10))
+    assert "ix_leaderboard_score_id" in all_modes
+    assert "TEMP B-TREE" not in all_modes
+    
+    db.close()
+
+
+def test_leaderboard_served_from_memory(integration_db):
+    """Test that reads are answered by the top-K cache after a resync"""
+    import asyncio
+    from app.database import aget_leaderboard, aadd_leaderboard_entry, resync_leaderboard_cache
+    from app.leaderboard_cache import leaderboard_cache
+    
+    db = integration_db()
+    for score in [10, 30, 20]:
+        add_leaderboard_entry(LeaderboardEntry(
+            id=str(uuid.uuid4()),
+            username="player",
+            score=score,
+            mode=GameMode.walls,
+            timestamp=datetime.now(timezone.utc)
+        ), db)
+    
+    async def scenario():
+        await resync_leaderboard_cache()
+        await aadd_leaderboard_entry(LeaderboardEntry(
+            id=str(uuid.uuid4()),
+            username="player",
+            score=25,
+            mode=GameMode.walls,
+            timestamp=datetime.now(timezone.utc)
+        ))
+        hits = leaderboard_cache.hits
+        cached = await aget_leaderboard(GameMode.walls, 10)
+        assert leaderboard_cache.hits == hits + 1
+        return cached
+    
+    try:
+        cached = asyncio.run(scenario())
+    finally:
+        leaderboard_cache.clear()
+    
+    assert [e.score for e in cached] == [30, 25, 20, 10]
+    assert [e.id for e in cached] == [e.id for e in get_leaderboard(GameMode.walls, 10, db=db)]
+    
+    db.close()
+
+
+def test_best_score_per_user(integration_db):
+    """Test that user_best_scores keeps each user's best entry per mode"""
+    import asyncio
+    from app.database import aadd_leaderboard_entries, aget_best_scores
+    
+    db = integration_db()
+    
+    def entry(username, score, mode=GameMode.walls):
+        return LeaderboardEntry(
+            id=str(uuid.uuid4()),
+            username=username,
+            score=score,
+            mode=mode,
+            timestamp=datetime.now(timezone.utc)
+        )
+    
+    for score in [50, 300, 100]:
+        add_leaderboard_entry(entry("grinder", score), db)
+    add_leaderboard_entry(entry("grinder", 400, GameMode.pass_through), db)
+    add_leaderboard_entry(entry("casual", 200), db)
+    
+    async def scenario():
+        # A batch from the write-behind buffer with two scores of one user
+        await aadd_leaderboard_entries([entry("casual", 250), entry("casual", 150), entry("grinder", 10)])
+        walls = await aget_best_scores(GameMode.walls, 10)
+        all_modes = await aget_best_scores(None, 10)
+        first_page = await aget_best_scores(None, 1)
+        next_page = await aget_best_scores(None, 10, after=(first_page[-1].score, first_page[-1].id))
+        return walls, all_modes, first_page + next_page
+    
+    walls, all_modes, paged = asyncio.run(scenario())
+    
+    assert [(e.username, e.score) for e in walls] == [("grinder", 300), ("casual", 250)]
+    assert [(e.username, e.score) for e in all_modes] == [("grinder", 400), ("casual", 250)]
+    assert all_modes[0].mode == GameMode.pass_through
+    assert [e.id for e in paged] == [e.id for e in all_modes]
+    # Ids refer to the leaderboard entries
+    assert walls[0].id in {e.id for e in get_leaderboard(GameMode.walls, 10, db=db)}
+    
+    db.close()
+
+
+def test_backfill_best_scores(integration_db):
+    """Test that the backfill rebuilds best scores and can run again"""
+    from app.database import backfill_best_scores
+    from app.db_models import UserBestScoreDB
+    
+    db = integration_db()
+    for username, score in [("a", 10), ("a", 40), ("b", 20)]:
+        add_leaderboard_entry(LeaderboardEntry(
+            id=str(uuid.uuid4()),
+            username=username,
+            score=score,
+            mode=GameMode.walls,
+            timestamp=datetime.now(timezone.utc)
+        ), db)
+    db.query(UserBestScoreDB).delete()
+    db.commit()
+    
+    backfill_best_scores(db)
+    backfill_best_scores(db)
+    
+    best = {row.username: row.score for row in db.query(UserBestScoreDB).all()}
+    assert best == {"a": 40, "b": 20}
+    
+    db.close()
+
+
+def test_player_rank_from_index_matches_sql(integration_db):
+    """Test that ranks from the in-memory index agree with counting in SQL"""
+    import asyncio
+    from app.database import aget_player_rank, resync_rank_index
+    from app.rankings import rank_index
+    
+    db = integration_db()
+    for i, score in enumerate([500, 400, 400, 300, 250, 200, 100]):
+        add_leaderboard_entry(LeaderboardEntry(
+            id=str(uuid.uuid4()),
+            username="me" if score == 250 else f"player{i}",
+            score=score,
+            mode=GameMode.walls if i % 2 else GameMode.pass_through,
+            timestamp=datetime.now(timezone.utc)
+        ), db)
+    
+    async def scenario():
+        from_sql = [await aget_player_rank("me", mode, 2) for mode in (None, GameMode.walls)]
+        await resync_rank_index()
+        from_index = [await aget_player_rank("me", mode, 2) for mode in (None, GameMode.walls)]
+        return from_sql, from_index
+    
+    try:
+        from_sql, from_index = asyncio.run(scenario())
+    finally:
+        rank_index.clear()
+    
+    assert from_index == from_sql
+    overall = from_index[0]
+    assert overall.rank == 5
+    assert overall.total == 7
+    assert [(e.score, e.rank) for e in overall.entries] == [(400, 2), (300, 4), (250, 5), (200, 6), (100, 7)]
+    
+    db.close()
+
+
+def test_window_scores(integration_db):
+    """Test that each window keeps the best entry per user and rolls over by key"""
+    import asyncio
+    from datetime import date, timedelta
+    from app.database import aadd_leaderboard_entries, aget_window_scores
+    from app.models import LeaderboardWindow
+    
+    db = integration_db()
+    
+    # Sunday and the Monday after it: same month, new day and week
+    sunday = datetime(2026, 5, 24, 18, 0, tzinfo=timezone.utc)
+    monday = sunday + timedelta(hours=8)
+    
+    def entry(username, score, when, mode=GameMode.walls):
+        return LeaderboardEntry(
+            id=str(uuid.uuid4()),
+            username=username,
+            score=score,
+            mode=mode,
+            timestamp=when
+        )
+    
+    add_leaderboard_entry(entry("early", 500, sunday), db)
+    add_leaderboard_entry(entry("late", 100, monday), db)
+    
+    async def scenario():
+        await aadd_leaderboard_entries([
+            entry("late", 300, monday), entry("late", 200, monday), entry("late", 400, monday, GameMode.pass_through)
+        ])
+        return {
+            (window, start, mode): [(e.username, e.score) for e in await aget_window_scores(window, start, mode, 10)]
+            for window, start in [
+                (LeaderboardWindow.day, date(2026, 5, 24)),
+                (LeaderboardWindow.day, date(2026, 5, 25)),
+                (LeaderboardWindow.week, date(2026, 5, 25)),
+                (LeaderboardWindow.month, date(2026, 5, 1)),
+            ]
+            for mode in (GameMode.walls, None)
+        }
+    
+    scores = asyncio.run(scenario())
+    
+    assert scores[(LeaderboardWindow.day, date(2026, 5, 24), GameMode.walls)] == [("early", 500)]
+    assert scores[(LeaderboardWindow.day, date(2026, 5, 25), GameMode.walls)] == [("late", 300)]
+    assert scores[(LeaderboardWindow.day, date(2026, 5, 25), None)] == [("late", 400)]
+    assert scores[(LeaderboardWindow.week, date(2026, 5, 25), None)] == [("late", 400)]
+    assert scores[(LeaderboardWindow.month, date(2026, 5, 1), GameMode.walls)] == [("early", 500), ("late", 300)]
+    assert scores[(LeaderboardWindow.month, date(2026, 5, 1), None)] == [("early", 500), ("late", 400)]
+    
+    db.close()
@@ -0,0 +1,117 @@
+"""Integration tests for the Alembic migrations"""
+import json
+import os
+import tempfile
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine
+from app.db_models import Base
+
+
+def test_migrations_match_models():
+    """Test that upgrading to head produces the schema the models describe"""
+    db_fd, db_path = tempfile.mkstemp(suffix=".db")
+    url = f"sqlite:///{db_path}"
+    
+    config = Config(os.path.join(os.path.dirname(__file__), "..", "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", url)
+    command.upgrade(config, "head")
+    
+    engine = create_engine(url)
+    try:
+        with engine.connect() as connection:
+            diff = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+        assert diff == []
+        
+        command.downgrade(config, "base")
+    finally:
+        engine.dispose()
+        os.close(db_fd)
+        os.unlink(db_path)
+
+
+def test_active_game_positions_are_packed_and_unpacked():
+    """Test that 0003 converts existing JSON positions to the app.game_codec format and back"""
+    from sqlalchemy import text
+    from app.game_codec import encode_point, encode_points
+    
+    db_fd, db_path = tempfile.mkstemp(suffix=".db")
+    url = f"sqlite:///{db_path}"
+    config = Config(os.path.join(os.path.dirname(__file__), "..", "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", url)
+    snake = [{"x": 5, "y": -3}, {"x": 32767, "y": -32768}]
+    food = {"x": 1, "y": 2}
+    
+    engine = create_engine(url)
+    try:
+        command.upgrade(config, "0002")
+        with engine.begin() as connection:
+            connection.execute(
+                text("INSERT INTO active_games VALUES ('g', 'player', 3, 'walls', :snake, :food, '2026-01-01')"),
+                {"snake": json.dumps(snake), "food": json.dumps(food)},
+            )
+        
+        command.upgrade(config, "0003")
+        with engine.connect() as connection:
+            packed = connection.execute(text("SELECT snake, food FROM active_games")).one()
+        assert (packed.snake, packed.food) == (encode_points(snake), encode_point(food))
+        
+        command.downgrade(config, "0002")
+        with engine.connect() as connection:
+            unpacked = connection.execute(text("SELECT snake, food FROM active_games")).one()
+        assert (json.loads(unpacked.snake), json.loads(unpacked.food)) == (snake, food)
+    finally:
+        engine.dispose()
+        os.close(db_fd)
+        os.unlink(db_path)
+
+
+def test_current_windows_are_backfilled():
+    """Test that 0005 fills the windows in progress with each user's best entry, as app.windows computes them"""
+    from datetime import datetime, timedelta, timezone
+    from sqlalchemy import text
+    from app.models import LeaderboardWindow
+    from app.windows import current_window_start
+    
+    db_fd, db_path = tempfile.mkstemp(suffix=".db")
+    url = f"sqlite:///{db_path}"
+    config = Config(os.path.join(os.path.dirname(__file__), "..", "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", url)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    
+    engine = create_engine(url)
+    try:
+        command.upgrade(config, "0004")
+        with engine.begin() as connection:
+            for entry_id, score, timestamp in [("a", 10, now), ("b", 20, now), ("old", 99, now - timedelta(days=40))]:
+                connection.execute(
+                    text("INSERT INTO leaderboard (id, username, score, mode, timestamp) "
+                         "VALUES (:id, 'player', :score, 'walls', :timestamp)"),
+                    {"id": entry_id, "score": score, "timestamp": timestamp.isoformat(sep=" ")},
+                )
+        
+        command.upgrade(config, "0005")
+        with engine.connect() as connection:
+            rows = connection.execute(
+                text("SELECT period, period_start, entry_id FROM leaderboard_windows ORDER BY period")
+            ).all()
+        assert rows == [
+            (window.value, str(current_window_start(window)), "b")
+            for window in sorted(LeaderboardWindow, key=lambda window: window.value)
+        ]
+    finally:
+        engine.dispose()
+        os.close(db_fd)
+        os.unlink(db_path)
+
+
+def test_migrations_do_not_import_the_app():
+    """Test that migrations stay as written when application code changes"""
+    versions = os.path.join(os.path.dirname(__file__), "..", "migrations", "versions")
+    for name in os.listdir(versions):
+        if name.endswith(".py"):
+            with open(os.path.join(versions, name)) as f:
+                source = f.read()
+            assert "from app" not in source and "import app" not in source, name
@@ -0,0 +1,125 @@
+"""Integration tests for read replica routing"""
+import asyncio
+import os
+import tempfile
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app import database
+from app.database import add_leaderboard_entry, get_leaderboard, aget_leaderboard, aget_user_by_email, create_user
+from app.db_models import Base
+from app.models import LeaderboardEntry, GameMode
+from app.replica import read_router
+from app.versioning import resource_versions, LEADERBOARD
+
+
+def _entry(username, score):
+    return LeaderboardEntry(
+        id=str(uuid.uuid4()),
+        username=username,
+        score=score,
+        mode=GameMode.walls,
+        timestamp=datetime.now(timezone.utc)
+    )
+
+
+@pytest.fixture
+def replica(integration_db):
+    """A second SQLite database standing in for a replica that lags behind"""
+    db_fd, db_path = tempfile.mkstemp(suffix=".db")
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    
+    originals = (database.ReadSessionLocal, database.AsyncReadSessionLocal, read_router.enabled)
+    database.ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    database.AsyncReadSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+    read_router.enabled = True
+    
+    yield database.ReadSessionLocal
+    
+    database.ReadSessionLocal, database.AsyncReadSessionLocal, read_router.enabled = originals
+    read_router._writers.clear()
+    read_router._unhealthy_until = 0.0
+    engine.dispose()
+    asyncio.run(async_engine.dispose())
+    os.close(db_fd)
+    os.unlink(db_path)
+
+
+def test_reads_are_routed_to_the_replica(integration_db, replica):
+    """Test that reads use the replica except right after the reader wrote"""
+    primary_db, replica_db = integration_db(), replica()
+    add_leaderboard_entry(_entry("new", 100), primary_db)
+    add_leaderboard_entry(_entry("replicated", 50), replica_db)
+    create_user({"email": "new@example.com", "username": "new", "password_hash": "x"}, primary_db)
+    
+    assert [e.username for e in get_leaderboard()] == ["replicated"]
+    
+    async def scenario():
+        anonymous = await aget_leaderboard(after=(1000, ""))
+        before_write = await aget_user_by_email("new@example.com")
+        read_router.wrote("new@example.com")
+        writer = await aget_leaderboard(after=(1000, ""), reader="new@example.com")
+        after_write = await aget_user_by_email("new@example.com")
+        from_primary = await aget_user_by_email("new@example.com", replica=False)
+        return anonymous, before_write, writer, after_write, from_primary
+    
+    anonymous, before_write, writer, after_write, from_primary = asyncio.run(scenario())
+    
+    assert [e.username for e in anonymous] == ["replicated"]
+    assert [e.username for e in writer] == ["new"]
+    assert before_write is None
+    assert after_write["username"] == "new"
+    assert from_primary["username"] == "new"
+    
+    primary_db.close()
+    replica_db.close()
+
+
+def test_tagged_reads_after_a_change_use_the_primary(integration_db, replica):
+    """Test that a page tagged with a just-bumped version is not read from a lagging replica"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    
+    primary_db, replica_db = integration_db(), replica()
+    add_leaderboard_entry(_entry("new", 100), primary_db)
+    add_leaderboard_entry(_entry("replicated", 50), replica_db)
+    client = TestClient(app)
+    
+    resource_versions.bump(LEADERBOARD)
+    fresh = client.get("/api/leaderboard", params={"distinct": "users"})
+    resource_versions._changed_at[LEADERBOARD] -= read_router.read_your_writes_seconds
+    settled = client.get("/api/leaderboard", params={"distinct": "users"})
+    
+    assert [e["username"] for e in fresh.json()] == ["new"]
+    assert [e["username"] for e in settled.json()] == ["replicated"]
+    assert fresh.headers["ETag"] == settled.headers["ETag"]
+    
+    primary_db.close()
+    replica_db.close()
+
+
+def test_unhealthy_replica_falls_back_to_primary(integration_db, replica):
+    """Test that a failing replica read is retried on the primary, then skipped"""
+    primary_db = integration_db()
+    add_leaderboard_entry(_entry("primary", 10), primary_db)
+    broken = create_engine("sqlite:////nonexistent/directory/replica.db")
+    database.ReadSessionLocal = sessionmaker(bind=broken)
+    stats = read_router.stats()
+    
+    assert [e.username for e in get_leaderboard()] == ["primary"]
+    assert [e.username for e in get_leaderboard()] == ["primary"]
+    
+    after = read_router.stats()
+    assert after["healthy"] is False
+    assert after["fallbacks"] == stats["fallbacks"] + 1
+    assert after["unhealthy_skips"] == stats["unhealthy_skips"] + 1
+    
+    primary_db.close()
@@ -0,0 +1,113 @@
+"""Integration tests for the bulk synthetic data generator"""
+import os
+from datetime import date, datetime, timezone
+import pytest
+from sqlalchemy import func, select
+from app.db_models import UserDB, LeaderboardEntryDB, UserBestScoreDB, LeaderboardWindowScoreDB, ActiveGameDB
+from app.models import LeaderboardWindow
+from app.seed import generate_data
+from app.windows import current_window_start, window_start
+
+
+def test_generate_data(integration_db):
+    """Test that generated rows match the counts and the derived tables"""
+    from app.database import backfill_best_scores
+    
+    rows = generate_data(users=50, scores=600, games=5, days=60, batch_size=64, seed=1)
+    
+    db = integration_db()
+    stored = {
+        table.__tablename__: db.scalar(select(func.count()).select_from(table))
+        for table in (UserDB, LeaderboardEntryDB, UserBestScoreDB, LeaderboardWindowScoreDB, ActiveGameDB)
+    }
+    assert {table: count for table, (count, _) in rows.items()} == stored
+    assert (stored["users"], stored["leaderboard"], stored["active_games"]) == (50, 600, 5)
+    # At most one best entry per user and mode, and at least one for each user with scores
+    best_users = db.scalar(select(func.count(func.distinct(UserBestScoreDB.username))))
+    assert best_users <= stored["user_best_scores"] <= 2 * best_users
+    assert best_users == db.scalar(select(func.count(func.distinct(LeaderboardEntryDB.username))))
+    assert stored["leaderboard_windows"] > 0
+    assert db.scalar(select(func.count(func.distinct(UserDB.email)))) == 50
+    # All users share one hash
+    assert db.scalar(select(func.count(func.distinct(UserDB.password_hash)))) == 1
+    
+    # Best scores are what the backfill computes from the entries
+    generated = {(b.username, b.mode): b.entry_id for b in db.query(UserBestScoreDB).all()}
+    db.query(UserBestScoreDB).delete()
+    db.commit()
+    backfill_best_scores(db)
+    assert {(b.username, b.mode): b.entry_id for b in db.query(UserBestScoreDB).all()} == generated
+    
+    # Current windows hold each user's best entry in them
+    now = datetime.now(timezone.utc)
+    for window in LeaderboardWindow:
+        start = current_window_start(window, now)
+        expected = {}
+        for e in db.query(LeaderboardEntryDB).all():
+            if window_start(window, e.timestamp) != start:
+                continue
+            key = (e.username, e.mode)
+            if key not in expected or (e.score, e.id) > expected[key]:
+                expected[key] = (e.score, e.id)
+        stored = {
+            (w.username, w.mode): (w.score, w.entry_id)
+            for w in db.query(LeaderboardWindowScoreDB).filter(LeaderboardWindowScoreDB.period == window.value)
+        }
+        assert stored == expected
+    
+    db.close()
+
+
+@pytest.mark.skipif(not os.getenv("TEST_POSTGRES_URL"), reason="needs TEST_POSTGRES_URL of a local Postgres")
+def test_copy_writes_enums_bytes_and_dates():
+    """Test that rows written with COPY on Postgres read back as inserted ones do"""
+    from sqlalchemy import create_engine
+    from app.db_models import Base, GameModeEnum, LeaderboardWindowEnum
+    from app.game_codec import encode_points, decode_points
+    from app.seed import _BulkWriter
+    
+    engine = create_engine(os.environ["TEST_POSTGRES_URL"])
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    timestamp = datetime(2026, 10, 17, 12, 30, 15, 250000)
+    snake = [{"x": -1, "y": 32767}, {"x": 0, "y": -32768}]
+    
+    try:
+        writer = _BulkWriter(engine, batch_size=10)
+        assert writer.copy
+        try:
+            writer.add(LeaderboardWindowScoreDB.__table__, {
+                "period": LeaderboardWindowEnum.week, "period_start": date(2026, 10, 12), "username": "p",
+                "mode": GameModeEnum.pass_through, "score": 7, "entry_id": "e", "timestamp": timestamp,
+            })
+            writer.add(ActiveGameDB.__table__, {
+                "id": "g", "username": "p", "score": 3, "mode": GameModeEnum.walls,
+                "snake": encode_points(snake), "food": b"\x00\x01\x02\x03", "updated_at": timestamp,
+            })
+            writer.flush()
+        finally:
+            writer.close()
+        
+        with engine.connect() as connection:
+            window = connection.execute(select(LeaderboardWindowScoreDB.__table__)).one()
+            game = connection.execute(select(ActiveGameDB.__table__)).one()
+        assert (window.period, window.period_start, window.mode, window.timestamp) == (
+            LeaderboardWindowEnum.week, date(2026, 10, 12), GameModeEnum.pass_through, timestamp
+        )
+        assert (game.mode, decode_points(game.snake), game.food, game.updated_at) == (
+            GameModeEnum.walls, snake, b"\x00\x01\x02\x03", timestamp
+        )
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+
+
+def test_generate_data_again_adds_users(integration_db):
+    """Test that a second run adds new users after the existing ones"""
+    generate_data(users=10, scores=20, seed=1)
+    generate_data(users=10, scores=20, seed=1)
+    
+    db = integration_db()
+    assert db.scalar(select(func.count(func.distinct(UserDB.email)))) == 20
+    assert db.scalar(select(func.count(func.distinct(LeaderboardEntryDB.id)))) == 40
+    db.close()
@@ -0,0 +1,68 @@
+"""Integration tests for the startup schema check and pool warmup"""
+import asyncio
+import os
+import tempfile
+
+import pytest
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.database import acheck_schema_revision, awarm_pool, SchemaRevisionError
+from app.db_models import SCHEMA_REVISION
+
+
+def _set_revision(session_local, revision):
+    with session_local() as db:
+        db.execute(text("CREATE TABLE IF NOT EXISTS alembic_version (version_num VARCHAR(32) NOT NULL)"))
+        db.execute(text("DELETE FROM alembic_version"))
+        db.execute(text("INSERT INTO alembic_version (version_num) VALUES (:revision)"), {"revision": revision})
+        db.commit()
+
+
+def test_schema_revision_is_the_migrations_head():
+    """Test that SCHEMA_REVISION was bumped along with the latest migration"""
+    config = Config(os.path.join(os.path.dirname(__file__), "..", "alembic.ini"))
+    assert ScriptDirectory.from_config(config).get_current_head() == SCHEMA_REVISION
+
+
+def test_check_schema_revision(integration_db):
+    """Test that startup accepts only a database migrated to SCHEMA_REVISION"""
+    # Tables made by create_all, never migrated
+    with pytest.raises(SchemaRevisionError, match="alembic upgrade head"):
+        asyncio.run(acheck_schema_revision())
+    
+    _set_revision(integration_db, "0001")
+    with pytest.raises(SchemaRevisionError, match=f"at revision 0001, expected {SCHEMA_REVISION}"):
+        asyncio.run(acheck_schema_revision())
+    
+    _set_revision(integration_db, SCHEMA_REVISION)
+    assert asyncio.run(acheck_schema_revision()) == SCHEMA_REVISION
+
+
+def test_warm_pool():
+    """Test that warming opens pooled connections, at most the pool size, and returns them"""
+    db_fd, db_path = tempfile.mkstemp(suffix=".db")
+    
+    async def run():
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{db_path}", poolclass=AsyncAdaptedQueuePool, pool_size=3, max_overflow=5,
+        )
+        try:
+            opened = await awarm_pool(10, engine)
+            return opened, engine.sync_engine.pool.checkedin()
+        finally:
+            await engine.dispose()
+    
+    try:
+        assert asyncio.run(run()) == (3, 3)
+    finally:
+        os.close(db_fd)
+        os.unlink(db_path)
+
+
+def test_warm_pool_skips_unpooled_engine(integration_db):
+    """Test that nothing is opened on SQLite's unpooled async engine"""
+    assert asyncio.run(awarm_pool(5)) == 0